@@ -1,8 +1,11 @@
 # python3
 # author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+import numpy as np
 from numpy import log
 from numpy import power
+from numpy.typing import ArrayLike
 from enum import Enum
+from typing import Callable
 
 
 class DeforestationFormula(str, Enum):
@@ -12,6 +15,42 @@ class DeforestationFormula(str, Enum):
     ANNUAL_DEFORESTATION_WRI = "WRI"
 
 
+class DeforestationKernels:
+    """Kernels of the deforestation rate formulas, all with parameters (area_t1, area_t2, year_t1,
+    year_t2). They use numpy functions, so they accept scalars and broadcast arrays alike.
+    """
+
+    @staticmethod
+    def puyravaud_annual_rate_of_forest_change(
+        area_t1: float, area_t2: float, year_t1: float, year_t2: float
+    ) -> float:
+        r: float = 1 / (year_t2 - year_t1) * log(area_t2 / area_t1)
+        return r
+
+    @staticmethod
+    def fao_annual_rate_of_forest_change(
+        area_t1: float, area_t2: float, year_t1: float, year_t2: float
+    ) -> float:
+        q: float = power(area_t2 / area_t1, 1 / (year_t2 - year_t1)) - 1
+        return q
+
+    @staticmethod
+    def fearnside_liu_annual_deforestation(area_t1, area_t2, year_t1, year_t2):
+        # TODO: docstring
+        # TODO: testing
+        # Plain arithmetic, valid for scalars and arrays
+        R = (area_t2 - area_t1) / (year_t2 - year_t1)
+        return R
+
+    @staticmethod
+    def wri_annual_deforestation(area_t1, area_t2, year_t1, year_t2):
+        # TODO: docstring
+        # TODO: testing
+        # Plain arithmetic, valid for scalars and arrays
+        P = (area_t2 - area_t1) / (area_t1 * (year_t2 - year_t1))
+        return P
+
+
 class DeforestationCalculator:
     """
     Collection of methods for determining forest coverture change. Equations are based on:
@@ -19,14 +58,103 @@ class DeforestationCalculator:
     Puyravaud, J.-P. (2003). Standardizing the calculation of the annual rate of deforestation.
     Forest Ecology and Management, 177(1–3), 593–596. https://doi.org/10.1016/S0378-1127(02)00335-3
 
+    Formulas are looked up in a registry that maps each formula (an Enum member) to its scalar
+    and array kernels. DeforestationFormula members are registered by default, and other
+    formulas can be added with register_formula. The log-based formulas (Puyravaud and FAO)
+    need forest at both years; in the batch paths, their rates of regions that lose all their
+    forest are NaN, while the other formulas are defined for a total loss.
+
     Raises:
         Warning: time parameters may be inverted
-        Exception: requested invalid formula
-        NotImplementedError: requested a not implemented yet method
+        Exception: requested invalid or not registered formula, non-positive initial areas or
+        negative final areas
     """
 
     INVALID_TYPE: str = "Choose a valid deforestation rate formula.\n"
     WARN_POTENTIAL_TIME_INCONSISTENCY: str = "Time time 1 is not lower than time 2.\n"
+    NON_POSITIVE_AREA: str = "All areas must be positive values.\n"
+    NEGATIVE_AREA: str = "Final areas can not be negative values.\n"
+
+    _registry: dict[Enum, tuple[Callable, Callable]] = {
+        DeforestationFormula.FOREST_CHANGE_PUYRAVAUD: (
+            DeforestationKernels.puyravaud_annual_rate_of_forest_change,
+            DeforestationKernels.puyravaud_annual_rate_of_forest_change,
+        ),
+        DeforestationFormula.FOREST_CHANGE_FAO: (
+            DeforestationKernels.fao_annual_rate_of_forest_change,
+            DeforestationKernels.fao_annual_rate_of_forest_change,
+        ),
+        DeforestationFormula.ANNUAL_DEFORESTATION_FEARNSIDE_LIU: (
+            DeforestationKernels.fearnside_liu_annual_deforestation,
+            DeforestationKernels.fearnside_liu_annual_deforestation,
+        ),
+        DeforestationFormula.ANNUAL_DEFORESTATION_WRI: (
+            DeforestationKernels.wri_annual_deforestation,
+            DeforestationKernels.wri_annual_deforestation,
+        ),
+    }
+    _positive_final_area: set[Enum] = {
+        DeforestationFormula.FOREST_CHANGE_PUYRAVAUD,
+        DeforestationFormula.FOREST_CHANGE_FAO,
+    }
+
+    @staticmethod
+    def register_formula(
+        formula: Enum,
+        scalar_kernel: Callable,
+        array_kernel: Callable | None = None,
+        positive_final_area: bool = False,
+    ):
+        """Adds or replaces a formula in the registry.
+
+        Args:
+            formula (Enum): member of an Enum identifying the formula, e.g. of a user defined
+            `class InstitutionalFormula(str, Enum)`.
+            scalar_kernel (Callable): f(area_t1, area_t2, year_t1, year_t2) for scalars.
+            array_kernel (Callable | None): the same function for numpy arrays. The scalar kernel
+            is used if None, so it must then accept arrays.
+            positive_final_area (bool): the formula is undefined without forest at year_t2,
+            e.g. log-based formulas.
+        """
+        if not isinstance(formula, Enum):
+            raise Exception(DeforestationCalculator.INVALID_TYPE)
+        DeforestationCalculator._registry[formula] = (
+            scalar_kernel,
+            scalar_kernel if array_kernel is None else array_kernel,
+        )
+        if positive_final_area:
+            DeforestationCalculator._positive_final_area.add(formula)
+        else:
+            DeforestationCalculator._positive_final_area.discard(formula)
+
+    @staticmethod
+    def unregister_formula(formula: Enum):
+        """Removes a formula from the registry."""
+        DeforestationCalculator.get_kernels(formula)
+        del DeforestationCalculator._registry[formula]
+        DeforestationCalculator._positive_final_area.discard(formula)
+
+    @staticmethod
+    def registered_formulas() -> list[Enum]:
+        return list(DeforestationCalculator._registry)
+
+    @staticmethod
+    def requires_positive_final_area(formula: Enum) -> bool:
+        """Whether a registered formula is undefined when area_t2 is zero."""
+        DeforestationCalculator.get_kernels(formula)
+        return formula in DeforestationCalculator._positive_final_area
+
+    @staticmethod
+    def get_kernels(formula: Enum) -> tuple[Callable, Callable]:
+        """Scalar and array kernels of a registered formula."""
+        kernels = (
+            DeforestationCalculator._registry.get(formula)
+            if isinstance(formula, Enum)
+            else None
+        )
+        if kernels is None:
+            raise Exception(DeforestationCalculator.INVALID_TYPE)
+        return kernels
 
     @staticmethod
     def calculate_deforestation_rate(
@@ -40,61 +168,126 @@ class DeforestationCalculator:
         if not year_t1 < year_t2:
             raise Warning(DeforestationCalculator.WARN_POTENTIAL_TIME_INCONSISTENCY)
 
-        # check valid formula parameter
-        if not isinstance(formula, DeforestationFormula):
-            raise Exception(DeforestationCalculator.INVALID_TYPE)
-
-        parameters: dict[str, float] = {
-            "area_t1": area_t1,
-            "area_t2": area_t2,
-            "year_t1": year_t1,
-            "year_t2": year_t2,
-        }
+        # check valid formula parameter, O(1) lookup in the registry
+        return DeforestationCalculator.get_kernels(formula)[0](
+            area_t1, area_t2, year_t1, year_t2
+        )
 
-        if formula.name == DeforestationFormula.FOREST_CHANGE_PUYRAVAUD.name:
-            return DeforestationCalculator.__puyravaud_annual_rate_of_forest_change(
-                **parameters
-            )
+    @staticmethod
+    def calculate_deforestation_rates(
+        area_t1: ArrayLike,
+        area_t2: ArrayLike,
+        year_t1: ArrayLike,
+        year_t2: ArrayLike,
+        formulas: list[DeforestationFormula] | None = None,
+    ) -> dict[DeforestationFormula, np.ndarray]:
+        """Rates of many regions at once. Parameters are broadcast together, e.g. arrays of areas
+        with scalar years.
 
-        if formula.name == DeforestationFormula.FOREST_CHANGE_FAO.name:
-            return DeforestationCalculator.__fao_annual_rate_of_forest_change(
-                **parameters
-            )
+        Args:
+            area_t1 (ArrayLike): forest area at year_t1 of each region
+            area_t2 (ArrayLike): forest area at year_t2 of each region
+            year_t1 (ArrayLike): initial year
+            year_t2 (ArrayLike): final year
+            formulas (list[DeforestationFormula] | None): formulas to compute, all the
+            registered ones by default.
 
-        if formula.name == DeforestationFormula.ANNUAL_DEFORESTATION_FEARNSIDE_LIU.name:
-            return DeforestationCalculator.__fearnside_liu_annual_deforestation(
-                **parameters
-            )
+        Returns:
+            dict[DeforestationFormula, np.ndarray]: one array of rates per formula, NaN for the
+            regions without forest at year_t2 in the formulas that require it.
+        """
+        area_t1, area_t2, year_t1, year_t2 = np.broadcast_arrays(
+            *[np.asarray(v, dtype=float) for v in (area_t1, area_t2, year_t1, year_t2)]
+        )
+        if formulas is None:
+            formulas = DeforestationCalculator.registered_formulas()
 
-        if formula.name == DeforestationFormula.ANNUAL_DEFORESTATION_WRI.name:
-            return DeforestationCalculator.__wri_annual_deforestation(**parameters)
+        # check cronological consistency and valid areas, for all the regions at once
+        if not np.all(year_t1 < year_t2):
+            raise Warning(DeforestationCalculator.WARN_POTENTIAL_TIME_INCONSISTENCY)
+        if not np.all(area_t1 > 0):
+            raise Exception(DeforestationCalculator.NON_POSITIVE_AREA)
+        if not np.all(area_t2 >= 0):
+            raise Exception(DeforestationCalculator.NEGATIVE_AREA)
 
-        raise NotImplementedError
+        array_kernels = [DeforestationCalculator.get_kernels(f)[1] for f in formulas]
+        without_forest = area_t2 == 0
+        rates: dict[DeforestationFormula, np.ndarray] = {}
+        for formula, kernel in zip(formulas, array_kernels):
+            with np.errstate(divide="ignore"):
+                rates[formula] = kernel(area_t1, area_t2, year_t1, year_t2)
+            if DeforestationCalculator.requires_positive_final_area(formula):
+                rates[formula] = np.where(without_forest, np.nan, rates[formula])
+        return rates
 
     @staticmethod
-    def __puyravaud_annual_rate_of_forest_change(
-        area_t1: float, area_t2: float, year_t1: float, year_t2: float
-    ) -> float:
-        r: float = 1 / (year_t2 - year_t1) * log(area_t2 / area_t1)
-        return r
+    def calculate_deforestation_rates_from_table(
+        table,
+        year_t1: int,
+        year_t2: int,
+        columns: list[str] | None = None,
+        formulas: list[DeforestationFormula] | None = None,
+    ) -> dict[DeforestationFormula, np.ndarray]:
+        """Rates between two years of a DataFrame indexed by year with one column per region or
+        area series, like example_data_set.csv read with index_col=0.
 
-    @staticmethod
-    def __fao_annual_rate_of_forest_change(
-        area_t1: float, area_t2: float, year_t1: float, year_t2: float
-    ) -> float:
-        q: float = power(area_t2 / area_t1, 1 / (year_t2 - year_t1)) - 1
-        return q
+        Returns:
+            dict[DeforestationFormula, np.ndarray]: one array per formula, in columns order.
+        """
+        if columns is None:
+            columns = list(table.columns)
+        areas = table.loc[[year_t1, year_t2], columns].to_numpy(dtype=float)
+        return DeforestationCalculator.calculate_deforestation_rates(
+            areas[0], areas[1], year_t1, year_t2, formulas
+        )
 
     @staticmethod
-    def __fearnside_liu_annual_deforestation(area_t1, area_t2, year_t1, year_t2):
-        # TODO: docstring
-        # TODO: testing
-        R = (area_t2 - area_t1) / (year_t2 - year_t1)
-        return R
+    def calculate_interval_rate_matrix(
+        cover: ArrayLike,
+        years: ArrayLike,
+        formulas: list[DeforestationFormula] | None = None,
+        dtype: type = np.float64,
+    ) -> np.ndarray:
+        """Rates for every pair of years (t1 < t2) of forest cover time series.
 
-    @staticmethod
-    def __wri_annual_deforestation(area_t1, area_t2, year_t1, year_t2):
-        # TODO: docstring
-        # TODO: testing
-        P = (area_t2 - area_t1) / (area_t1 * (year_t2 - year_t1))
-        return P
+        Only the upper triangle pairs are computed, all of them in one call to
+        calculate_deforestation_rates.
+
+        Args:
+            cover (ArrayLike): forest area with shape (regions, years). A 1-D array is one region.
+            years (ArrayLike): increasing years of the cover columns.
+            formulas (list[DeforestationFormula] | None): formulas to compute, all the
+            registered ones by default.
+            dtype (type): output type, e.g. np.float32 halves the memory of large series.
+
+        Returns:
+            np.ndarray: array with shape (formulas, regions, years, years), where [f, r, i, j] is
+            the rate of region r between years[i] and years[j]. Pairs with i >= j, or without
+            forest at years[i], are NaN.
+        """
+        cover = np.atleast_2d(np.asarray(cover, dtype=float))
+        years = np.asarray(years, dtype=float)
+        if formulas is None:
+            formulas = DeforestationCalculator.registered_formulas()
+        if cover.shape[1] != len(years):
+            raise Exception("cover must have one column per year.\n")
+        if not np.all(np.diff(years) > 0):
+            raise Warning(DeforestationCalculator.WARN_POTENTIAL_TIME_INCONSISTENCY)
+
+        t1_index, t2_index = np.triu_indices(len(years), 1)
+        # pairs starting without forest (after a total loss) have no rates
+        region, pair = np.nonzero(cover[:, t1_index] > 0)
+        rates = DeforestationCalculator.calculate_deforestation_rates(
+            cover[region, t1_index[pair]],
+            cover[region, t2_index[pair]],
+            years[t1_index[pair]],
+            years[t2_index[pair]],
+            formulas,
+        )
+
+        rate_matrix = np.full(
+            (len(formulas), cover.shape[0], len(years), len(years)), np.nan, dtype=dtype
+        )
+        for i, formula in enumerate(formulas):
+            rate_matrix[i][region, t1_index[pair], t2_index[pair]] = rates[formula]
+        return rate_matrix
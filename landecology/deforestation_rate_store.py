@@ -0,0 +1,147 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+import os
+import numpy as np
+from numpy.typing import ArrayLike
+from landecology.deforestation_rate import DeforestationCalculator
+from landecology.deforestation_rate import DeforestationFormula
+
+
+class DeforestationRateStore:
+    """Persistent store of the rates between every pair of years of growing cover series.
+
+    When a new year is appended, only the intervals ending at that year are computed, one per
+    previous year and formula, so each update costs O(T) instead of recomputing all the O(T^2)
+    intervals. Each year is saved in its own file inside the store directory, so an update only
+    writes the new year. The formulas are saved when the store is created and reused when it is
+    reopened, regardless of the formulas registered later.
+
+    Raises:
+        Warning: the new year is not after the last stored year
+        Exception: invalid cover or stored formulas different from the requested ones
+    """
+
+    YEAR_FILE: str = "year_{:04d}.npz"
+    FORMULAS_FILE: str = "formulas.npy"
+
+    def __init__(
+        self, directory: str, formulas: list[DeforestationFormula] | None = None
+    ) -> None:
+        """Opens the store in directory, loading the previously stored years.
+
+        Args:
+            directory (str): directory of the store, created if it does not exist.
+            formulas (list[DeforestationFormula] | None): formulas to store. By default, the
+            stored ones of an existing store, or all the registered ones for a new store.
+        """
+        os.makedirs(directory, exist_ok=True)
+        formulas_path = os.path.join(directory, DeforestationRateStore.FORMULAS_FILE)
+        if os.path.exists(formulas_path):
+            stored_values = np.load(formulas_path).tolist()
+            if formulas is None:
+                formulas = [
+                    DeforestationRateStore.__registered_formula(value)
+                    for value in stored_values
+                ]
+            elif [f.value for f in formulas] != stored_values:
+                raise Exception("The store was created with other formulas.\n")
+        else:
+            if formulas is None:
+                formulas = DeforestationCalculator.registered_formulas()
+            np.save(formulas_path, np.array([f.value for f in formulas]))
+        self.directory: str = directory
+        self.formulas: list[DeforestationFormula] = formulas
+        self.years: list[float] = []
+        self._cover: list[np.ndarray] = []
+        # _rates[j] has shape (formulas, regions, j), the rates from every year before j to j
+        self._rates: list[np.ndarray] = []
+
+        index = 0
+        while os.path.exists(self.__year_path(index)):
+            with np.load(self.__year_path(index)) as stored:
+                if list(stored["formulas"]) != [f.value for f in formulas]:
+                    raise Exception("The store was created with other formulas.\n")
+                self.years.append(float(stored["year"]))
+                self._cover.append(stored["cover"])
+                self._rates.append(stored["rates"])
+            index += 1
+
+    @staticmethod
+    def __registered_formula(value: str) -> DeforestationFormula:
+        for formula in DeforestationCalculator.registered_formulas():
+            if formula.value == value:
+                return formula  # type: ignore
+        raise Exception("{}:\nThe stored formula is not registered.".format(value))
+
+    def __year_path(self, index: int) -> str:
+        return os.path.join(
+            self.directory, DeforestationRateStore.YEAR_FILE.format(index)
+        )
+
+    @property
+    def cover(self) -> np.ndarray:
+        """Stored cover with shape (regions, years)."""
+        return np.stack(self._cover, axis=1)
+
+    def append_year(self, year: float, cover: ArrayLike):
+        """Adds the cover of a new year and computes the intervals ending at it.
+
+        Args:
+            year (float): the new year, after all the stored years
+            cover (ArrayLike): forest area of each region at the new year. Regions may lose all
+            their forest; the intervals starting without forest are NaN, and so are those
+            ending without forest for the formulas that require it.
+        """
+        cover = np.atleast_1d(np.asarray(cover, dtype=float))
+        if self.years and not self.years[-1] < year:
+            raise Warning(DeforestationCalculator.WARN_POTENTIAL_TIME_INCONSISTENCY)
+        if self._cover and cover.shape != self._cover[0].shape:
+            raise Exception("cover must have one value per region.\n")
+        if np.any(cover < 0):
+            raise Exception(DeforestationCalculator.NEGATIVE_AREA)
+
+        rates = np.full((len(self.formulas), len(cover), len(self.years)), np.nan)
+        if self.years:
+            previous_cover = self.cover
+            region, previous = np.nonzero(previous_cover > 0)
+            interval_rates = DeforestationCalculator.calculate_deforestation_rates(
+                previous_cover[region, previous],
+                cover[region],
+                np.asarray(self.years)[previous],
+                year,
+                self.formulas,
+            )
+            for i, formula in enumerate(self.formulas):
+                rates[i, region, previous] = interval_rates[formula]
+
+        np.savez(
+            self.__year_path(len(self.years)),
+            year=year,
+            cover=cover,
+            rates=rates,
+            formulas=np.array([f.value for f in self.formulas]),
+        )
+        self.years.append(float(year))
+        self._cover.append(cover)
+        self._rates.append(rates)
+
+    def get_rates(
+        self, formula: DeforestationFormula, year_t1: float, year_t2: float
+    ) -> np.ndarray:
+        """Stored rates of every region between two stored years."""
+        if not year_t1 < year_t2:
+            raise Warning(DeforestationCalculator.WARN_POTENTIAL_TIME_INCONSISTENCY)
+        if formula not in self.formulas:
+            raise Exception(DeforestationCalculator.INVALID_TYPE)
+        t1_index, t2_index = self.years.index(year_t1), self.years.index(year_t2)
+        return self._rates[t2_index][self.formulas.index(formula), :, t1_index]
+
+    def to_matrix(self) -> np.ndarray:
+        """All the stored rates with the layout of calculate_interval_rate_matrix."""
+        regions = len(self._cover[0]) if self._cover else 0
+        rate_matrix = np.full(
+            (len(self.formulas), regions, len(self.years), len(self.years)), np.nan
+        )
+        for t2_index, rates in enumerate(self._rates):
+            rate_matrix[:, :, :t2_index, t2_index] = rates
+        return rate_matrix
@@ -0,0 +1,267 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+import numpy as np
+from numpy.typing import ArrayLike
+from enum import Enum
+from landecology.deforestation_rate import DeforestationCalculator
+from landecology.deforestation_rate import DeforestationFormula
+
+
+class AreaErrorModel(str, Enum):
+    NORMAL = "normal"
+    CONFUSION_MATRIX = "confusion_matrix"
+
+
+class DeforestationUncertainty:
+    """Monte Carlo propagation of forest area errors through the deforestation rate formulas.
+
+    Area draws of all the replicates and regions are generated as (replicates, regions) arrays and
+    passed at once to the array kernels of DeforestationCalculator. Two error models are available:
+
+    - AreaErrorModel.NORMAL: areas with a known standard error.
+    - AreaErrorModel.CONFUSION_MATRIX: mapped forest areas adjusted with the sample counts of an
+    accuracy assessment, bootstrapped by multinomial resampling of each map class row.
+
+    Draws with non-positive areas give NaN rates, ignored by the interval statistics.
+
+    Raises:
+        Warning: time parameters may be inverted
+        Exception: invalid confidence, replicates, error or confusion matrix
+    """
+
+    @staticmethod
+    def normal_area_draws(
+        area: ArrayLike,
+        standard_error: ArrayLike,
+        replicates: int,
+        random_generator: np.random.Generator | int | None = None,
+    ) -> np.ndarray:
+        """Normal draws of the areas, with shape (replicates, regions)."""
+        area, standard_error = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(area, dtype=float)),
+            np.asarray(standard_error, dtype=float),
+        )
+        if np.any(standard_error < 0):
+            raise Exception("standard_error:\nMust be a non negative value.")
+        random_generator = np.random.default_rng(random_generator)
+        return random_generator.normal(
+            area, standard_error, size=(replicates,) + area.shape
+        )
+
+    @staticmethod
+    def adjusted_forest_area(
+        mapped_forest_area: ArrayLike,
+        total_area: ArrayLike,
+        confusion_matrix: ArrayLike,
+    ) -> np.ndarray:
+        """Forest area adjusted with an accuracy assessment.
+
+        Args:
+            mapped_forest_area (ArrayLike): area mapped as forest of each region.
+            total_area (ArrayLike): total area of each region.
+            confusion_matrix (ArrayLike): sample counts with shape (..., 2, 2). Rows are the map
+            classes and columns the reference classes, both ordered (forest, non forest).
+
+        Returns:
+            np.ndarray: mapped forest area times the proportion of forest among the forest
+            samples, plus mapped non forest area times the proportion of forest among the non
+            forest samples.
+        """
+        confusion_matrix = np.asarray(confusion_matrix, dtype=float)
+        forest_proportion = confusion_matrix[..., 0] / confusion_matrix.sum(axis=-1)
+        mapped_forest_area = np.asarray(mapped_forest_area, dtype=float)
+        return (
+            mapped_forest_area * forest_proportion[..., 0]
+            + (np.asarray(total_area, dtype=float) - mapped_forest_area)
+            * forest_proportion[..., 1]
+        )
+
+    @staticmethod
+    def confusion_matrix_area_draws(
+        mapped_forest_area: ArrayLike,
+        total_area: ArrayLike,
+        confusion_matrix: ArrayLike,
+        replicates: int,
+        random_generator: np.random.Generator | int | None = None,
+    ) -> np.ndarray:
+        """Bootstrap draws of the adjusted forest areas, with shape (replicates, regions).
+
+        Every row of the confusion matrix is resampled with a multinomial distribution of its own
+        sample size, one matrix per replicate (and per region when confusion_matrix has shape
+        (regions, 2, 2)).
+        """
+        confusion_matrix = np.asarray(confusion_matrix)
+        if confusion_matrix.shape[-2:] != (2, 2):
+            raise Exception("confusion_matrix:\nMust have shape (..., 2, 2).")
+        if np.any(confusion_matrix < 0) or np.any(confusion_matrix.sum(axis=-1) == 0):
+            raise Exception(
+                "confusion_matrix:\nCounts must be non negative with samples in every row."
+            )
+        mapped_forest_area = np.atleast_1d(np.asarray(mapped_forest_area, dtype=float))
+        samples = confusion_matrix.sum(axis=-1).astype(np.int64)
+        probabilities = confusion_matrix / samples[..., np.newaxis]
+
+        random_generator = np.random.default_rng(random_generator)
+        # a single matrix gets a region axis of length 1, shared by all the regions
+        region_axis = (1,) if samples.ndim == 1 else ()
+        resampled = random_generator.multinomial(
+            samples, probabilities, size=(replicates,) + region_axis + samples.shape
+        )
+        return DeforestationUncertainty.adjusted_forest_area(
+            mapped_forest_area, total_area, resampled
+        )
+
+    @staticmethod
+    def rate_intervals(
+        area_t1_draws: np.ndarray,
+        area_t2_draws: np.ndarray,
+        year_t1: ArrayLike,
+        year_t2: ArrayLike,
+        formulas: list[DeforestationFormula] | None = None,
+        confidence: float = 0.95,
+        point_estimate: tuple[ArrayLike, ArrayLike] | None = None,
+    ) -> dict[DeforestationFormula, dict[str, np.ndarray]]:
+        """Rates of every draw and their percentile confidence intervals.
+
+        Args:
+            area_t1_draws (np.ndarray): area draws at year_t1, shape (replicates, regions)
+            area_t2_draws (np.ndarray): area draws at year_t2, shape (replicates, regions)
+            year_t1 (ArrayLike): initial year
+            year_t2 (ArrayLike): final year
+            formulas (list[DeforestationFormula] | None): formulas to compute, all the
+            registered ones by default.
+            confidence (float): confidence level of the intervals.
+            point_estimate (tuple[ArrayLike, ArrayLike] | None): areas at both years for the
+            "estimate" column, the median of the draws is used if None.
+
+        Returns:
+            dict[DeforestationFormula, dict[str, np.ndarray]]: per formula, the columns
+            "estimate", "standard_error", "lower" and "upper", one value per region.
+        """
+        if not 0 < confidence < 1:
+            raise Exception("confidence:\nMust be in the interval (0, 1).")
+        if formulas is None:
+            formulas = DeforestationCalculator.registered_formulas()
+        year_t1 = np.asarray(year_t1, dtype=float)
+        year_t2 = np.asarray(year_t2, dtype=float)
+        if not np.all(year_t1 < year_t2):
+            raise Warning(DeforestationCalculator.WARN_POTENTIAL_TIME_INCONSISTENCY)
+
+        # draws of a total loss (zero area at year_t2) are valid, except for the formulas
+        # that require forest at both years
+        valid = (area_t1_draws > 0) & (area_t2_draws >= 0)
+        area_t1_draws = np.where(valid, area_t1_draws, np.nan)
+        area_t2_draws = np.where(valid, area_t2_draws, np.nan)
+        without_forest = area_t2_draws == 0
+        tail = (1 - confidence) / 2 * 100
+
+        intervals: dict[DeforestationFormula, dict[str, np.ndarray]] = {}
+        for formula in formulas:
+            array_kernel = DeforestationCalculator.get_kernels(formula)[1]
+            with np.errstate(divide="ignore"):
+                rates = array_kernel(area_t1_draws, area_t2_draws, year_t1, year_t2)
+            if DeforestationCalculator.requires_positive_final_area(formula):
+                rates = np.where(without_forest, np.nan, rates)
+            lower, median, upper = np.nanpercentile(
+                rates, [tail, 50, 100 - tail], axis=0
+            )
+            if point_estimate is None:
+                estimate = median
+            else:
+                point_t2 = np.asarray(point_estimate[1], dtype=float)
+                with np.errstate(divide="ignore"):
+                    estimate = array_kernel(
+                        np.asarray(point_estimate[0], dtype=float),
+                        point_t2,
+                        year_t1,
+                        year_t2,
+                    ) * np.ones_like(median)
+                if DeforestationCalculator.requires_positive_final_area(formula):
+                    estimate = np.where(point_t2 == 0, np.nan, estimate)
+            intervals[formula] = {
+                "estimate": estimate,
+                "standard_error": np.nanstd(rates, axis=0, ddof=1),
+                "lower": lower,
+                "upper": upper,
+            }
+        return intervals
+
+    @staticmethod
+    def propagate(
+        error_model: AreaErrorModel,
+        year_t1: ArrayLike,
+        year_t2: ArrayLike,
+        area_t1: ArrayLike,
+        area_t2: ArrayLike,
+        standard_error_t1: ArrayLike | None = None,
+        standard_error_t2: ArrayLike | None = None,
+        total_area: ArrayLike | None = None,
+        confusion_matrix_t1: ArrayLike | None = None,
+        confusion_matrix_t2: ArrayLike | None = None,
+        replicates: int = 1000,
+        formulas: list[DeforestationFormula] | None = None,
+        confidence: float = 0.95,
+        random_generator: np.random.Generator | int | None = None,
+    ) -> dict[DeforestationFormula, dict[str, np.ndarray]]:
+        """Confidence intervals of the rates of many regions under an area error model.
+
+        Args:
+            error_model (AreaErrorModel): NORMAL uses area_t1/area_t2 with their standard errors;
+            CONFUSION_MATRIX takes area_t1/area_t2 as mapped forest areas and requires total_area
+            and the confusion matrices of both maps.
+            replicates (int): Monte Carlo or bootstrap replicates.
+            random_generator (np.random.Generator | int | None): generator or seed.
+
+        Returns:
+            dict[DeforestationFormula, dict[str, np.ndarray]]: as rate_intervals. Estimates use the
+            given areas (NORMAL) or the adjusted areas of the observed matrices (CONFUSION_MATRIX).
+        """
+        if replicates <= 1:
+            raise Exception("replicates:\nMust be greater than 1.")
+        random_generator = np.random.default_rng(random_generator)
+
+        if error_model == AreaErrorModel.NORMAL:
+            if standard_error_t1 is None or standard_error_t2 is None:
+                raise Exception("The normal model requires the area standard errors.")
+            draws = [
+                DeforestationUncertainty.normal_area_draws(
+                    area, error, replicates, random_generator
+                )
+                for area, error in (
+                    (area_t1, standard_error_t1),
+                    (area_t2, standard_error_t2),
+                )
+            ]
+            point_estimate = (area_t1, area_t2)
+        elif error_model == AreaErrorModel.CONFUSION_MATRIX:
+            if (
+                total_area is None
+                or confusion_matrix_t1 is None
+                or confusion_matrix_t2 is None
+            ):
+                raise Exception(
+                    "The confusion matrix model requires total_area and both matrices."
+                )
+            draws = [
+                DeforestationUncertainty.confusion_matrix_area_draws(
+                    area, total_area, matrix, replicates, random_generator
+                )
+                for area, matrix in (
+                    (area_t1, confusion_matrix_t1),
+                    (area_t2, confusion_matrix_t2),
+                )
+            ]
+            point_estimate = (
+                DeforestationUncertainty.adjusted_forest_area(
+                    area_t1, total_area, confusion_matrix_t1
+                ),
+                DeforestationUncertainty.adjusted_forest_area(
+                    area_t2, total_area, confusion_matrix_t2
+                ),
+            )
+        else:
+            raise Exception("Choose a valid AreaErrorModel.\n")
+
+        return DeforestationUncertainty.rate_intervals(
+            draws[0], draws[1], year_t1, year_t2, formulas, confidence, point_estimate
+        )
@@ -0,0 +1,201 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+import numpy as np
+from numpy.typing import ArrayLike
+from landecology.deforestation_rate import DeforestationCalculator
+from landecology.deforestation_rate import DeforestationFormula
+
+
+class RasterReader:
+    """Superclass for single band rasters read by windows."""
+
+    def __init__(self) -> None:
+        self.shape: tuple[int, int] = (0, 0)
+
+    def read_window(self, rows: slice, columns: slice) -> np.ndarray:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class NpyRasterReader(RasterReader):
+    """Reads a 2-D .npy file through a memory map, or wraps an existing array or memmap."""
+
+    def __init__(self, source: str | np.ndarray) -> None:
+        super().__init__()
+        self._data: np.ndarray = (
+            np.load(source, mmap_mode="r") if isinstance(source, str) else source
+        )
+        if self._data.ndim != 2:
+            raise Exception("Rasters must be 2-D arrays.")
+        self.shape = self._data.shape
+
+    def read_window(self, rows: slice, columns: slice) -> np.ndarray:
+        return np.asarray(self._data[rows, columns])
+
+
+class GeoTiffRasterReader(RasterReader):
+    """Reads one band of a GeoTIFF by windows. Requires rasterio."""
+
+    def __init__(self, path: str, band: int = 1) -> None:
+        super().__init__()
+        try:
+            import rasterio
+            from rasterio.windows import Window
+        except ImportError as error:
+            raise ImportError(
+                "GeoTIFF rasters require rasterio, use NpyRasterReader otherwise."
+            ) from error
+        self._window_class = Window
+        self._dataset = rasterio.open(path)
+        self._band: int = band
+        self.shape = (self._dataset.height, self._dataset.width)
+
+    def read_window(self, rows: slice, columns: slice) -> np.ndarray:
+        window = self._window_class.from_slices(rows, columns)
+        return self._dataset.read(self._band, window=window)
+
+    def close(self):
+        self._dataset.close()
+
+
+class ForestChangePipeline:
+    """Forest-change rates from two classified rasters, processed tile by tile.
+
+    Only one tile of each raster is in memory at a time. Forest pixels are aggregated per zone,
+    given by a raster of non-negative integer labels (negative labels are ignored), or per tile
+    when there are no zones. The aggregated areas feed DeforestationCalculator in one batch.
+
+    Raises:
+        Exception: rasters with different shapes
+    """
+
+    LOG_FORMULAS: tuple[DeforestationFormula, ...] = (
+        DeforestationFormula.FOREST_CHANGE_PUYRAVAUD,
+        DeforestationFormula.FOREST_CHANGE_FAO,
+    )
+
+    def __init__(
+        self,
+        raster_t1: RasterReader,
+        raster_t2: RasterReader,
+        year_t1: float,
+        year_t2: float,
+        forest_classes: ArrayLike = (1,),
+        pixel_area: float = 1.0,
+        zones: RasterReader | None = None,
+        tile_size: int = 1024,
+    ) -> None:
+        """Forest-change rates from two classified rasters, processed tile by tile.
+
+        Args:
+            raster_t1 (RasterReader): classified raster at year_t1
+            raster_t2 (RasterReader): classified raster at year_t2
+            year_t1 (float): initial year
+            year_t2 (float): final year
+            forest_classes (ArrayLike): class values that are forest
+            pixel_area (float): area of one pixel
+            zones (RasterReader | None): zone labels of each pixel, tiles are the zones if None
+            tile_size (int): side of the square tiles in pixels
+        """
+        rasters = [raster_t1, raster_t2] + ([] if zones is None else [zones])
+        if len({raster.shape for raster in rasters}) != 1:
+            raise Exception("All rasters must have the same shape.")
+        if tile_size <= 0:
+            raise Exception("tile_size:\nMust be a positive value.")
+        self.raster_t1: RasterReader = raster_t1
+        self.raster_t2: RasterReader = raster_t2
+        self.zones: RasterReader | None = zones
+        self.year_t1: float = year_t1
+        self.year_t2: float = year_t2
+        self.forest_classes: np.ndarray = np.asarray(forest_classes)
+        self.pixel_area: float = pixel_area
+        self.tile_size: int = tile_size
+        self._areas: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None
+
+    def tiles(self):
+        """Row and column slices of every tile, in row-major order."""
+        rows, columns = self.raster_t1.shape
+        for row in range(0, rows, self.tile_size):
+            for column in range(0, columns, self.tile_size):
+                yield (
+                    slice(row, min(row + self.tile_size, rows)),
+                    slice(column, min(column + self.tile_size, columns)),
+                )
+
+    def forest_area(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Forest area per zone at both years.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: zone labels (tile indexes when there are
+            no zones), forest area at year_t1 and forest area at year_t2.
+        """
+        if self._areas is not None:
+            return self._areas
+
+        pixels_t1 = np.zeros(0, dtype=np.int64)
+        pixels_t2 = np.zeros(0, dtype=np.int64)
+        for tile_index, (rows, columns) in enumerate(self.tiles()):
+            forest_t1 = np.isin(
+                self.raster_t1.read_window(rows, columns), self.forest_classes
+            )
+            forest_t2 = np.isin(
+                self.raster_t2.read_window(rows, columns), self.forest_classes
+            )
+            if self.zones is None:
+                labels = np.full(forest_t1.shape, tile_index, dtype=np.int64)
+            else:
+                labels = self.zones.read_window(rows, columns).astype(np.int64)
+            valid = labels >= 0
+
+            tile_t1 = np.bincount(labels[valid & forest_t1])
+            tile_t2 = np.bincount(labels[valid & forest_t2])
+            size = max(len(pixels_t1), len(tile_t1), len(tile_t2))
+            if self.zones is None:
+                size = tile_index + 1
+            pixels_t1 = ForestChangePipeline.__accumulate(pixels_t1, tile_t1, size)
+            pixels_t2 = ForestChangePipeline.__accumulate(pixels_t2, tile_t2, size)
+
+        if self.zones is None:
+            zone_labels = np.arange(len(pixels_t1))
+        else:
+            # Zones without forest at both dates are left out
+            zone_labels = np.flatnonzero((pixels_t1 > 0) | (pixels_t2 > 0))
+        self._areas = (
+            zone_labels,
+            pixels_t1[zone_labels] * self.pixel_area,
+            pixels_t2[zone_labels] * self.pixel_area,
+        )
+        return self._areas
+
+    @staticmethod
+    def __accumulate(total: np.ndarray, tile: np.ndarray, size: int) -> np.ndarray:
+        if len(total) < size:
+            total = np.concatenate((total, np.zeros(size - len(total), dtype=np.int64)))
+        total[: len(tile)] += tile
+        return total
+
+    def calculate_rates(
+        self, formulas: list[DeforestationFormula] | None = None
+    ) -> dict[DeforestationFormula, np.ndarray]:
+        """Rates of every zone, aligned with the labels of forest_area. Zones without forest at
+        year_t1 have NaN rates, and so do zones without forest at year_t2 for the formulas that
+        require it (see DeforestationCalculator).
+        """
+        if formulas is None:
+            formulas = DeforestationCalculator.registered_formulas()
+        _, area_t1, area_t2 = self.forest_area()
+        with_forest = area_t1 > 0
+        zone_rates = DeforestationCalculator.calculate_deforestation_rates(
+            area_t1[with_forest],
+            area_t2[with_forest],
+            self.year_t1,
+            self.year_t2,
+            formulas,
+        )
+        rates: dict[DeforestationFormula, np.ndarray] = {}
+        for formula in formulas:
+            rates[formula] = np.full(len(area_t1), np.nan)
+            rates[formula][with_forest] = zone_rates[formula]
+        return rates
@@ -0,0 +1,232 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+import numpy as np
+from numpy.typing import ArrayLike
+from scipy.stats import chi2
+from scipy.stats import nbinom
+from scipy.stats import poisson
+from scipy.stats import t
+
+
+class QuadratDispersion:
+    """Dispersion analysis of counts of individuals per quadrat (subplot), for many species and
+    plot groups at once.
+
+    All the statistics derive from frequency tables, one row per species and group with the
+    number of quadrats holding x = 0, 1, ..., max individuals. The tables of every species and
+    group come from a single np.bincount, and the statistics are computed on all the rows as
+    arrays:
+
+    - mean, variance and dispersion index (variance / mean), with the t-test of the index against
+    1 (random distribution).
+    - Morisita index, Lloyd mean crowding and patchiness.
+    - chi-square goodness of fit to the Poisson and to the negative binomial distributions (k by
+    moments), over the classes 0 to the maximum count of each row.
+
+    Raises:
+        Exception: negative or non-integer counts
+    """
+
+    OVERALL_GROUP: str = "all"
+
+    @staticmethod
+    def frequency_tables(
+        counts: ArrayLike, rows: ArrayLike, row_number: int | None = None
+    ) -> np.ndarray:
+        """Frequency tables of the counts of each row label.
+
+        Args:
+            counts (ArrayLike): individuals per quadrat.
+            rows (ArrayLike): non-negative integer row label of each quadrat.
+            row_number (int | None): number of rows, the maximum label + 1 by default.
+
+        Returns:
+            np.ndarray: array with shape (rows, max count + 1), where [i, x] is the number of
+            quadrats of row i with x individuals.
+        """
+        counts = np.asarray(counts)
+        rows = np.asarray(rows, dtype=np.int64)
+        if np.any(counts < 0) or np.any(counts != np.round(counts)):
+            raise Exception("Counts must be non-negative integers.")
+        counts = counts.astype(np.int64)
+        classes = counts.max(initial=0) + 1
+        if row_number is None:
+            row_number = rows.max(initial=-1) + 1
+        return np.bincount(
+            rows * classes + counts, minlength=row_number * classes
+        ).reshape(row_number, classes)
+
+    @staticmethod
+    def dispersion_statistics(frequency_tables: ArrayLike) -> dict[str, np.ndarray]:
+        """Core statistics of every row of frequency tables, without tests or critical values:
+        "quadrats", "mean", "variance", "dispersion_index", "morisita",
+        "chi2_poisson_statistic" and "classes" (0 to the maximum count of each row).
+
+        Args:
+            frequency_tables (ArrayLike): quadrats with x individuals, shape (rows, classes).
+
+        Returns:
+            dict[str, np.ndarray]: one column per statistic, one value per row.
+        """
+        frequencies = np.atleast_2d(np.asarray(frequency_tables, dtype=float))
+        x = np.arange(frequencies.shape[1], dtype=float)
+        quadrats = frequencies.sum(axis=1)
+        individuals = frequencies @ x
+        in_classes = x <= np.where(frequencies > 0, x, -1).max(axis=1)[:, np.newaxis]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = individuals / quadrats
+            variance = (frequencies * (x - mean[:, np.newaxis]) ** 2).sum(axis=1) / (
+                quadrats - 1
+            )
+            morisita = (
+                quadrats
+                * (frequencies @ (x * (x - 1)))
+                / (individuals * (individuals - 1))
+            )
+            poisson_expected = quadrats[:, np.newaxis] * poisson.pmf(
+                x, mean[:, np.newaxis]
+            )
+            chi2_poisson = QuadratDispersion.__chi2_statistic(
+                frequencies, poisson_expected, in_classes
+            )
+            dispersion_index = variance / mean
+
+        return {
+            "quadrats": quadrats,
+            "mean": mean,
+            "variance": variance,
+            "dispersion_index": dispersion_index,
+            "morisita": morisita,
+            "chi2_poisson_statistic": chi2_poisson,
+            "classes": in_classes.sum(axis=1),
+        }
+
+    @staticmethod
+    def analyze_frequencies(
+        frequency_tables: ArrayLike, significance: float = 0.05
+    ) -> dict[str, np.ndarray]:
+        """Dispersion statistics of every row of frequency tables.
+
+        Args:
+            frequency_tables (ArrayLike): quadrats with x individuals, shape (rows, classes).
+            significance (float): level of the critical values.
+
+        Returns:
+            dict[str, np.ndarray]: one column per statistic, one value per row.
+        """
+        frequencies = np.atleast_2d(np.asarray(frequency_tables, dtype=float))
+        core = QuadratDispersion.dispersion_statistics(frequencies)
+        x = np.arange(frequencies.shape[1], dtype=float)
+        quadrats, mean, variance = core["quadrats"], core["mean"], core["variance"]
+        dispersion_index = core["dispersion_index"]
+        in_classes = x < core["classes"][:, np.newaxis]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_degrees = quadrats - 1
+            t_statistic = (dispersion_index - 1) / np.sqrt(2 / t_degrees)
+            mean_crowding = mean + dispersion_index - 1
+            patchiness = mean_crowding / mean
+
+            nb_k = np.where(variance > mean, mean**2 / (variance - mean), np.nan)
+            nb_expected = quadrats[:, np.newaxis] * nbinom.pmf(
+                x, nb_k[:, np.newaxis], (nb_k / (nb_k + mean))[:, np.newaxis]
+            )
+            chi2_nb = QuadratDispersion.__chi2_statistic(
+                frequencies, nb_expected, in_classes
+            )
+        chi2_poisson = core["chi2_poisson_statistic"]
+        # degrees of freedom: classes - 1 - estimated parameters
+        chi2_poisson_degrees = core["classes"] - 2
+        chi2_nb_degrees = np.where(np.isnan(nb_k), np.nan, core["classes"] - 3)
+
+        return {
+            "quadrats": quadrats.astype(np.int64),
+            "mean": mean,
+            "variance": variance,
+            "dispersion_index": dispersion_index,
+            "t_statistic": t_statistic,
+            "t_critical": t.ppf(1 - significance, t_degrees),
+            "t_p_value": t.sf(t_statistic, t_degrees),
+            "morisita": core["morisita"],
+            "mean_crowding": mean_crowding,
+            "patchiness": patchiness,
+            "chi2_poisson_statistic": chi2_poisson,
+            "chi2_poisson_critical": chi2.ppf(1 - significance, chi2_poisson_degrees),
+            "chi2_poisson_p_value": chi2.sf(chi2_poisson, chi2_poisson_degrees),
+            "nb_k": nb_k,
+            "chi2_nb_statistic": chi2_nb,
+            "chi2_nb_critical": chi2.ppf(1 - significance, chi2_nb_degrees),
+            "chi2_nb_p_value": chi2.sf(chi2_nb, chi2_nb_degrees),
+        }
+
+    @staticmethod
+    def __chi2_statistic(
+        observed: np.ndarray, expected: np.ndarray, in_classes: np.ndarray
+    ) -> np.ndarray:
+        terms = np.where(in_classes, (observed - expected) ** 2 / expected, 0.0)
+        return terms.sum(axis=1)
+
+    @staticmethod
+    def analyze(
+        table,
+        species_columns: list[str],
+        group_column: str | None = None,
+        overall: bool = True,
+        significance: float = 0.05,
+    ) -> dict[str, np.ndarray]:
+        """Dispersion statistics for every species and group of a quadrats table, like
+        datos_espeletia_verjon.csv: one row per quadrat, one count column per species and an
+        optional group (plot) column.
+
+        Args:
+            table (DataFrame): quadrats table.
+            species_columns (list[str]): columns with the counts of each species.
+            group_column (str | None): column with the group of each quadrat.
+            overall (bool): add the group OVERALL_GROUP with all the quadrats.
+            significance (float): level of the critical values.
+
+        Returns:
+            dict[str, np.ndarray]: columns "species" and "group", followed by the statistics of
+            analyze_frequencies, one row per species and group.
+        """
+        if group_column is None:
+            group_labels = np.array([], dtype=object)
+            group_codes = np.zeros(len(table), dtype=np.int64)
+            overall = True
+        else:
+            group_labels, group_codes = np.unique(
+                table[group_column].to_numpy(), return_inverse=True
+            )
+            group_labels = group_labels.astype(object)
+        group_number = max(len(group_labels), 1)
+
+        counts = np.stack([table[column].to_numpy() for column in species_columns])
+        species_codes = np.arange(len(species_columns))[:, np.newaxis]
+        frequencies = QuadratDispersion.frequency_tables(
+            counts.ravel(),
+            (species_codes * group_number + group_codes).ravel(),
+            len(species_columns) * group_number,
+        ).reshape(len(species_columns), group_number, -1)
+
+        labels = list(group_labels)
+        if overall:
+            frequencies = np.concatenate(
+                (
+                    frequencies[:, : len(labels)],
+                    frequencies.sum(axis=1, keepdims=True),
+                ),
+                axis=1,
+            )
+            labels.append(QuadratDispersion.OVERALL_GROUP)
+
+        statistics = QuadratDispersion.analyze_frequencies(
+            frequencies.reshape(len(species_columns) * len(labels), -1), significance
+        )
+        return {
+            "species": np.repeat(
+                np.asarray(species_columns, dtype=object), len(labels)
+            ),
+            "group": np.tile(np.asarray(labels, dtype=object), len(species_columns)),
+            **statistics,
+        }
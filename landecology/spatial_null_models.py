@@ -0,0 +1,246 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+import numpy as np
+from numpy.typing import ArrayLike
+from enum import Enum
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from landecology.spatial_distribution import QuadratDispersion
+
+
+class NullModel(str, Enum):
+    CSR_MULTINOMIAL = "multinomial"
+    CSR_POISSON = "poisson"
+    NEGATIVE_BINOMIAL = "negative_binomial"
+
+
+class QuadratNullModel:
+    """Monte Carlo tests of quadrat counts against simulated null layouts.
+
+    Null layouts of all the replicates are drawn as one (replicates, quadrats) array:
+
+    - NullModel.CSR_MULTINOMIAL: complete spatial randomness with the observed number of
+    individuals, each placed in a uniformly chosen quadrat.
+    - NullModel.CSR_POISSON: complete spatial randomness, Poisson counts with the observed mean.
+    - NullModel.NEGATIVE_BINOMIAL: aggregation, negative binomial counts with the observed mean
+    and k by moments (or a given k).
+
+    The statistics of QuadratDispersion are computed on every layout at once, and each observed
+    statistic gets the Monte Carlo p-values (1 + #{simulated >= observed}) / (replicates + 1) for
+    aggregation, the same with <= for regularity, and their two-sided combination. Only the
+    replicates with a finite statistic are counted, sparse layouts may have no individuals.
+
+    Replicates are split in blocks with seeds from np.random.SeedSequence(seed).spawn, so results
+    do not depend on the number of workers.
+
+    Raises:
+        Exception: invalid null model, replicates, or negative binomial without aggregation
+    """
+
+    INVALID_TYPE: str = "Choose a valid NullModel.\n"
+    STATISTICS: tuple[str, ...] = (
+        "dispersion_index",
+        "morisita",
+        "chi2_poisson_statistic",
+    )
+
+    @staticmethod
+    def simulate_block(
+        null_model: NullModel,
+        quadrats: int,
+        mean: float,
+        replicates: int,
+        seed_sequence: np.random.SeedSequence | int | None = None,
+        nb_k: float | None = None,
+    ) -> dict[str, np.ndarray]:
+        """Statistics of one block of null layouts, one value per replicate."""
+        random_generator = np.random.default_rng(seed_sequence)
+        if null_model == NullModel.CSR_MULTINOMIAL:
+            counts = random_generator.multinomial(
+                int(round(mean * quadrats)),
+                np.full(quadrats, 1 / quadrats),
+                size=replicates,
+            )
+        elif null_model == NullModel.CSR_POISSON:
+            counts = random_generator.poisson(mean, (replicates, quadrats))
+        elif null_model == NullModel.NEGATIVE_BINOMIAL:
+            if nb_k is None or not nb_k > 0:
+                raise Exception(
+                    "The negative binomial model requires a positive k (variance > mean)."
+                )
+            counts = random_generator.negative_binomial(
+                nb_k, nb_k / (nb_k + mean), (replicates, quadrats)
+            )
+        else:
+            raise Exception(QuadratNullModel.INVALID_TYPE)
+
+        frequencies = QuadratDispersion.frequency_tables(
+            counts.ravel(), np.repeat(np.arange(replicates), quadrats), replicates
+        )
+        statistics = QuadratDispersion.dispersion_statistics(frequencies)
+        return {name: statistics[name] for name in QuadratNullModel.STATISTICS}
+
+    @staticmethod
+    def simulate(
+        null_model: NullModel,
+        quadrats: int,
+        mean: float,
+        replicates: int = 10000,
+        nb_k: float | None = None,
+        seed: int | np.random.SeedSequence | None = None,
+        workers: int = 1,
+        block_size: int = 20000,
+    ) -> dict[str, np.ndarray]:
+        """Statistics of replicates null layouts, optionally over several processes.
+
+        Args:
+            null_model (NullModel): distribution of the layouts.
+            quadrats (int): quadrats per layout.
+            mean (float): mean individuals per quadrat.
+            replicates (int): number of layouts.
+            nb_k (float | None): k of NullModel.NEGATIVE_BINOMIAL.
+            seed (int | np.random.SeedSequence | None): root seed. Fresh entropy is used when None.
+            workers (int): number of processes. With 1, blocks run in the calling process.
+            block_size (int): layouts per block.
+
+        Returns:
+            dict[str, np.ndarray]: one array of replicates values per statistic in STATISTICS.
+        """
+        if not isinstance(null_model, NullModel):
+            raise Exception(QuadratNullModel.INVALID_TYPE)
+        if replicates <= 0 or block_size <= 0 or workers <= 0 or quadrats <= 0:
+            raise Exception(
+                "quadrats, replicates, workers and block_size must be positive values."
+            )
+
+        block_sizes = [block_size] * (replicates // block_size)
+        if replicates % block_size:
+            block_sizes.append(replicates % block_size)
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+
+        arguments = (
+            repeat(null_model),
+            repeat(quadrats),
+            repeat(mean),
+            block_sizes,
+            seed.spawn(len(block_sizes)),
+            repeat(nb_k),
+        )
+        if workers == 1:
+            blocks = list(map(QuadratNullModel.simulate_block, *arguments))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                blocks = list(executor.map(QuadratNullModel.simulate_block, *arguments))
+        return {
+            name: np.concatenate([block[name] for block in blocks])
+            for name in QuadratNullModel.STATISTICS
+        }
+
+    @staticmethod
+    def test(
+        counts: ArrayLike,
+        null_model: NullModel,
+        replicates: int = 10000,
+        nb_k: float | None = None,
+        seed: int | np.random.SeedSequence | None = None,
+        workers: int = 1,
+        block_size: int = 20000,
+    ) -> dict[str, float]:
+        """Monte Carlo test of the counts of one species in one group of quadrats.
+
+        Args:
+            counts (ArrayLike): individuals per quadrat.
+            null_model (NullModel): distribution of the null layouts.
+            nb_k (float | None): k of NullModel.NEGATIVE_BINOMIAL, by moments if None.
+            Other arguments as in simulate.
+
+        Returns:
+            dict[str, float]: for every statistic s in STATISTICS, the observed value s, the
+            number of replicates with a finite s "s_replicates", and the p-values
+            "s_p_value_aggregated", "s_p_value_regular" and "s_p_value" over those replicates.
+        """
+        counts = np.asarray(counts)
+        frequencies = QuadratDispersion.frequency_tables(counts, np.zeros(len(counts)))
+        observed = QuadratDispersion.analyze_frequencies(frequencies)
+        if null_model == NullModel.NEGATIVE_BINOMIAL and nb_k is None:
+            nb_k = float(observed["nb_k"][0])
+
+        simulated = QuadratNullModel.simulate(
+            null_model,
+            len(counts),
+            float(observed["mean"][0]),
+            replicates,
+            nb_k,
+            seed,
+            workers,
+            block_size,
+        )
+        results: dict[str, float] = {}
+        for name in QuadratNullModel.STATISTICS:
+            value = float(observed[name][0])
+            # layouts without the statistic (e.g. no individuals) are not replicates
+            finite = simulated[name][np.isfinite(simulated[name])]
+            aggregated = (1 + np.count_nonzero(finite >= value)) / (len(finite) + 1)
+            regular = (1 + np.count_nonzero(finite <= value)) / (len(finite) + 1)
+            results[name] = value
+            results[name + "_replicates"] = len(finite)
+            results[name + "_p_value_aggregated"] = aggregated
+            results[name + "_p_value_regular"] = regular
+            results[name + "_p_value"] = min(1.0, 2 * min(aggregated, regular))
+        return results
+
+    @staticmethod
+    def test_table(
+        table,
+        species_columns: list[str],
+        null_model: NullModel,
+        group_column: str | None = None,
+        overall: bool = True,
+        replicates: int = 10000,
+        seed: int | None = None,
+        workers: int = 1,
+        block_size: int = 20000,
+    ) -> dict[str, np.ndarray]:
+        """Monte Carlo tests for every species and group of a quadrats table, with the rows of
+        QuadratDispersion.analyze. Each row gets its own child seed.
+
+        Returns:
+            dict[str, np.ndarray]: columns "species", "group" and the results of test.
+        """
+        if group_column is None:
+            groups = [(QuadratDispersion.OVERALL_GROUP, np.ones(len(table), bool))]
+        else:
+            group_values = table[group_column].to_numpy()
+            groups = [
+                (label, group_values == label) for label in np.unique(group_values)
+            ]
+            if overall:
+                groups.append(
+                    (QuadratDispersion.OVERALL_GROUP, np.ones(len(table), bool))
+                )
+
+        row_seeds = np.random.SeedSequence(seed).spawn(
+            len(species_columns) * len(groups)
+        )
+        rows: list[dict] = []
+        for species in species_columns:
+            counts = table[species].to_numpy()
+            for label, in_group in groups:
+                result = QuadratNullModel.test(
+                    counts[in_group],
+                    null_model,
+                    replicates,
+                    seed=row_seeds[len(rows)],
+                    workers=workers,
+                    block_size=block_size,
+                )
+                rows.append({"species": species, "group": label, **result})
+        return {
+            name: (
+                np.array([row[name] for row in rows], dtype=object)
+                if name in ("species", "group")
+                else np.array([row[name] for row in rows])
+            )
+            for name in rows[0]
+        }
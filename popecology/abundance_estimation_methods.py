@@ -1,8 +1,16 @@
 # python3
 # author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
 
+import numpy as np
 from numpy import sqrt
 from numpy import nan
+from numpy.typing import ArrayLike
+from enum import Enum
+from scipy.special import expit
+from scipy.special import log_expit
+from popecology.abundance_estimation_population_models import CmrEvent
+from popecology.abundance_estimation_population_models import CmrPopulation
+from popecology.abundance_estimation_population_models import CmrRecord
 
 
 class LincolnPetersen:
@@ -11,8 +19,10 @@ class LincolnPetersen:
 
     @staticmethod
     def __bailey_unbiased_statistic(
-        captured: int, recaptured_unmarked: int, recaptured_marked: int
-    ) -> float:
+        captured: np.ndarray,
+        recaptured_unmarked: np.ndarray,
+        recaptured_marked: np.ndarray,
+    ) -> np.ndarray:
         return (
             (captured)
             * (recaptured_unmarked + recaptured_marked + 1)
@@ -21,8 +31,10 @@ class LincolnPetersen:
 
     @staticmethod
     def __chapman_unbiased_statistic(
-        captured: int, recaptured_unmarked: int, recaptured_marked: int
-    ) -> float:
+        captured: np.ndarray,
+        recaptured_unmarked: np.ndarray,
+        recaptured_marked: np.ndarray,
+    ) -> np.ndarray:
         return (
             (captured + 1)
             * (recaptured_unmarked + recaptured_marked + 1)
@@ -31,8 +43,10 @@ class LincolnPetersen:
 
     @staticmethod
     def __bailey_standard_error(
-        captured: int, recaptured_unmarked: int, recaptured_marked: int
-    ) -> float:
+        captured: np.ndarray,
+        recaptured_unmarked: np.ndarray,
+        recaptured_marked: np.ndarray,
+    ) -> np.ndarray:
         variance_numerator = (
             (captured**2)
             * (recaptured_unmarked + recaptured_marked + 1)
@@ -43,8 +57,10 @@ class LincolnPetersen:
 
     @staticmethod
     def __chapman_standard_error(
-        captured: int, recaptured_unmarked: int, recaptured_marked: int
-    ) -> float:
+        captured: np.ndarray,
+        recaptured_unmarked: np.ndarray,
+        recaptured_marked: np.ndarray,
+    ) -> np.ndarray:
         variance_numerator = (
             (captured + 1)
             * (recaptured_unmarked + recaptured_marked + 1)
@@ -56,56 +72,616 @@ class LincolnPetersen:
 
     @staticmethod
     def simple_biased_statistic(
-        captured: int, recaptured_unmarked: int, recaptured_marked: int
-    ) -> float:
-        Validator.check_non_negative_value(
+        captured: int | ArrayLike,
+        recaptured_unmarked: int | ArrayLike,
+        recaptured_marked: int | ArrayLike,
+    ) -> float | np.ndarray:
+        """Lincoln-Petersen estimator. Accepts scalars or arrays of counts (one study per element).
+
+        Returns:
+            float | np.ndarray: the estimator, NaN when there are no marked recaptures.
+        """
+        captured, recaptured_unmarked, recaptured_marked = Validator.as_count_arrays(
             [captured, recaptured_unmarked, recaptured_marked]
         )
 
         # If no marked recaptures, then the statistic is undefined
-        if recaptured_marked == 0:
-            return nan
-
-        return captured * (recaptured_unmarked + recaptured_marked) / recaptured_marked
+        with np.errstate(divide="ignore", invalid="ignore"):
+            statistic = np.where(
+                recaptured_marked == 0,
+                nan,
+                captured
+                * (recaptured_unmarked + recaptured_marked)
+                / recaptured_marked,
+            )
+        return statistic[()]
 
     @staticmethod
     def bailey_unbiased_summary(
-        captured: int, recaptured_unmarked: int, recaptured_marked: int
-    ) -> dict[str, float]:
-        Validator.check_non_negative_value(
+        captured: int | ArrayLike,
+        recaptured_unmarked: int | ArrayLike,
+        recaptured_marked: int | ArrayLike,
+    ) -> dict[str, float | np.ndarray]:
+        """Bailey estimator and its standard error. Accepts scalars or arrays of counts,
+        in the latter case each value of the dictionary is a column with one element per study.
+        """
+        captured, recaptured_unmarked, recaptured_marked = Validator.as_count_arrays(
             [captured, recaptured_unmarked, recaptured_marked]
         )
         return {
             LincolnPetersen.estimator_id: LincolnPetersen.__bailey_unbiased_statistic(
                 captured, recaptured_unmarked, recaptured_marked
-            ),
+            )[()],
             LincolnPetersen.standard_error_id: LincolnPetersen.__bailey_standard_error(
                 captured, recaptured_unmarked, recaptured_marked
-            ),
+            )[()],
         }
 
     @staticmethod
     def chapman_unbiased_summary(
-        captured: int, recaptured_unmarked: int, recaptured_marked: int
-    ) -> dict[str, float]:
-        Validator.check_non_negative_value(
+        captured: int | ArrayLike,
+        recaptured_unmarked: int | ArrayLike,
+        recaptured_marked: int | ArrayLike,
+    ) -> dict[str, float | np.ndarray]:
+        """Chapman estimator and its standard error. Accepts scalars or arrays of counts,
+        in the latter case each value of the dictionary is a column with one element per study.
+        """
+        captured, recaptured_unmarked, recaptured_marked = Validator.as_count_arrays(
             [captured, recaptured_unmarked, recaptured_marked]
         )
         return {
             LincolnPetersen.estimator_id: LincolnPetersen.__chapman_unbiased_statistic(
                 captured, recaptured_unmarked, recaptured_marked
-            ),
+            )[()],
             LincolnPetersen.standard_error_id: LincolnPetersen.__chapman_standard_error(
                 captured, recaptured_unmarked, recaptured_marked
-            ),
+            )[()],
+        }
+
+
+class SchnabelAccumulator:
+    """Multi-session Schnabel and Schumacher-Eschmeyer estimators, updated in constant time.
+
+    Each session t adds its captured individuals C_t and marked recaptures R_t; M_t, the marked
+    individuals released before the session, is tracked from the new marks of the previous
+    sessions. Only the sums used by the estimators are kept:
+
+    - Schnabel: N = sum(C_t * M_t) / sum(R_t).
+    - Schumacher-Eschmeyer: N = sum(C_t * M_t^2) / sum(R_t * M_t).
+
+    Standard errors come from the variance of 1/N and the delta method. Counts may be arrays,
+    one study per element, and the summaries are then columns.
+    """
+
+    def __init__(self) -> None:
+        self.sessions: int = 0
+        self.marked: np.ndarray = np.zeros(())
+        self._sum_captured_marked: np.ndarray = np.zeros(())
+        self._sum_recaptured: np.ndarray = np.zeros(())
+        self._sum_captured_marked_squared: np.ndarray = np.zeros(())
+        self._sum_recaptured_marked: np.ndarray = np.zeros(())
+        self._sum_recaptured_squared_over_captured: np.ndarray = np.zeros(())
+
+    def add_session(
+        self,
+        captured: int | ArrayLike,
+        recaptured_marked: int | ArrayLike,
+        new_marks: int | ArrayLike | None = None,
+    ):
+        """Adds a session in O(1).
+
+        Args:
+            captured (int | ArrayLike): individuals captured in the session.
+            recaptured_marked (int | ArrayLike): marked individuals among the captured.
+            new_marks (int | ArrayLike | None): individuals marked and released, all the
+            unmarked captured (captured - recaptured_marked) if None.
+        """
+        if new_marks is None:
+            new_marks = np.subtract(captured, recaptured_marked)
+        captured, recaptured_marked, new_marks = Validator.as_count_arrays(
+            [captured, recaptured_marked, new_marks]
+        )
+        if np.any(recaptured_marked > captured):
+            raise Exception("Recaptures can not exceed the captured individuals")
+
+        marked = self.marked
+        self._sum_captured_marked = self._sum_captured_marked + captured * marked
+        self._sum_recaptured = self._sum_recaptured + recaptured_marked
+        self._sum_captured_marked_squared = (
+            self._sum_captured_marked_squared + captured * marked**2
+        )
+        self._sum_recaptured_marked = (
+            self._sum_recaptured_marked + recaptured_marked * marked
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._sum_recaptured_squared_over_captured = (
+                self._sum_recaptured_squared_over_captured
+                + np.where(captured > 0, recaptured_marked**2 / captured, 0.0)
+            )
+        self.marked = marked + new_marks
+        self.sessions += 1
+
+    def schnabel_summary(self) -> dict[str, float | np.ndarray]:
+        """Schnabel estimator and its standard error, NaN without recaptures."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            abundance = np.where(
+                self._sum_recaptured > 0,
+                self._sum_captured_marked / self._sum_recaptured,
+                nan,
+            )
+            # var(1/N) = sum(R) / sum(C * M)^2
+            standard_error = (
+                abundance**2 * sqrt(self._sum_recaptured) / self._sum_captured_marked
+            )
+        return {
+            LincolnPetersen.estimator_id: abundance[()],
+            LincolnPetersen.standard_error_id: standard_error[()],
+        }
+
+    def schumacher_eschmeyer_summary(self) -> dict[str, float | np.ndarray]:
+        """Schumacher-Eschmeyer estimator and its standard error. The error needs at least
+        three sessions, and both are NaN without recaptures."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            abundance = np.where(
+                self._sum_recaptured_marked > 0,
+                self._sum_captured_marked_squared / self._sum_recaptured_marked,
+                nan,
+            )
+            variance = (
+                self._sum_recaptured_squared_over_captured
+                - self._sum_recaptured_marked**2 / self._sum_captured_marked_squared
+            ) / (self.sessions - 2)
+            standard_error = np.where(
+                self.sessions > 2,
+                abundance**2
+                * sqrt(np.maximum(variance, 0.0) / self._sum_captured_marked_squared),
+                nan,
+            )
+        return {
+            LincolnPetersen.estimator_id: abundance[()],
+            LincolnPetersen.standard_error_id: standard_error[()],
+        }
+
+    @staticmethod
+    def from_record(
+        record: CmrRecord | CmrPopulation | np.ndarray,
+    ) -> "SchnabelAccumulator":
+        """Accumulator with the sessions of a CmrPopulation history.
+
+        SAMPLE_AND_MARK events are sessions that mark the unmarked captured, and
+        SAMPLE_BUT_NOT_MARK events are sessions without new marks. The sums are computed at
+        once from the record columns, and more sessions can be added afterwards.
+
+        Args:
+            record (CmrRecord | CmrPopulation | np.ndarray): a full record, a population
+            recorded with RecordingMode.FULL, or rows with the CmrRecord dtype.
+        """
+        if isinstance(record, CmrPopulation):
+            record = record.record
+        if isinstance(record, CmrRecord):
+            record = record.to_numpy()
+        if not isinstance(record, np.ndarray) or record.dtype != CmrRecord.dtype:
+            raise Exception("A full CmrRecord history is required")
+
+        sessions = record[
+            (record["event"] == CmrEvent.SAMPLE_AND_MARK)
+            | (record["event"] == CmrEvent.SAMPLE_BUT_NOT_MARK)
+        ]
+        captured = (sessions["sampled_unmarked"] + sessions["sampled_marked"]).astype(
+            float
+        )
+        recaptured_marked = sessions["sampled_marked"].astype(float)
+        new_marks = np.where(
+            sessions["event"] == CmrEvent.SAMPLE_AND_MARK,
+            sessions["sampled_unmarked"],
+            0,
+        ).astype(float)
+        marked = np.cumsum(new_marks) - new_marks
+
+        accumulator = SchnabelAccumulator()
+        accumulator.sessions = len(sessions)
+        accumulator.marked = np.asarray(new_marks.sum())
+        accumulator._sum_captured_marked = np.asarray((captured * marked).sum())
+        accumulator._sum_recaptured = np.asarray(recaptured_marked.sum())
+        accumulator._sum_captured_marked_squared = np.asarray(
+            (captured * marked**2).sum()
+        )
+        accumulator._sum_recaptured_marked = np.asarray(
+            (recaptured_marked * marked).sum()
+        )
+        accumulator._sum_recaptured_squared_over_captured = np.asarray(
+            (recaptured_marked[captured > 0] ** 2 / captured[captured > 0]).sum()
+        )
+        return accumulator
+
+
+class CaptureHistoryModel(str, Enum):
+    CONSTANT = "constant"
+    TIME_DEPENDENT = "time_dependent"
+
+
+class JollySeber:
+    """Open population estimators from capture histories: Cormack-Jolly-Seber (CJS) survival and
+    capture probabilities by maximum likelihood, Jolly-Seber abundance, and the classic Jolly-Seber
+    moment estimators.
+
+    Histories are boolean arrays with shape (datasets, individuals, occasions), or (individuals,
+    occasions) for one dataset; datasets with fewer individuals can be padded with rows without
+    captures. CmrPopulation does not follow individuals, so histories come from field data or
+    from simulators of marked individuals.
+
+    The CJS likelihood only depends on per-occasion counts (sufficient_statistics), so it and its
+    gradient are evaluated for all the datasets as (datasets, occasions) arrays. The probability
+    of not being seen again, chi, is a backward recursion and its gradient the matching forward
+    (adjoint) recursion. Parameters are on the logit scale, either constant (phi(.) p(.)) or
+    time dependent (phi(t) p(t)); in the latter, the last survival and capture probabilities are
+    confounded and reported as NaN. All the datasets are fitted together with a damped Newton
+    method, with Hessians from differences of the analytic gradient.
+
+    Raises:
+        Exception: histories with less than three occasions, or invalid model
+    """
+
+    survival_id: str = "survival"
+    capture_id: str = "capture_probability"
+    abundance_id: str = "abundance"
+    LOGIT_BOUND: float = 20.0
+
+    @staticmethod
+    def __as_histories(histories: ArrayLike) -> np.ndarray:
+        histories = np.asarray(histories).astype(bool)
+        if histories.ndim == 2:
+            histories = histories[np.newaxis]
+        if histories.ndim != 3 or histories.shape[-1] < 3:
+            raise Exception(
+                "Histories must have shape (datasets, individuals, occasions) with at least"
+                " 3 occasions."
+            )
+        return histories
+
+    @staticmethod
+    def sufficient_statistics(histories: ArrayLike) -> dict[str, np.ndarray]:
+        """Per-occasion counts of every dataset, arrays with shape (datasets, occasions):
+
+        - "captured": individuals captured at t (n_t).
+        - "marked": captured at t and before t (m_t).
+        - "recaptured_later": captured at t and after t (R_t).
+        - "missed_between": captured before and after t, but not at t (Z_t).
+        - "at_risk": between the first and the last capture across the interval t, t + 1
+        (the last column is zero).
+        - "last": last captured at t.
+        """
+        histories = JollySeber.__as_histories(histories)
+        before = np.zeros_like(histories)
+        before[..., 1:] = np.logical_or.accumulate(histories, axis=-1)[..., :-1]
+        after = np.zeros_like(histories)
+        after[..., :-1] = np.logical_or.accumulate(histories[..., ::-1], axis=-1)[
+            ..., -2::-1
+        ]
+        last = histories & ~after
+        return {
+            "captured": histories.sum(axis=1),
+            "marked": (histories & before).sum(axis=1),
+            "recaptured_later": (histories & after).sum(axis=1),
+            "missed_between": (~histories & before & after).sum(axis=1),
+            "at_risk": ((histories | before) & after).sum(axis=1),
+            "last": last.sum(axis=1),
         }
 
+    @staticmethod
+    def __parameters_per_group(model: CaptureHistoryModel, occasions: int) -> int:
+        if model == CaptureHistoryModel.CONSTANT:
+            return 1
+        if model == CaptureHistoryModel.TIME_DEPENDENT:
+            return occasions - 1
+        raise Exception("Choose a valid CaptureHistoryModel.\n")
+
+    @staticmethod
+    def negative_log_likelihood(
+        logit_parameters: np.ndarray,
+        statistics: dict[str, np.ndarray],
+        model: CaptureHistoryModel = CaptureHistoryModel.CONSTANT,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """CJS negative log-likelihood and its gradient for every dataset.
+
+        Args:
+            logit_parameters (np.ndarray): (datasets, parameters), the logits of the survival
+            probabilities followed by those of the capture probabilities (from the second
+            occasion). One of each in the constant model, occasions - 1 of each otherwise.
+            statistics (dict[str, np.ndarray]): output of sufficient_statistics.
+            model (CaptureHistoryModel): parametrization.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: values (datasets,) and gradients (datasets,
+            parameters) with respect to the logits.
+        """
+        datasets, occasions = statistics["captured"].shape
+        groups = JollySeber.__parameters_per_group(model, occasions)
+        shape = (datasets, occasions - 1)
+        logit_survival = np.broadcast_to(logit_parameters[:, :groups], shape)
+        logit_capture = np.broadcast_to(logit_parameters[:, groups:], shape)
+        survival = expit(logit_survival)
+        capture = expit(logit_capture)
+
+        # chi_t: probability of not being captured after t, chi_T = 1
+        chi = np.ones((datasets, occasions))
+        for t in range(occasions - 2, -1, -1):
+            chi[:, t] = (
+                1
+                - survival[:, t]
+                + survival[:, t] * (1 - capture[:, t]) * chi[:, t + 1]
+            )
+        at_risk = statistics["at_risk"][:, :-1]
+        recaptured = statistics["marked"][:, 1:]
+        missed = statistics["missed_between"][:, 1:]
+        last = statistics["last"]
+        log_likelihood = (
+            (at_risk * log_expit(logit_survival)).sum(axis=1)
+            + (recaptured * log_expit(logit_capture)).sum(axis=1)
+            + (missed * log_expit(-logit_capture)).sum(axis=1)
+            + (last * np.log(chi)).sum(axis=1)
+        )
+
+        # adjoint of the chi recursion: total derivative of sum(last * log(chi)) by chi_t
+        adjoint = np.empty((datasets, occasions))
+        adjoint[:, 0] = last[:, 0] / chi[:, 0]
+        for t in range(1, occasions):
+            adjoint[:, t] = last[:, t] / chi[:, t] + adjoint[:, t - 1] * survival[
+                :, t - 1
+            ] * (1 - capture[:, t - 1])
+        survival_gradient = at_risk * (1 - survival) + adjoint[:, :-1] * (
+            -1 + (1 - capture) * chi[:, 1:]
+        ) * survival * (1 - survival)
+        capture_gradient = (
+            recaptured * (1 - capture)
+            - missed * capture
+            - adjoint[:, :-1] * survival * chi[:, 1:] * capture * (1 - capture)
+        )
+        if model == CaptureHistoryModel.CONSTANT:
+            survival_gradient = survival_gradient.sum(axis=1, keepdims=True)
+            capture_gradient = capture_gradient.sum(axis=1, keepdims=True)
+        gradient = np.concatenate((survival_gradient, capture_gradient), axis=1)
+        return -log_likelihood, -gradient
+
+    @staticmethod
+    def fit(
+        histories: ArrayLike,
+        model: CaptureHistoryModel = CaptureHistoryModel.CONSTANT,
+        max_iterations: int = 500,
+        tolerance: float = 1e-10,
+    ) -> dict[str, np.ndarray]:
+        """Maximum likelihood CJS probabilities and Jolly-Seber abundance N_t = n_t / p_t.
+
+        Args:
+            histories (ArrayLike): capture histories, see the class description.
+            model (CaptureHistoryModel): parametrization of the probabilities.
+            max_iterations (int): iterations of the damped Newton method.
+            tolerance (float): relative decrease of the negative log-likelihood that stops a
+            dataset.
+
+        Returns:
+            dict[str, np.ndarray]: "survival" (datasets, occasions - 1), "capture_probability"
+            and "abundance" (datasets, occasions), their "_standard_error" columns,
+            "log_likelihood" and "converged" (datasets,). Values that are not estimable are
+            NaN, e.g. the capture probability and abundance of the first occasion, and every
+            estimate of the datasets without recaptures (not converged). Standard errors are NaN
+            for estimates on the boundary (logits at +-LOGIT_BOUND) or without information
+            (near-singular Hessian). The dataset axis is dropped for a single (individuals,
+            occasions) history.
+        """
+        single = np.ndim(histories) == 2
+        statistics = JollySeber.sufficient_statistics(histories)
+        datasets, occasions = statistics["captured"].shape
+        parameters = 2 * JollySeber.__parameters_per_group(model, occasions)
+
+        def hessian(logit_parameters: np.ndarray, gradient: np.ndarray) -> np.ndarray:
+            # differences of the gradient, one column for all the datasets at once
+            step = 1e-5
+            columns = []
+            for j in range(parameters):
+                shifted = logit_parameters.copy()
+                shifted[:, j] += step
+                columns.append(
+                    (
+                        JollySeber.negative_log_likelihood(shifted, statistics, model)[
+                            1
+                        ]
+                        - gradient
+                    )
+                    / step
+                )
+            matrix = np.stack(columns, axis=2)
+            return (matrix + matrix.transpose(0, 2, 1)) / 2
+
+        # Newton steps damped per dataset as in GrowthFitter, the damping also handles the flat
+        # direction of the confounded parameters. Bounded logits keep boundary estimates finite.
+        # Without recaptures no individual is at risk and the likelihood has no information.
+        estimable = statistics["at_risk"].sum(axis=1) > 0
+        logit_parameters = np.zeros((datasets, parameters))
+        values, gradient = JollySeber.negative_log_likelihood(
+            logit_parameters, statistics, model
+        )
+        damping = np.full(datasets, 1e-3)
+        active = estimable.copy()
+        converged = np.zeros(datasets, dtype=bool)
+        for _ in range(max_iterations):
+            if not np.any(active):
+                break
+            H = hessian(logit_parameters, gradient)
+            diagonal = np.maximum(np.abs(np.diagonal(H, axis1=1, axis2=2)), 1e-8)
+            damped = H + (damping[:, np.newaxis] * diagonal)[:, :, np.newaxis] * np.eye(
+                parameters
+            )
+            delta = -(np.linalg.pinv(damped) @ gradient[:, :, np.newaxis])[:, :, 0]
+            delta = np.where(active[:, np.newaxis] & np.isfinite(delta), delta, 0.0)
+
+            candidate = np.clip(
+                logit_parameters + delta,
+                -JollySeber.LOGIT_BOUND,
+                JollySeber.LOGIT_BOUND,
+            )
+            candidate_values, candidate_gradient = JollySeber.negative_log_likelihood(
+                candidate, statistics, model
+            )
+            improved = active & (candidate_values < values)
+            small_decrease = improved & (
+                values - candidate_values <= tolerance * np.abs(values)
+            )
+            logit_parameters[improved] = candidate[improved]
+            values[improved] = candidate_values[improved]
+            gradient[improved] = candidate_gradient[improved]
+            damping = np.where(improved, damping / 10, damping * 10)
+
+            # at the optimum no step decreases the value and the gradient is zero, except for
+            # logits on the bounds that would keep moving outwards
+            bound = JollySeber.LOGIT_BOUND - 1e-8
+            projected_gradient = np.where(
+                ((logit_parameters >= bound) & (gradient < 0))
+                | ((logit_parameters <= -bound) & (gradient > 0)),
+                0.0,
+                gradient,
+            )
+            at_optimum = np.max(
+                np.abs(projected_gradient), axis=1
+            ) <= 1e-6 * np.maximum(1.0, np.abs(values))
+            done = small_decrease | at_optimum
+            converged |= active & done
+            # datasets where no step improves the value stop, but are not converged
+            active &= ~done & ~(~improved & (damping > 1e10))
+
+        logit_standard_error = JollySeber.__logit_standard_errors(
+            hessian(logit_parameters, gradient), logit_parameters
+        )
+
+        groups = parameters // 2
+        shape = (datasets, occasions - 1)
+        survival = np.broadcast_to(expit(logit_parameters[:, :groups]), shape).copy()
+        capture = np.full((datasets, occasions), nan)
+        capture[:, 1:] = expit(logit_parameters[:, groups:])
+        survival_error = (
+            np.broadcast_to(logit_standard_error[:, :groups], shape)
+            * survival
+            * (1 - survival)
+        )
+        capture_error = np.full((datasets, occasions), nan)
+        capture_error[:, 1:] = (
+            logit_standard_error[:, groups:] * capture[:, 1:] * (1 - capture[:, 1:])
+        )
+        if model == CaptureHistoryModel.TIME_DEPENDENT:
+            for array in (survival, survival_error, capture, capture_error):
+                array[:, -1] = nan
+        for array in (survival, survival_error, capture, capture_error):
+            array[~estimable] = nan
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            abundance = statistics["captured"] / capture
+            # delta method, var(n / p) = n^2 var(p) / p^4
+            abundance_error = statistics["captured"] * capture_error / capture**2
+
+        results = {
+            JollySeber.survival_id: survival,
+            JollySeber.survival_id + "_standard_error": survival_error,
+            JollySeber.capture_id: capture,
+            JollySeber.capture_id + "_standard_error": capture_error,
+            JollySeber.abundance_id: abundance,
+            JollySeber.abundance_id + "_standard_error": abundance_error,
+            "log_likelihood": np.where(estimable, -values, nan),
+            "converged": converged,
+        }
+        if single:
+            return {key: value[0] for key, value in results.items()}
+        return results
+
+    @staticmethod
+    def __logit_standard_errors(
+        hessian: np.ndarray, logit_parameters: np.ndarray
+    ) -> np.ndarray:
+        """Standard errors of the logits from the Hessians (datasets, parameters, parameters).
+        Logits on the bounds are held fixed and the others are estimated from the eigenvalues
+        of the Hessian; the logits on near-null eigenvectors have no standard error (NaN).
+        """
+        parameters = logit_parameters.shape[1]
+        at_bound = np.abs(logit_parameters) >= JollySeber.LOGIT_BOUND - 1e-8
+        free = ~at_bound
+        hessian = np.where(
+            free[:, :, np.newaxis] & free[:, np.newaxis, :], hessian, 0.0
+        ) + at_bound[:, :, np.newaxis] * np.eye(parameters)
+        eigenvalues, eigenvectors = np.linalg.eigh(hessian)
+        informative = eigenvalues > 1e-6 * np.abs(eigenvalues).max(
+            axis=1, keepdims=True
+        )
+        with np.errstate(divide="ignore"):
+            inverse = np.where(informative, 1 / eigenvalues, 0.0)
+        loadings = eigenvectors**2
+        variance = (loadings * inverse[:, np.newaxis, :]).sum(axis=2)
+        unidentified = (loadings * ~informative[:, np.newaxis, :]).sum(axis=2) > 1e-3
+        return np.where(at_bound | unidentified, nan, sqrt(variance))
+
+    @staticmethod
+    def moment_estimates(histories: ArrayLike) -> dict[str, np.ndarray]:
+        """Classic Jolly-Seber estimators with the bias adjustments of Seber (1982), for all the
+        datasets as (datasets, occasions) arrays:
+
+        - marked population M_t = m_t + (n_t + 1) Z_t / (R_t + 1)
+        - abundance N_t = (n_t + 1) M_t / (m_t + 1)
+        - survival phi_t = M_{t+1} / (M_t - m_t + n_t)
+        - births B_t = N_{t+1} - phi_t (N_t - m_t + n_t)
+
+        with M_0 = 0 for the survival of the first occasion. All the captured individuals are
+        assumed released. Values that are not estimable (M and
+        N at the first and last occasions, phi and B at the last two) are NaN.
+        """
+        single = np.ndim(histories) == 2
+        statistics = JollySeber.sufficient_statistics(histories)
+        captured = statistics["captured"].astype(float)
+        marked = statistics["marked"].astype(float)
+        recaptured_later = statistics["recaptured_later"].astype(float)
+        missed_between = statistics["missed_between"].astype(float)
+
+        marked_population = marked + (captured + 1) * missed_between / (
+            recaptured_later + 1
+        )
+        marked_population[:, 0] = nan
+        marked_population[:, -1] = nan
+        abundance = (captured + 1) * marked_population / (marked + 1)
+
+        survival = np.full(captured.shape, nan)
+        births = np.full(captured.shape, nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            survival[:, :-1] = marked_population[:, 1:] / (
+                marked_population[:, :-1] - marked[:, :-1] + captured[:, :-1]
+            )
+            survival[:, 0] = marked_population[:, 1] / captured[:, 0]
+            births[:, :-1] = abundance[:, 1:] - survival[:, :-1] * (
+                abundance[:, :-1] - marked[:, :-1] + captured[:, :-1]
+            )
+
+        results = {
+            "marked_population": marked_population,
+            JollySeber.abundance_id: abundance,
+            JollySeber.survival_id: survival,
+            "births": births,
+        }
+        if single:
+            return {key: value[0] for key, value in results.items()}
+        return results
+
 
 class Validator:
     @staticmethod
-    def check_non_negative_value(values: list[int], only_positive: bool = False):
-        for v in values:
-            if only_positive and v <= 0:
-                raise Exception("All values must be positive integers")
-            if not only_positive and v < 0:
-                raise Exception("All values must be non-negative integers")
+    def check_non_negative_value(values: list[ArrayLike], only_positive: bool = False):
+        # Broadcast all values together, so a single comparison checks every element
+        stacked_values = np.stack(np.broadcast_arrays(*values))
+        if only_positive and np.any(stacked_values <= 0):
+            raise Exception("All values must be positive integers")
+        if not only_positive and np.any(stacked_values < 0):
+            raise Exception("All values must be non-negative integers")
+
+    @staticmethod
+    def as_count_arrays(
+        values: list[ArrayLike], only_positive: bool = False
+    ) -> list[np.ndarray]:
+        """Converts the values to broadcasted arrays and checks them with check_non_negative_value"""
+        arrays = np.broadcast_arrays(*[np.asarray(v) for v in values])
+        Validator.check_non_negative_value(arrays, only_positive)
+        return arrays
@@ -0,0 +1,138 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+import numpy as np
+from enum import Enum
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from popecology.abundance_estimation_population_models import CmrEnsemble
+from popecology.abundance_estimation_sinks import ResultSink
+from popecology.random_generators import BitGeneratorType
+from popecology.random_generators import GeneratorFactory
+
+
+class CmrAction(str, Enum):
+    SAMPLE_AND_MARK = "sample_and_mark"
+    SAMPLE_BUT_NOT_MARK = "sample_but_not_mark"
+    TIME_INTERLUDE = "time_interlude"
+
+
+class CmrReplicateRunner:
+    """Runs many replicates of a CmrPopulation sampling protocol, optionally over several processes.
+
+    A protocol is a sequence of (CmrAction, value) pairs. For sampling actions the value is the
+    trap number; for CmrAction.TIME_INTERLUDE it is the number of time steps.
+
+    Replicates are split in blocks of fixed size, and every block gets its own generator derived
+    from np.random.SeedSequence(seed).spawn. Blocks, not workers, own the random streams, so the
+    same seed gives bit-identical results regardless of the number of workers.
+
+    Raises:
+        Exception: invalid protocol, replicates, block size or workers
+    """
+
+    INVALID_ACTION: str = "Choose a valid CmrAction for every protocol step.\n"
+
+    @staticmethod
+    def run(
+        population_parameters: dict,
+        protocol: list[tuple[CmrAction, int]],
+        replicates: int,
+        seed: int | None = None,
+        workers: int = 1,
+        block_size: int = 10000,
+        bit_generator: BitGeneratorType = BitGeneratorType.PCG64,
+        sink: ResultSink | None = None,
+    ) -> dict[str, np.ndarray] | None:
+        """Runs the protocol for all replicates and merges the samples in one table.
+
+        Args:
+            population_parameters (dict): keyword arguments of CmrPopulation (initial_size,
+            capture_distribution, death_distribution, inmigration_rate, mark_lost_probability).
+            protocol (list[tuple[CmrAction, int]]): sampling protocol applied to every replicate.
+            replicates (int): number of replicates.
+            seed (int | None): root seed. Fresh entropy is used when None.
+            workers (int): number of processes. With 1, blocks run in the calling process.
+            block_size (int): replicates per block.
+            bit_generator (BitGeneratorType): algorithm of the block generators.
+            sink (ResultSink | None): when given, every block is written to the sink as soon as
+            it is available (in block order) instead of being kept in memory.
+
+        Returns:
+            dict[str, np.ndarray] | None: columns "sample_<i>_unmarked" and "sample_<i>_marked"
+            for the i-th sampling action of the protocol, one row per replicate. None if a sink
+            is given.
+        """
+        for action, _ in protocol:
+            if not isinstance(action, CmrAction):
+                raise Exception(CmrReplicateRunner.INVALID_ACTION)
+        if replicates <= 0 or block_size <= 0 or workers <= 0:
+            raise Exception(
+                "replicates, workers and block_size must be positive values."
+            )
+
+        block_sizes = [block_size] * (replicates // block_size)
+        if replicates % block_size:
+            block_sizes.append(replicates % block_size)
+        block_seeds = GeneratorFactory.spawn(seed, len(block_sizes))
+
+        arguments = (
+            repeat(population_parameters),
+            repeat(protocol),
+            block_sizes,
+            block_seeds,
+            repeat(bit_generator),
+        )
+        if workers == 1:
+            blocks = CmrReplicateRunner.__collect(
+                map(CmrReplicateRunner.run_block, *arguments), sink
+            )
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                blocks = CmrReplicateRunner.__collect(
+                    executor.map(CmrReplicateRunner.run_block, *arguments), sink
+                )
+
+        if sink is not None:
+            return None
+        return {
+            column: np.concatenate([block[column] for block in blocks])
+            for column in blocks[0]
+        }
+
+    @staticmethod
+    def __collect(blocks, sink: ResultSink | None) -> list[dict[str, np.ndarray]]:
+        if sink is None:
+            return list(blocks)
+        for block in blocks:
+            sink.write(block)
+        return []
+
+    @staticmethod
+    def run_block(
+        population_parameters: dict,
+        protocol: list[tuple[CmrAction, int]],
+        replicates: int,
+        seed_sequence: np.random.SeedSequence,
+        bit_generator: BitGeneratorType = BitGeneratorType.PCG64,
+    ) -> dict[str, np.ndarray]:
+        """Runs the protocol for one block of replicates with its own generator."""
+        ensemble = CmrEnsemble(
+            **population_parameters,
+            replicates=replicates,
+            random_generator=GeneratorFactory.create(seed_sequence, bit_generator),
+        )
+        columns: dict[str, np.ndarray] = {}
+        sample_index = 0
+        for action, value in protocol:
+            if action == CmrAction.TIME_INTERLUDE:
+                ensemble.time_interlude(steps=value)
+                continue
+
+            if action == CmrAction.SAMPLE_AND_MARK:
+                sample = ensemble.sample_and_mark(value)
+            else:
+                sample = ensemble.sample_but_not_mark(value)
+            for kind, counts in sample.items():
+                columns["sample_{}_{}".format(sample_index, kind)] = counts
+            sample_index += 1
+        return columns
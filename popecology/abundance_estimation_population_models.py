@@ -1,6 +1,9 @@
 # python3
 # author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
 import numpy as np
+from enum import Enum
+from popecology.random_generators import BitGeneratorType
+from popecology.random_generators import GeneratorFactory
 
 
 class SamplingPopulation:
@@ -13,6 +16,180 @@ class SamplingPopulation:
         self.marked_id: str = "marked"
         self.unmarked_id: str = "unmarked"
 
+    def _check_valid_probability_value(self, probability: float, msg: str) -> float:
+        if probability < 0 or probability > 1:
+            raise Exception(
+                "{}:\nA probability must be a non-negative value equal or lower than 1.0".format(
+                    msg
+                )
+            )
+        return probability
+
+    def _distribution_validator(
+        self, distribution: tuple[float, float], msg: str
+    ) -> tuple[float, float]:
+        return (
+            self._check_valid_probability_value(
+                distribution[0], msg + " at P(X|unmarked)"
+            ),
+            self._check_valid_probability_value(
+                distribution[1], msg + " at P(X|marked)"
+            ),
+        )
+
+    def _check_is_natural_number(self, value: int, msg: str, include_zero=True) -> int:
+        if include_zero and value < 0:
+            raise Exception("{}:\nMust be a non-negative value.".format(msg))
+
+        if not include_zero and value <= 0:
+            raise Exception("{}:\nMust be a positive value.".format(msg))
+
+        return value
+
+
+class CmrEvent(int, Enum):
+    INITIAL = 0
+    SAMPLE_AND_MARK = 1
+    SAMPLE_BUT_NOT_MARK = 2
+    TIME_INTERLUDE = 3
+
+
+class CmrRecord:
+    """Columnar history of a CmrPopulation stored in a preallocated, growable structured array.
+
+    Each row holds the time step, the event (CmrEvent code) that produced it, the population
+    state after the event and the sampled individuals (zero for events without sample).
+    """
+
+    dtype: np.dtype = np.dtype(
+        [
+            ("time", np.int64),
+            ("event", np.int8),
+            ("unmarked", np.int64),
+            ("marked", np.int64),
+            ("sampled_unmarked", np.int64),
+            ("sampled_marked", np.int64),
+        ]
+    )
+
+    def __init__(self, initial_capacity: int = 64) -> None:
+        self._data: np.ndarray = np.zeros(max(initial_capacity, 1), dtype=self.dtype)
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(
+        self,
+        time: int,
+        event: CmrEvent,
+        unmarked: int,
+        marked: int,
+        sampled_unmarked: int = 0,
+        sampled_marked: int = 0,
+    ):
+        # Amortized growth, the capacity is doubled when it is full
+        if self._size == len(self._data):
+            grown_data = np.zeros(2 * len(self._data), dtype=self.dtype)
+            grown_data[: self._size] = self._data
+            self._data = grown_data
+        self._data[self._size] = (
+            time,
+            event,
+            unmarked,
+            marked,
+            sampled_unmarked,
+            sampled_marked,
+        )
+        self._size += 1
+
+    def to_numpy(self) -> np.ndarray:
+        """Zero-copy view of the filled rows. It is invalidated if the record grows afterwards."""
+        return self._data[: self._size]
+
+    def to_pandas(self):
+        """DataFrame with one column per field. Requires pandas."""
+        import pandas as pd
+
+        return pd.DataFrame(self.to_numpy())
+
+
+class CmrSummaryRecord:
+    """Streaming summary of a CmrPopulation history with constant memory.
+
+    Keeps running counts (events, sampled individuals), the minimum and maximum of the population
+    state, and the last `window` rows in a ring buffer with the CmrRecord layout.
+    """
+
+    def __init__(self, window: int = 10) -> None:
+        if window <= 0:
+            raise Exception("window:\nMust be a positive value.")
+        self._data: np.ndarray = np.zeros(window, dtype=CmrRecord.dtype)
+        self._size: int = 0
+        self.sampled_unmarked_total: int = 0
+        self.sampled_marked_total: int = 0
+        self.unmarked_range: tuple[int, int] | None = None
+        self.marked_range: tuple[int, int] | None = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(
+        self,
+        time: int,
+        event: CmrEvent,
+        unmarked: int,
+        marked: int,
+        sampled_unmarked: int = 0,
+        sampled_marked: int = 0,
+    ):
+        self._data[self._size % len(self._data)] = (
+            time,
+            event,
+            unmarked,
+            marked,
+            sampled_unmarked,
+            sampled_marked,
+        )
+        self._size += 1
+        self.sampled_unmarked_total += sampled_unmarked
+        self.sampled_marked_total += sampled_marked
+        self.unmarked_range = CmrSummaryRecord.__extend_range(
+            self.unmarked_range, unmarked
+        )
+        self.marked_range = CmrSummaryRecord.__extend_range(self.marked_range, marked)
+
+    @staticmethod
+    def __extend_range(
+        value_range: tuple[int, int] | None, value: int
+    ) -> tuple[int, int]:
+        if value_range is None:
+            return (value, value)
+        return (min(value_range[0], value), max(value_range[1], value))
+
+    def to_numpy(self) -> np.ndarray:
+        """Copy of the last `window` rows in chronological order."""
+        if self._size <= len(self._data):
+            return self._data[: self._size].copy()
+        return np.roll(self._data, -(self._size % len(self._data)))
+
+    def to_pandas(self):
+        """DataFrame of the last `window` rows. Requires pandas."""
+        import pandas as pd
+
+        return pd.DataFrame(self.to_numpy())
+
+
+class RecordingMode(str, Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+    NONE = "none"
+
+
+class SamplingEngine(str, Enum):
+    SEQUENTIAL = "sequential"
+    VECTORIZED = "vectorized"
+
 
 class CmrPopulation(SamplingPopulation):
     """Model for abundance stimination using capture-mark-recapture (CMR) methods.
@@ -33,6 +210,11 @@ class CmrPopulation(SamplingPopulation):
         death_distribution: tuple[float, float],
         inmigration_rate: int,
         mark_lost_probability: float,
+        sampling_engine: SamplingEngine = SamplingEngine.SEQUENTIAL,
+        random_generator: np.random.Generator | int | None = None,
+        bit_generator: BitGeneratorType = BitGeneratorType.PCG64,
+        recording_mode: RecordingMode = RecordingMode.FULL,
+        summary_window: int = 10,
     ) -> None:
         # TODO: complete docstring
         """Model for abundance stimination using capture-mark-recapture (CMR) methods.
@@ -52,8 +234,19 @@ class CmrPopulation(SamplingPopulation):
             death_distribution (tuple[float, float]): _description_
             inmigration_rate (float): _description_
             mark_lost_probability (float): _description_
+            sampling_engine (SamplingEngine): algorithm used to take the samples. SEQUENTIAL simulates
+            trap by trap; VECTORIZED draws the same distribution with a few array operations.
+            random_generator (np.random.Generator | int | None): source of all random draws, or the
+            seed of a new one. Fresh entropy is used when None.
+            bit_generator (BitGeneratorType): algorithm of the new generator when a seed is given.
+            recording_mode (RecordingMode): FULL keeps every step in a CmrRecord, SUMMARY keeps a
+            CmrSummaryRecord with the last `summary_window` steps, NONE does not record anything.
+            summary_window (int): steps kept by the SUMMARY mode.
         """
         super().__init__(initial_size)
+        self._random_generator: np.random.Generator = GeneratorFactory.create(
+            random_generator, bit_generator
+        )
 
         # Initialize population state variables
         self._current_unmarked: int = initial_size
@@ -61,75 +254,103 @@ class CmrPopulation(SamplingPopulation):
         self._current_time_step: int = 0
 
         # Initialize population state and samples records
-        self.population_record: list[dict[str, int]] = [
-            {self.unmarked_id: initial_size, self.marked_id: 0}
-        ]
-        self.sample_record: list[dict[str, int]] = [
-            {self.unmarked_id: 0, self.marked_id: 0}
-        ]
-        self.time_step_record: list[int] = [0]
+        if not isinstance(recording_mode, RecordingMode):
+            raise Exception("recording_mode:\nChoose a valid recording mode.")
+        self.record: CmrRecord | CmrSummaryRecord | None = None
+        if recording_mode == RecordingMode.FULL:
+            self.record = CmrRecord()
+        elif recording_mode == RecordingMode.SUMMARY:
+            self.record = CmrSummaryRecord(summary_window)
+        if self.record is not None:
+            self.record.append(0, CmrEvent.INITIAL, initial_size, 0)
 
         # Population parameters: distributions and probabilities
-        self._capture_distribution: tuple[float, float] = self.__distribution_validator(
+        self._capture_distribution: tuple[float, float] = self._distribution_validator(
             capture_distribution, "capture_distribution"
         )
-        self._death_distribution: tuple[float, float] = self.__distribution_validator(
+        self._death_distribution: tuple[float, float] = self._distribution_validator(
             death_distribution, ""
         )
-        self._inmigration_rate = self.__check_is_natural_number(
+        self._inmigration_rate = self._check_is_natural_number(
             inmigration_rate, include_zero=True, msg="inmigration_rate"
         )
 
         # check and assing probability values
-        self._mark_lost_probability: float = self.__check_valid_probability_value(
+        self._mark_lost_probability: float = self._check_valid_probability_value(
             mark_lost_probability, "mark_lost_probability"
         )
 
-    def __check_valid_probability_value(self, probability: float, msg: str) -> float:
-        if probability < 0 or probability > 1:
-            raise Exception(
-                "{}:\nA probability must be a non-negative value equal or lower than 1.0".format(
-                    msg
-                )
-            )
-        return probability
+        if not isinstance(sampling_engine, SamplingEngine):
+            raise Exception("sampling_engine:\nChoose a valid sampling engine.")
+        self._sampling_engine: SamplingEngine = sampling_engine
 
-    def __distribution_validator(
-        self, distribution: tuple[float, float], msg: str
-    ) -> tuple[float, float]:
-        return (
-            self.__check_valid_probability_value(
-                distribution[0], msg + " at P(X|unmarked)"
-            ),
-            self.__check_valid_probability_value(
-                distribution[1], msg + " at P(X|marked)"
-            ),
-        )
+    def __recorded_rows(self) -> np.ndarray:
+        if self.record is None:
+            raise Exception("Records are disabled with RecordingMode.NONE")
+        return self.record.to_numpy()
 
-    def __check_is_natural_number(self, value: int, msg: str, include_zero=True) -> int:
-        if include_zero and value < 0:
-            raise Exception("{}:\nMust be a non-negative value.".format(msg))
+    @property
+    def population_record(self) -> list[dict[str, int]]:
+        return [
+            {self.unmarked_id: int(row["unmarked"]), self.marked_id: int(row["marked"])}
+            for row in self.__recorded_rows()
+        ]
 
-        if not include_zero and value <= 0:
-            raise Exception("{}:\nMust be a positive value.".format(msg))
+    @property
+    def sample_record(self) -> list[dict[str, int]]:
+        return [
+            (
+                {"no_sample_u": 0, "no_sample_m": 0}
+                if row["event"] == CmrEvent.TIME_INTERLUDE
+                else {
+                    self.unmarked_id: int(row["sampled_unmarked"]),
+                    self.marked_id: int(row["sampled_marked"]),
+                }
+            )
+            for row in self.__recorded_rows()
+        ]
 
-        return value
+    @property
+    def time_step_record(self) -> list[int]:
+        return self.__recorded_rows()["time"].tolist()
 
-    def __update_records(self, new_sample_record: dict[str, int] | None = None):
-        self.population_record.append(
-            {
-                self.unmarked_id: self._current_unmarked,
-                self.marked_id: self._current_marked,
-            }
-        )
-        self.time_step_record.append(self._current_time_step)
+    def __update_records(
+        self, event: CmrEvent, new_sample_record: dict[str, int] | None = None
+    ):
+        if self.record is None:
+            return
         if new_sample_record is None:
-            self.sample_record.append({"no_sample_u": 0, "no_sample_m": 0})
-        else:
-            self.sample_record.append(new_sample_record)
+            new_sample_record = {self.unmarked_id: 0, self.marked_id: 0}
+        self.record.append(
+            self._current_time_step,
+            event,
+            self._current_unmarked,
+            self._current_marked,
+            new_sample_record[self.unmarked_id],
+            new_sample_record[self.marked_id],
+        )
 
     def __sample_without_replacement(self, trap_number: int) -> dict[str, int]:
-        """Obtain a sample without replacement.
+        """Obtain a sample without replacement using the selected sampling engine.
+
+        Args:
+            trap_number (int): The number of traps. A trap can capture only one individual.
+            A captured individual cannot be trapped by another trap.
+
+        Returns:
+            dict[str, int]: Number of marked and unmarked captured individuals.
+        """
+
+        population_current_size = self._current_unmarked + self._current_marked
+        if trap_number > population_current_size:
+            raise Exception("Sample size cannot be bigger than the actual population")
+
+        if self._sampling_engine == SamplingEngine.VECTORIZED:
+            return self.__vectorized_sample(trap_number)
+        return self.__sequential_sample(trap_number)
+
+    def __sequential_sample(self, trap_number: int) -> dict[str, int]:
+        """Obtain a sample without replacement, trap by trap.
 
         For each i trap:
 
@@ -139,17 +360,13 @@ class CmrPopulation(SamplingPopulation):
             P(unmarked|captured) = P(captured|unmarked) P(unmarked_i) / P(capture_i)
 
         Args:
-            trap_number (int): The number of traps. A trap can capture only one individual.
-            A captured individual cannot be trapped by another trap.
+            trap_number (int): The number of traps.
 
         Returns:
             dict[str, int]: Number of marked and unmarked captured individuals.
         """
 
         population_current_size = self._current_unmarked + self._current_marked
-        if trap_number > population_current_size:
-            raise Exception("Sample size cannot be bigger than the actual population")
-
         unmarked_sampled: int = 0
         capture_failure_count: int = 0
 
@@ -163,7 +380,9 @@ class CmrPopulation(SamplingPopulation):
                 self._capture_distribution[0] - self._capture_distribution[1]
             ) * p_unmarked + self._capture_distribution[1]
 
-            captured_something: bool = np.random.binomial(1, total_probability) == 1
+            captured_something: bool = (
+                self._random_generator.binomial(1, total_probability) == 1
+            )
 
             if not captured_something:
                 capture_failure_count += 1
@@ -173,10 +392,87 @@ class CmrPopulation(SamplingPopulation):
             p_unmarked_given_captured: float = (
                 self._capture_distribution[0] * p_unmarked / total_probability
             )
-            unmarked_sampled += np.random.binomial(1, p_unmarked_given_captured) == 1
+            unmarked_sampled += (
+                self._random_generator.binomial(1, p_unmarked_given_captured) == 1
+            )
         marked_sampled = trap_number - unmarked_sampled - capture_failure_count
         return {self.unmarked_id: unmarked_sampled, self.marked_id: marked_sampled}
 
+    def __vectorized_sample(self, trap_number: int) -> dict[str, int]:
+        """Obtain a sample with the same distribution as the sequential one, without a loop over traps.
+
+        The sequential process is split in two independent parts:
+
+        The order in which individuals get captured. A successful trap picks an unmarked individual
+        with probability proportional to P(capture|unmarked), so the order is a weighted sampling without
+        replacement. It is resolved at once sorting exponential arrival times with rate equal to the weight.
+        The number of traps spent until each capture. After k captures, every trap succeeds with the
+        same probability, then the traps used until the (k + 1)-th capture follow a geometric distribution.
+
+        When P(capture|unmarked) = P(capture|marked) = p, the number of captures is Binomial(traps, p)
+        and the captured individuals are a simple random sample, so the unmarked ones are hypergeometric.
+
+        Args:
+            trap_number (int): The number of traps.
+
+        Returns:
+            dict[str, int]: Number of marked and unmarked captured individuals.
+        """
+        p_capture_unmarked, p_capture_marked = self._capture_distribution
+        unmarked, marked = self._current_unmarked, self._current_marked
+
+        if p_capture_unmarked == p_capture_marked:
+            captured = int(
+                self._random_generator.binomial(trap_number, p_capture_unmarked)
+            )
+            unmarked_sampled = (
+                int(self._random_generator.hypergeometric(unmarked, marked, captured))
+                if captured > 0
+                else 0
+            )
+            return {
+                self.unmarked_id: unmarked_sampled,
+                self.marked_id: captured - unmarked_sampled,
+            }
+
+        # Individuals with zero capture probability never arrive.
+        catchable_unmarked = unmarked if p_capture_unmarked > 0 else 0
+        catchable_marked = marked if p_capture_marked > 0 else 0
+        max_captures = min(trap_number, catchable_unmarked + catchable_marked)
+        if max_captures == 0:
+            return {self.unmarked_id: 0, self.marked_id: 0}
+
+        arrivals = np.concatenate(
+            (
+                self._random_generator.exponential(
+                    1 / p_capture_unmarked if catchable_unmarked else 1,
+                    catchable_unmarked,
+                ),
+                self._random_generator.exponential(
+                    1 / p_capture_marked if catchable_marked else 1, catchable_marked
+                ),
+            )
+        )
+        first_arrivals = np.argpartition(arrivals, max_captures - 1)[:max_captures]
+        capture_order = first_arrivals[np.argsort(arrivals[first_arrivals])]
+        unmarked_after = np.cumsum(capture_order < catchable_unmarked)
+
+        # State before the (k + 1)-th capture
+        captures_before = np.arange(max_captures)
+        unmarked_before = unmarked_after - (capture_order < catchable_unmarked)
+        p_success = (
+            p_capture_unmarked * (unmarked - unmarked_before)
+            + p_capture_marked * (marked - captures_before + unmarked_before)
+        ) / (unmarked + marked - captures_before)
+
+        traps_used = np.cumsum(self._random_generator.geometric(p_success))
+        captured = int(np.searchsorted(traps_used, trap_number, side="right"))
+        unmarked_sampled = int(unmarked_after[captured - 1]) if captured > 0 else 0
+        return {
+            self.unmarked_id: unmarked_sampled,
+            self.marked_id: captured - unmarked_sampled,
+        }
+
     def sample_and_mark(self, sample_size: int) -> dict[str, int]:
         # take a sample for the population
         sample = self.__sample_without_replacement(sample_size)
@@ -186,7 +482,7 @@ class CmrPopulation(SamplingPopulation):
         self._current_marked = self._current_marked + sample[self.unmarked_id]
 
         # update records
-        self.__update_records(sample)
+        self.__update_records(CmrEvent.SAMPLE_AND_MARK, sample)
 
         return sample
 
@@ -195,33 +491,43 @@ class CmrPopulation(SamplingPopulation):
         sample = self.__sample_without_replacement(sample_size)
 
         # update records
-        self.__update_records(sample)
+        self.__update_records(CmrEvent.SAMPLE_BUT_NOT_MARK, sample)
 
         return sample
 
-    def time_interlude(self):
+    def time_interlude(self, steps: int = 1):
         # TODO: complete docstring
 
-        """Describes how the population changes if sampling time is bigger enough."""
+        """Describes how the population changes if sampling time is bigger enough.
+
+        Args:
+            steps (int): number of time steps to advance. Several steps are drawn at once from
+            their exact joint distribution (see _interlude_probabilities) and recorded as one row.
+        """
 
         # TODO: check and evaluate if the mathematical model is appropriate.
+        self._check_is_natural_number(steps, include_zero=False, msg="steps")
+        if steps > 1:
+            self.__multi_step_interlude(steps)
+            self.__update_records(CmrEvent.TIME_INTERLUDE)
+            return
 
         # Individuals that lost their marks
-        lost_marks: int = np.random.binomial(
+        lost_marks: int = self._random_generator.binomial(
             self._current_marked, self._mark_lost_probability
         )
         self._current_unmarked += lost_marks
         self._current_marked -= lost_marks
 
         # Dead individuals
-        dead_unmarked: int = np.random.binomial(
+        dead_unmarked: int = self._random_generator.binomial(
             self._current_unmarked, self._death_distribution[0]
         )
-        dead_marked: int = np.random.binomial(
+        dead_marked: int = self._random_generator.binomial(
             self._current_marked, self._death_distribution[1]
         )
 
-        self._current_unmarked += dead_unmarked
+        self._current_unmarked -= dead_unmarked
         self._current_marked -= dead_marked
 
         # Inmigration balance
@@ -230,4 +536,266 @@ class CmrPopulation(SamplingPopulation):
         # update time counter
         self._current_time_step += 1
         # Update records
-        self.__update_records()
+        self.__update_records(CmrEvent.TIME_INTERLUDE)
+
+    def __multi_step_interlude(self, steps: int):
+        marked_fate, immigrant_survival = CmrPopulation._interlude_probabilities(
+            steps, self._death_distribution, self._mark_lost_probability
+        )
+        still_marked, now_unmarked, _ = self._random_generator.multinomial(
+            self._current_marked, marked_fate
+        )
+        surviving_unmarked = self._random_generator.binomial(
+            self._current_unmarked,
+            immigrant_survival[-1] * (1 - self._death_distribution[0]),
+        )
+        surviving_immigrants = (
+            self._random_generator.binomial(
+                self._inmigration_rate, immigrant_survival
+            ).sum()
+            if self._inmigration_rate > 0
+            else 0
+        )
+
+        self._current_marked = int(still_marked)
+        self._current_unmarked = int(
+            surviving_unmarked + now_unmarked + surviving_immigrants
+        )
+        self._current_time_step += steps
+
+    @staticmethod
+    def _interlude_probabilities(
+        steps: int,
+        death_distribution: tuple[float, float],
+        mark_lost_probability: float,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Exact fate probabilities of individuals after several time steps.
+
+        Every step each individual independently loses its mark, then dies according to its mark
+        status, and finally new unmarked individuals arrive. With constant probabilities, the fate
+        of an individual only depends on the steps it goes through:
+
+            a = (1 - P(lost mark)) (1 - P(death|marked)), stays marked and alive for one step
+            c = P(lost mark) (1 - P(death|unmarked)), loses the mark and survives one step
+            b = 1 - P(death|unmarked), an unmarked individual survives one step
+
+        A marked individual is still marked after k steps with probability a^k, and it is alive
+        without mark with probability sum_{j=1..k} a^(j-1) c b^(k-j).
+
+        Args:
+            steps (int): number of time steps
+            death_distribution (tuple[float, float]): [P(death|unmarked), P(death|marked)]
+            mark_lost_probability (float): probability of losing the mark in one step
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: probabilities of a marked individual being [marked,
+            unmarked, dead] after all the steps, and survival probabilities b^0 ... b^(steps - 1)
+            of the immigrants that arrive at the end of the last, second to last, ... step.
+        """
+        stays_marked = (1 - mark_lost_probability) * (1 - death_distribution[1])
+        loses_mark = mark_lost_probability * (1 - death_distribution[0])
+        unmarked_survival = 1 - death_distribution[0]
+
+        elapsed = np.arange(steps)
+        p_marked = stays_marked**steps
+        p_unmarked = np.sum(
+            stays_marked**elapsed * loses_mark * unmarked_survival ** elapsed[::-1]
+        )
+        marked_fate = np.array(
+            [p_marked, p_unmarked, max(1 - p_marked - p_unmarked, 0)]
+        )
+        return marked_fate / marked_fate.sum(), unmarked_survival**elapsed
+
+
+class CmrEnsemble(SamplingPopulation):
+    """Many independent replicates of a CmrPopulation advanced at once.
+
+    The state of the replicates is kept as arrays of marked and unmarked counts, so every
+    sampling or time step is a few array operations instead of one Python call per replicate.
+
+    Args:
+        SamplingPopulation(class): superclass for all populations to study abundance stimation techniques.
+    """
+
+    def __init__(
+        self,
+        initial_size: int,
+        capture_distribution: tuple[float, float],
+        death_distribution: tuple[float, float],
+        inmigration_rate: int,
+        mark_lost_probability: float,
+        replicates: int,
+        random_generator: np.random.Generator | int | None = None,
+        bit_generator: BitGeneratorType = BitGeneratorType.PCG64,
+    ) -> None:
+        """Many independent replicates of a CmrPopulation advanced at once.
+
+        Args:
+            initial_size (int): Initial population size before ANY sampling
+            capture_distribution (tuple[float, float]): as in CmrPopulation
+            death_distribution (tuple[float, float]): as in CmrPopulation
+            inmigration_rate (int): as in CmrPopulation
+            mark_lost_probability (float): as in CmrPopulation
+            replicates (int): number of independent populations
+            random_generator (np.random.Generator | int | None): source of all random draws, or the
+            seed of a new one. Fresh entropy is used when None.
+            bit_generator (BitGeneratorType): algorithm of the new generator when a seed is given.
+        """
+        super().__init__(initial_size)
+        self.replicates: int = self._check_is_natural_number(
+            replicates, include_zero=False, msg="replicates"
+        )
+
+        self._random_generator: np.random.Generator = GeneratorFactory.create(
+            random_generator, bit_generator
+        )
+
+        # Initialize populations state variables
+        self._current_unmarked: np.ndarray = np.full(
+            replicates, initial_size, dtype=np.int64
+        )
+        self._current_marked: np.ndarray = np.zeros(replicates, dtype=np.int64)
+        self._current_time_step: int = 0
+
+        # Population parameters: distributions and probabilities
+        self._capture_distribution: tuple[float, float] = self._distribution_validator(
+            capture_distribution, "capture_distribution"
+        )
+        self._death_distribution: tuple[float, float] = self._distribution_validator(
+            death_distribution, "death_distribution"
+        )
+        self._inmigration_rate = self._check_is_natural_number(
+            inmigration_rate, include_zero=True, msg="inmigration_rate"
+        )
+        self._mark_lost_probability: float = self._check_valid_probability_value(
+            mark_lost_probability, "mark_lost_probability"
+        )
+
+    def __sample_without_replacement(self, trap_number: int) -> dict[str, np.ndarray]:
+        """Obtain a sample without replacement from every replicate.
+
+        When P(capture|unmarked) = P(capture|marked) the number of captures is binomial and the
+        captured individuals are a simple random sample, so the unmarked ones are hypergeometric.
+        Otherwise, traps are resolved one by one as in CmrPopulation, but for all replicates at once.
+
+        Args:
+            trap_number (int): The number of traps.
+
+        Returns:
+            dict[str, np.ndarray]: Number of marked and unmarked captured individuals per replicate.
+        """
+        population_current_size = self._current_unmarked + self._current_marked
+        if np.any(trap_number > population_current_size):
+            raise Exception("Sample size cannot be bigger than the actual population")
+
+        p_capture_unmarked, p_capture_marked = self._capture_distribution
+        unmarked_sampled = np.zeros(self.replicates, dtype=np.int64)
+
+        if p_capture_unmarked == p_capture_marked:
+            captured = self._random_generator.binomial(
+                trap_number, p_capture_unmarked, size=self.replicates
+            )
+            has_captures = captured > 0
+            unmarked_sampled[has_captures] = self._random_generator.hypergeometric(
+                self._current_unmarked[has_captures],
+                self._current_marked[has_captures],
+                captured[has_captures],
+            )
+            return {
+                self.unmarked_id: unmarked_sampled,
+                self.marked_id: captured - unmarked_sampled,
+            }
+
+        marked_sampled = np.zeros(self.replicates, dtype=np.int64)
+        for _ in range(0, trap_number):
+            p_unmarked = (self._current_unmarked - unmarked_sampled) / (
+                population_current_size - unmarked_sampled - marked_sampled
+            )
+            # A single uniform draw decides both the capture and the kind of individual
+            draw = self._random_generator.random(self.replicates)
+            p_captured_unmarked = p_capture_unmarked * p_unmarked
+            captured_unmarked = draw < p_captured_unmarked
+            captured_marked = ~captured_unmarked & (
+                draw < p_captured_unmarked + p_capture_marked * (1 - p_unmarked)
+            )
+            unmarked_sampled += captured_unmarked
+            marked_sampled += captured_marked
+        return {self.unmarked_id: unmarked_sampled, self.marked_id: marked_sampled}
+
+    def sample_and_mark(self, sample_size: int) -> dict[str, np.ndarray]:
+        # take a sample for each population
+        sample = self.__sample_without_replacement(sample_size)
+
+        # update populations marks state
+        self._current_unmarked = self._current_unmarked - sample[self.unmarked_id]
+        self._current_marked = self._current_marked + sample[self.unmarked_id]
+
+        return sample
+
+    def sample_but_not_mark(self, sample_size: int) -> dict[str, np.ndarray]:
+        return self.__sample_without_replacement(sample_size)
+
+    def time_interlude(self, steps: int = 1):
+        """Describes how the populations change if sampling time is bigger enough.
+
+        Args:
+            steps (int): number of time steps to advance, drawn at once as in CmrPopulation.
+        """
+        self._check_is_natural_number(steps, include_zero=False, msg="steps")
+        if steps > 1:
+            self.__multi_step_interlude(steps)
+            return
+
+        # Individuals that lost their marks
+        lost_marks = self._random_generator.binomial(
+            self._current_marked, self._mark_lost_probability
+        )
+        self._current_unmarked = self._current_unmarked + lost_marks
+        self._current_marked = self._current_marked - lost_marks
+
+        # Dead individuals
+        self._current_unmarked = (
+            self._current_unmarked
+            - self._random_generator.binomial(
+                self._current_unmarked, self._death_distribution[0]
+            )
+        )
+        self._current_marked = self._current_marked - self._random_generator.binomial(
+            self._current_marked, self._death_distribution[1]
+        )
+
+        # Inmigration balance
+        self._current_unmarked = self._current_unmarked + self._inmigration_rate
+
+        # update time counter
+        self._current_time_step += 1
+
+    def __multi_step_interlude(self, steps: int, chunk_elements: int = 2**20):
+        marked_fate, immigrant_survival = CmrPopulation._interlude_probabilities(
+            steps, self._death_distribution, self._mark_lost_probability
+        )
+        marked_outcome = self._random_generator.multinomial(
+            self._current_marked, marked_fate
+        )
+        surviving_unmarked = self._random_generator.binomial(
+            self._current_unmarked,
+            immigrant_survival[-1] * (1 - self._death_distribution[0]),
+        )
+
+        # Immigrant cohorts are drawn in column chunks to bound the (replicates x steps) memory
+        surviving_immigrants = np.zeros(self.replicates, dtype=np.int64)
+        if self._inmigration_rate > 0:
+            chunk_steps = max(chunk_elements // self.replicates, 1)
+            for start in range(0, steps, chunk_steps):
+                survival = immigrant_survival[start : start + chunk_steps]
+                surviving_immigrants += self._random_generator.binomial(
+                    self._inmigration_rate,
+                    survival,
+                    size=(self.replicates, len(survival)),
+                ).sum(axis=1)
+
+        self._current_marked = marked_outcome[:, 0]
+        self._current_unmarked = (
+            surviving_unmarked + marked_outcome[:, 1] + surviving_immigrants
+        )
+        self._current_time_step += steps
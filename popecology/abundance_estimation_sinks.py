@@ -0,0 +1,202 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+import os
+import numpy as np
+from numpy.typing import ArrayLike
+
+
+class ResultSink:
+    """Superclass for writers of simulation results in fixed-size record batches.
+
+    Results are tables given as dictionaries of equal-length columns, like the output of
+    CmrReplicateRunner or the summaries of LincolnPetersen over arrays. Rows are buffered until
+    batch_size rows are available, so memory stays bounded regardless of the total rows written.
+
+    Raises:
+        Exception: columns with different lengths or names than the first table written
+    """
+
+    def __init__(self, path: str, batch_size: int = 100000) -> None:
+        if batch_size <= 0:
+            raise Exception("batch_size:\nMust be a positive value.")
+        self.path: str = path
+        self.batch_size: int = batch_size
+        self.rows_written: int = 0
+        self._column_names: list[str] | None = None
+        self._pending: list[dict[str, np.ndarray]] = []
+        self._pending_rows: int = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, columns: dict[str, ArrayLike]):
+        """Buffers a table and writes every complete batch."""
+        table = {name: np.asarray(values) for name, values in columns.items()}
+        rows = {len(values) for values in table.values()}
+        if len(rows) != 1:
+            raise Exception("All columns must have the same length.")
+        if self._column_names is None:
+            self._column_names = list(table)
+        if list(table) != self._column_names:
+            raise Exception("All tables must have the same columns.")
+
+        self._pending.append(table)
+        self._pending_rows += rows.pop()
+        if self._pending_rows < self.batch_size:
+            return
+
+        # the pending tables are concatenated once, then complete batches are sliced by offset
+        # and only a copy of the remainder is kept, releasing the merged columns
+        merged = self.__merge_pending()
+        offset = 0
+        while self._pending_rows - offset >= self.batch_size:
+            self.__write_rows(merged, offset, offset + self.batch_size)
+            offset += self.batch_size
+        self._pending_rows -= offset
+        self._pending = (
+            [{name: values[offset:].copy() for name, values in merged.items()}]
+            if self._pending_rows
+            else []
+        )
+
+    def close(self):
+        """Writes the remaining rows and closes the output."""
+        if self._pending_rows > 0:
+            self.__write_rows(self.__merge_pending(), 0, self._pending_rows)
+            self._pending = []
+            self._pending_rows = 0
+        self._close()
+
+    def __merge_pending(self) -> dict[str, np.ndarray]:
+        assert self._column_names is not None
+        if len(self._pending) == 1:
+            return self._pending[0]
+        return {
+            name: np.concatenate([table[name] for table in self._pending])
+            for name in self._column_names
+        }
+
+    def __write_rows(self, merged: dict[str, np.ndarray], start: int, stop: int):
+        self._write_batch({name: values[start:stop] for name, values in merged.items()})
+        self.rows_written += stop - start
+
+    def _write_batch(self, columns: dict[str, np.ndarray]):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+    @staticmethod
+    def _import_pyarrow():
+        try:
+            import pyarrow
+            import pyarrow.ipc
+        except ImportError as error:
+            raise ImportError(
+                "Arrow and Parquet sinks require pyarrow, use NpyChunkSink otherwise."
+            ) from error
+        return pyarrow
+
+
+class NpyChunkSink(ResultSink):
+    """Writes every batch as a structured array in its own .npy file inside the path directory.
+
+    It does not need extra dependencies, and read() maps the chunks back without loading them.
+    The directory must be new or empty, so chunks of other runs are never mixed in.
+
+    Raises:
+        Exception: the path directory is not empty
+    """
+
+    CHUNK_NAME: str = "chunk_{:06d}.npy"
+
+    def __init__(self, path: str, batch_size: int = 100000) -> None:
+        super().__init__(path, batch_size)
+        os.makedirs(path, exist_ok=True)
+        if os.listdir(path):
+            raise Exception("path:\nThe chunks directory must be empty.")
+        self._chunk_count: int = 0
+
+    def _write_batch(self, columns: dict[str, np.ndarray]):
+        rows = len(next(iter(columns.values())))
+        chunk = np.empty(
+            rows, dtype=[(name, values.dtype) for name, values in columns.items()]
+        )
+        for name, values in columns.items():
+            chunk[name] = values
+        np.save(
+            os.path.join(self.path, NpyChunkSink.CHUNK_NAME.format(self._chunk_count)),
+            chunk,
+        )
+        self._chunk_count += 1
+
+    @staticmethod
+    def read(path: str) -> list[np.ndarray]:
+        """Memory-mapped chunks in writing order."""
+        chunk_files = sorted(
+            name
+            for name in os.listdir(path)
+            if name.startswith("chunk_") and name.endswith(".npy")
+        )
+        return [
+            np.load(os.path.join(path, name), mmap_mode="r") for name in chunk_files
+        ]
+
+
+class ArrowIpcSink(ResultSink):
+    """Writes the batches as record batches of one Arrow IPC file. Requires pyarrow."""
+
+    def __init__(self, path: str, batch_size: int = 100000) -> None:
+        super().__init__(path, batch_size)
+        self._pyarrow = ResultSink._import_pyarrow()
+        self._writer = None
+
+    def _write_batch(self, columns: dict[str, np.ndarray]):
+        batch = self._pyarrow.record_batch(columns)
+        if self._writer is None:
+            self._writer = self._pyarrow.ipc.new_file(self.path, batch.schema)
+        self._writer.write_batch(batch)
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    @staticmethod
+    def read(path: str):
+        """Zero-copy pyarrow.Table backed by a memory map of the file."""
+        pyarrow = ResultSink._import_pyarrow()
+        return pyarrow.ipc.open_file(pyarrow.memory_map(path)).read_all()
+
+
+class ParquetSink(ResultSink):
+    """Writes the batches as row groups of one Parquet file. Requires pyarrow."""
+
+    def __init__(self, path: str, batch_size: int = 100000) -> None:
+        super().__init__(path, batch_size)
+        self._pyarrow = ResultSink._import_pyarrow()
+        self._writer = None
+
+    def _write_batch(self, columns: dict[str, np.ndarray]):
+        import pyarrow.parquet
+
+        batch = self._pyarrow.record_batch(columns)
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self.path, batch.schema)
+        self._writer.write_batch(batch)
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    @staticmethod
+    def read(path: str):
+        """pyarrow.Table read with a memory map of the file."""
+        ResultSink._import_pyarrow()
+        import pyarrow.parquet
+
+        return pyarrow.parquet.read_table(path, memory_map=True)
@@ -0,0 +1,154 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+import os
+import json
+import hashlib
+import numpy as np
+from itertools import product
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from popecology import __version__
+from popecology.abundance_estimation_parallel import CmrAction
+from popecology.abundance_estimation_parallel import CmrReplicateRunner
+from popecology.random_generators import BitGeneratorType
+
+
+class CmrSweep:
+    """Parameter-grid sweeps of CMR scenarios with an on-disk cache of completed cells.
+
+    A grid maps every CmrPopulation parameter (initial_size, capture_distribution,
+    death_distribution, inmigration_rate, mark_lost_probability) and "protocol" to a list of
+    values; trap numbers are swept through the protocols. Each cell of the grid is run with
+    CmrReplicateRunner and stored in cache_dir under a hash of its parameters, the seed, the
+    block size, the bit generator and the package version, so a rerun only computes the cells
+    that are not in the cache.
+
+    Raises:
+        Exception: missing seed or grid values
+    """
+
+    PROTOCOL_KEY: str = "protocol"
+
+    @staticmethod
+    def expand_grid(grid: dict[str, list]) -> list[dict]:
+        """All the combinations of the grid values, in the order of the grid keys."""
+        for name, values in grid.items():
+            if len(values) == 0:
+                raise Exception("{}:\nMust have at least one value.".format(name))
+        return [dict(zip(grid, values)) for values in product(*grid.values())]
+
+    @staticmethod
+    def cell_key(
+        cell: dict,
+        replicates: int,
+        seed: int,
+        block_size: int = 10000,
+        bit_generator: BitGeneratorType = BitGeneratorType.PCG64,
+    ) -> str:
+        """Hash of a cell, the number of replicates, the seed, the block size and bit generator
+        (both change the random streams of the blocks) and the package version."""
+        content = json.dumps(
+            {
+                "cell": cell,
+                "replicates": replicates,
+                "seed": seed,
+                "block_size": block_size,
+                "bit_generator": BitGeneratorType(bit_generator).value,
+                "version": __version__,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    @staticmethod
+    def run(
+        grid: dict[str, list],
+        replicates: int,
+        seed: int,
+        cache_dir: str,
+        workers: int = 1,
+        block_size: int = 10000,
+        bit_generator: BitGeneratorType = BitGeneratorType.PCG64,
+    ) -> list[tuple[dict, dict[str, np.ndarray]]]:
+        """Runs every cell of the grid that is not cached yet.
+
+        Args:
+            grid (dict[str, list]): values of the CmrPopulation parameters and "protocol".
+            replicates (int): replicates per cell.
+            seed (int): root seed shared by all the cells (common random numbers).
+            cache_dir (str): directory of the cached cells.
+            workers (int): number of processes the missing cells are scheduled on.
+            block_size (int): replicates per block, see CmrReplicateRunner.
+            bit_generator (BitGeneratorType): algorithm of the block generators.
+
+        Returns:
+            list[tuple[dict, dict[str, np.ndarray]]]: each cell with its CmrReplicateRunner table,
+            in grid order.
+        """
+        if seed is None:
+            raise Exception("seed:\nCached sweeps require a fixed seed.")
+        os.makedirs(cache_dir, exist_ok=True)
+
+        cells = CmrSweep.expand_grid(grid)
+        paths = [
+            os.path.join(
+                cache_dir,
+                CmrSweep.cell_key(cell, replicates, seed, block_size, bit_generator)
+                + ".npz",
+            )
+            for cell in cells
+        ]
+        missing = [i for i, path in enumerate(paths) if not os.path.exists(path)]
+
+        arguments = (
+            [cells[i] for i in missing],
+            repeat(replicates),
+            repeat(seed),
+            repeat(block_size),
+            repeat(bit_generator),
+        )
+        if workers == 1:
+            tables = map(CmrSweep.run_cell, *arguments)
+            CmrSweep.__store(tables, [paths[i] for i in missing])
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                tables = executor.map(CmrSweep.run_cell, *arguments)
+                CmrSweep.__store(tables, [paths[i] for i in missing])
+
+        results = []
+        for cell, path in zip(cells, paths):
+            with np.load(path) as cached:
+                results.append((cell, {name: cached[name] for name in cached.files}))
+        return results
+
+    @staticmethod
+    def run_cell(
+        cell: dict,
+        replicates: int,
+        seed: int,
+        block_size: int,
+        bit_generator: BitGeneratorType = BitGeneratorType.PCG64,
+    ) -> dict[str, np.ndarray]:
+        """Runs the replicates of one cell."""
+        population_parameters = {
+            name: value for name, value in cell.items() if name != CmrSweep.PROTOCOL_KEY
+        }
+        protocol = [
+            (CmrAction(action), value) for action, value in cell[CmrSweep.PROTOCOL_KEY]
+        ]
+        return CmrReplicateRunner.run(
+            population_parameters,
+            protocol,
+            replicates,
+            seed=seed,
+            block_size=block_size,
+            bit_generator=bit_generator,
+        )  # type: ignore
+
+    @staticmethod
+    def __store(tables, paths: list[str]):
+        # Written through a temporary file, so an interrupted sweep never leaves broken cells
+        for table, path in zip(tables, paths):
+            temporary_path = path[: -len(".npz")] + ".tmp.npz"
+            np.savez(temporary_path, **table)
+            os.replace(temporary_path, path)
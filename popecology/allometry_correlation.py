@@ -0,0 +1,194 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+import numpy as np
+from numpy.typing import ArrayLike
+from scipy.stats import rankdata
+from popecology.random_generators import GeneratorFactory
+
+
+class SpearmanCorrelation:
+    """Spearman correlation matrices of trait tables with resampling inference.
+
+    Columns are ranked once and standardized, so the correlation matrix is a single matrix
+    product. Permutations and bootstrap resamples are processed in blocks of (resamples,
+    individuals, traits) arrays, with one batched matrix product per block:
+
+    - permutation p-values: every column is shuffled independently, which keeps the ranks and
+    only needs the product; p = (1 + #{|rho*| >= |rho|}) / (permutations + 1).
+    - bootstrap percentile intervals: rows are resampled with replacement and re-ranked.
+
+    Raises:
+        Exception: data without two columns and three rows, or invalid resamples or confidence
+    """
+
+    @staticmethod
+    def __as_data(data: ArrayLike) -> np.ndarray:
+        data = np.asarray(data, dtype=float)
+        if data.ndim != 2 or data.shape[0] < 3 or data.shape[1] < 2:
+            raise Exception("data must have at least 3 rows and 2 columns.")
+        return data
+
+    @staticmethod
+    def __standardize(ranks: np.ndarray) -> np.ndarray:
+        """Centered columns with unit norm along the individuals axis (-2)."""
+        centered = ranks - ranks.mean(axis=-2, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return centered / np.linalg.norm(centered, axis=-2, keepdims=True)
+
+    @staticmethod
+    def __correlation(standardized: np.ndarray) -> np.ndarray:
+        return np.clip(standardized.swapaxes(-1, -2) @ standardized, -1.0, 1.0)
+
+    @staticmethod
+    def correlation_matrix(data: ArrayLike) -> np.ndarray:
+        """Spearman correlations between the columns of data (individuals, traits), with
+        average ranks for ties as scipy.stats.spearmanr."""
+        data = SpearmanCorrelation.__as_data(data)
+        return SpearmanCorrelation.__correlation(
+            SpearmanCorrelation.__standardize(rankdata(data, axis=0))
+        )
+
+    @staticmethod
+    def __blocks(resamples: int, block_size: int):
+        if resamples <= 0 or block_size <= 0:
+            raise Exception("resamples and block_size must be positive values.")
+        for start in range(0, resamples, block_size):
+            yield min(block_size, resamples - start)
+
+    @staticmethod
+    def permutation_p_values(
+        data: ArrayLike,
+        permutations: int = 10000,
+        seed: int | np.random.Generator | None = None,
+        block_size: int = 1000,
+        bonferroni: bool = False,
+    ) -> np.ndarray:
+        """Two-sided permutation p-values of every pair of columns.
+
+        Args:
+            data (ArrayLike): table with shape (individuals, traits).
+            permutations (int): number of permutations.
+            seed (int | np.random.Generator | None): seed or generator.
+            block_size (int): permutations per block.
+            bonferroni (bool): multiply by the number of pairs, as multipletests(method=
+            "bonferroni") in the allometry notebook.
+
+        Returns:
+            np.ndarray: (traits, traits) p-values, zero on the diagonal.
+        """
+        data = SpearmanCorrelation.__as_data(data)
+        individuals, traits = data.shape
+        random_generator = GeneratorFactory.create(seed)
+        standardized = SpearmanCorrelation.__standardize(rankdata(data, axis=0))
+        observed = np.abs(SpearmanCorrelation.__correlation(standardized))
+
+        exceedances = np.zeros((traits, traits), dtype=np.int64)
+        for size in SpearmanCorrelation.__blocks(permutations, block_size):
+            order = random_generator.random((size, individuals, traits)).argsort(axis=1)
+            shuffled = np.take_along_axis(standardized[np.newaxis], order, axis=1)
+            correlations = SpearmanCorrelation.__correlation(shuffled)
+            # tolerance so the permutations equal to the observed order are counted
+            exceedances += (np.abs(correlations) >= observed - 1e-12).sum(axis=0)
+
+        p_values = (1 + exceedances) / (permutations + 1)
+        if bonferroni:
+            p_values = np.minimum(1.0, p_values * traits * (traits - 1) / 2)
+        np.fill_diagonal(p_values, 0.0)
+        return p_values
+
+    @staticmethod
+    def bootstrap_intervals(
+        data: ArrayLike,
+        resamples: int = 10000,
+        confidence: float = 0.95,
+        seed: int | np.random.Generator | None = None,
+        block_size: int = 1000,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Bootstrap percentile confidence intervals of the correlation matrix.
+
+        Args:
+            data (ArrayLike): table with shape (individuals, traits).
+            resamples (int): number of bootstrap resamples.
+            confidence (float): confidence level.
+            seed (int | np.random.Generator | None): seed or generator.
+            block_size (int): resamples per block.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: lower and upper (traits, traits) limits. Resamples
+            with a constant column are ignored.
+        """
+        if not 0 < confidence < 1:
+            raise Exception("confidence:\nMust be in the interval (0, 1).")
+        data = SpearmanCorrelation.__as_data(data)
+        individuals = data.shape[0]
+        random_generator = GeneratorFactory.create(seed)
+
+        correlations = []
+        for size in SpearmanCorrelation.__blocks(resamples, block_size):
+            rows = random_generator.integers(0, individuals, (size, individuals))
+            ranks = rankdata(data[rows], axis=1)
+            correlations.append(
+                SpearmanCorrelation.__correlation(
+                    SpearmanCorrelation.__standardize(ranks)
+                )
+            )
+        tail = (1 - confidence) / 2 * 100
+        lower, upper = np.nanpercentile(
+            np.concatenate(correlations), [tail, 100 - tail], axis=0
+        )
+        return lower, upper
+
+    @staticmethod
+    def iqr_outlier_mask(data: ArrayLike, factor: float = 1.5) -> np.ndarray:
+        """Rows without values outside [Q1 - factor * IQR, Q3 + factor * IQR] in any column,
+        with the linear quartiles of DataFrame.describe.
+
+        Returns:
+            np.ndarray: boolean mask, True for the rows to keep.
+        """
+        data = np.asarray(data, dtype=float)
+        first, third = np.percentile(data, [25, 75], axis=0)
+        iqr = third - first
+        # the tolerance of the allometry notebook for values on the limits
+        tolerance = 1e-15
+        inside = (data - (first - factor * iqr) >= -tolerance) & (
+            data - (third + factor * iqr) <= tolerance
+        )
+        return inside.all(axis=1)
+
+    @staticmethod
+    def analyze(
+        data: ArrayLike,
+        permutations: int = 10000,
+        resamples: int = 10000,
+        confidence: float = 0.95,
+        seed: int | None = None,
+        block_size: int = 1000,
+        bonferroni: bool = True,
+    ) -> dict[str, np.ndarray]:
+        """Correlation matrix with permutation p-values and bootstrap intervals.
+
+        Returns:
+            dict[str, np.ndarray]: (traits, traits) matrices "rho", "p_value", "lower" and
+            "upper".
+        """
+        permutation_seed, bootstrap_seed = GeneratorFactory.spawn(seed, 2)
+        lower, upper = SpearmanCorrelation.bootstrap_intervals(
+            data,
+            resamples,
+            confidence,
+            GeneratorFactory.create(bootstrap_seed),
+            block_size,
+        )
+        return {
+            "rho": SpearmanCorrelation.correlation_matrix(data),
+            "p_value": SpearmanCorrelation.permutation_p_values(
+                data,
+                permutations,
+                GeneratorFactory.create(permutation_seed),
+                block_size,
+                bonferroni,
+            ),
+            "lower": lower,
+            "upper": upper,
+        }
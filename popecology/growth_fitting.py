@@ -0,0 +1,245 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+import numpy as np
+from numpy.typing import ArrayLike
+from popecology.growth_models import Growth
+from popecology.growth_models import SimpleLinear
+
+
+class GrowthFitter:
+    """Least squares fitting of Growth models to many census time series at once.
+
+    Series share one time grid and are the rows of an observations array; missing counts are NaN.
+    The fitted parameters are initial_size followed by the model parameter_names. SimpleLinear
+    has a closed form; other models are fitted with a batched Levenberg-Marquardt, where every
+    series keeps its own damping and steps leaving the valid parameter space are rejected.
+
+    Results are dictionaries of columns, one row per series: the estimates, their standard errors
+    ("<parameter>_standard_error"), the residual sum of squares ("rss") and "converged".
+
+    Raises:
+        Exception: observations without one column per time, or series with fewer valid points
+        than parameters
+    """
+
+    GRADIENT_TOLERANCE: float = 1e-6
+
+    @staticmethod
+    def fit(
+        model_class: type[Growth],
+        time: ArrayLike,
+        observations: ArrayLike,
+        initial_guess: dict[str, ArrayLike] | None = None,
+        max_iterations: int = 200,
+        tolerance: float = 1e-10,
+    ) -> dict[str, np.ndarray]:
+        """Fits model_class to every series, with the closed form when it is SimpleLinear.
+
+        Args:
+            model_class (type[Growth]): the model, e.g. growth_models.Logistic.
+            time (ArrayLike): non-negative times of the observation columns.
+            observations (ArrayLike): sizes with shape (series, times). A 1-D array is one series.
+            initial_guess (dict[str, ArrayLike] | None): starting values by parameter name,
+            scalars or one per series. Missing ones are guessed from the data.
+            max_iterations (int): iterations of Levenberg-Marquardt.
+            tolerance (float): relative decrease of the rss that stops a series.
+
+        Returns:
+            dict[str, np.ndarray]: estimates and statistics, one row per series.
+        """
+        if model_class is SimpleLinear:
+            return GrowthFitter.fit_linear(time, observations)
+        return GrowthFitter.fit_nonlinear(
+            model_class, time, observations, initial_guess, max_iterations, tolerance
+        )
+
+    @staticmethod
+    def __as_series(
+        time: ArrayLike, observations: ArrayLike, parameters: int
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        time = np.asarray(time, dtype=float)
+        observations = np.atleast_2d(np.asarray(observations, dtype=float))
+        if observations.shape[1] != len(time):
+            raise Exception("observations must have one column per time.\n")
+        valid = ~np.isnan(observations)
+        if np.any(valid.sum(axis=1) <= parameters):
+            raise Exception(
+                "Every series needs more valid observations than parameters."
+            )
+        return time, observations, valid
+
+    @staticmethod
+    def fit_linear(time: ArrayLike, observations: ArrayLike) -> dict[str, np.ndarray]:
+        """Closed form least squares of SimpleLinear, initial_size + slope * time."""
+        time, observations, valid = GrowthFitter.__as_series(time, observations, 2)
+        n = valid.sum(axis=1)
+        t = np.where(valid, time, 0.0)
+        y = np.where(valid, observations, 0.0)
+        t_mean = t.sum(axis=1) / n
+        y_mean = y.sum(axis=1) / n
+        t_centered = np.where(valid, time - t_mean[:, np.newaxis], 0.0)
+        s_tt = (t_centered**2).sum(axis=1)
+        slope = (t_centered * y).sum(axis=1) / s_tt
+        initial_size = y_mean - slope * t_mean
+
+        residuals = np.where(
+            valid,
+            observations - initial_size[:, np.newaxis] - slope[:, np.newaxis] * time,
+            0.0,
+        )
+        rss = (residuals**2).sum(axis=1)
+        residual_variance = rss / (n - 2)
+        return {
+            "initial_size": initial_size,
+            "slope": slope,
+            "initial_size_standard_error": np.sqrt(
+                residual_variance * (1 / n + t_mean**2 / s_tt)
+            ),
+            "slope_standard_error": np.sqrt(residual_variance / s_tt),
+            "rss": rss,
+            "converged": np.ones(len(rss), dtype=bool),
+        }
+
+    @staticmethod
+    def __default_guess(
+        name: str, positive: bool, observations: np.ndarray
+    ) -> np.ndarray:
+        if name == "initial_size":
+            first = np.argmax(~np.isnan(observations), axis=1)
+            return np.maximum(observations[np.arange(len(observations)), first], 1e-3)
+        if name == "capacity":
+            return np.nanmax(observations, axis=1) * 1.2
+        # rates and slopes start with slow growth, positive rates are growth factors
+        return np.full(len(observations), 1.1 if positive else 0.1)
+
+    @staticmethod
+    def fit_nonlinear(
+        model_class: type[Growth],
+        time: ArrayLike,
+        observations: ArrayLike,
+        initial_guess: dict[str, ArrayLike] | None = None,
+        max_iterations: int = 200,
+        tolerance: float = 1e-10,
+    ) -> dict[str, np.ndarray]:
+        """Batched Levenberg-Marquardt fit of any Growth model, see fit."""
+        names = ("initial_size",) + model_class.parameter_names
+        time, observations, valid = GrowthFitter.__as_series(
+            time, observations, len(names)
+        )
+        series = len(observations)
+        initial_guess = {} if initial_guess is None else initial_guess
+        positive = np.array(
+            [
+                name == "initial_size" or name in model_class.positive_parameters
+                for name in names
+            ]
+        )
+        theta = np.stack(
+            [
+                (
+                    np.broadcast_to(
+                        np.asarray(initial_guess[name], dtype=float), (series,)
+                    ).copy()
+                    if name in initial_guess
+                    else GrowthFitter.__default_guess(name, is_positive, observations)
+                )
+                for name, is_positive in zip(names, positive)
+            ],
+            axis=1,
+        )
+        if np.any(theta[:, positive] <= 0):
+            raise Exception("Initial guesses of positive parameters must be positive.")
+
+        def predict(theta: np.ndarray) -> np.ndarray:
+            with np.errstate(all="ignore"):
+                model = model_class(theta[:, 0])
+                return model.general_function(time, *theta[:, 1:].T).reshape(
+                    series, len(time)
+                )
+
+        def residuals(theta: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+            r = np.where(valid, observations - predict(theta), 0.0)
+            rss = (r**2).sum(axis=1)
+            return r, np.where(np.isfinite(rss), rss, np.inf)
+
+        def jacobian(theta: np.ndarray) -> np.ndarray:
+            # forward differences, with steps that keep positive parameters positive
+            prediction = predict(theta)
+            steps = 1e-6 * np.maximum(np.abs(theta), 1e-3)
+            columns = []
+            for p in range(theta.shape[1]):
+                shifted = theta.copy()
+                shifted[:, p] += steps[:, p]
+                columns.append(
+                    (predict(shifted) - prediction) / steps[:, p, np.newaxis]
+                )
+            return np.where(valid[:, np.newaxis, :], np.stack(columns, axis=1), 0.0)
+
+        r, rss = residuals(theta)
+        zero_rss = np.finfo(float).eps * (np.where(valid, observations, 0.0) ** 2).sum(
+            axis=1
+        )
+        damping = np.full(series, 1e-3)
+        active = np.isfinite(rss)
+        converged = np.zeros(series, dtype=bool)
+        for _ in range(max_iterations):
+            if not np.any(active):
+                break
+            J = jacobian(theta)
+            JtJ = J @ J.transpose(0, 2, 1)
+            Jtr = (J @ r[:, :, np.newaxis])[:, :, 0]
+            diagonal = np.diagonal(JtJ, axis1=1, axis2=2)
+            # gradient test of MINPACK: residuals orthogonal to every Jacobian column
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cosine = np.abs(Jtr) / np.sqrt(diagonal * rss[:, np.newaxis])
+            orthogonal = np.all(
+                np.nan_to_num(cosine) <= GrowthFitter.GRADIENT_TOLERANCE, axis=1
+            )
+            damped = JtJ + (damping[:, np.newaxis] * np.maximum(diagonal, 1e-12))[
+                :, :, np.newaxis
+            ] * np.eye(len(names))
+            try:
+                delta = np.linalg.solve(damped, Jtr[:, :, np.newaxis])[:, :, 0]
+            except np.linalg.LinAlgError:
+                delta = (np.linalg.pinv(damped) @ Jtr[:, :, np.newaxis])[:, :, 0]
+            delta = np.where(active[:, np.newaxis] & np.isfinite(delta), delta, 0.0)
+
+            candidate = theta + delta
+            invalid = np.any((candidate <= 0) & positive, axis=1)
+            candidate[invalid] = theta[invalid]
+            candidate_r, candidate_rss = residuals(candidate)
+            improved = active & ~invalid & (candidate_rss < rss)
+            decrease = rss - candidate_rss
+
+            theta[improved] = candidate[improved]
+            r[improved] = candidate_r[improved]
+            small_decrease = improved & (decrease <= tolerance * rss)
+            rss[improved] = candidate_rss[improved]
+            damping = np.where(improved, damping / 10, damping * 10)
+
+            # a series converges when the rss barely decreases, is zero (at rounding level) or
+            # the residuals are orthogonal to the Jacobian, and stops without converging when
+            # no step improves it
+            done = small_decrease | (rss <= zero_rss) | orthogonal
+            converged |= active & done
+            active &= ~done & ~(~improved & (damping > 1e10))
+
+        J = jacobian(theta)
+        n = valid.sum(axis=1)
+        residual_variance = rss / (n - len(names))
+        covariance = (
+            np.linalg.pinv(J @ J.transpose(0, 2, 1))
+            * residual_variance[:, np.newaxis, np.newaxis]
+        )
+        standard_errors = np.sqrt(
+            np.maximum(np.diagonal(covariance, axis1=1, axis2=2), 0.0)
+        )
+
+        results: dict[str, np.ndarray] = {
+            name: theta[:, p] for p, name in enumerate(names)
+        }
+        for p, name in enumerate(names):
+            results[name + "_standard_error"] = standard_errors[:, p]
+        results["rss"] = rss
+        results["converged"] = converged
+        return results
@@ -1,23 +1,59 @@
 # python3
 # author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+import numpy as np
+from numpy.typing import ArrayLike
 
 
 class Growth:
-    """Superclass for all models of population Growth. All population must have a positive size at time = 0."""
+    """Superclass for all models of population Growth. All population must have a positive size at time = 0.
 
-    def __init__(self, initial_size: float) -> None:
-        if initial_size <= 0:
+    Models are evaluated over whole arrays: parameters (including initial_size) are broadcast
+    together, and times are an outer axis, so the output has shape parameters.shape + time.shape.
+    Scalar parameters and times give a float. Parameters in positive_parameters must be positive,
+    besides initial_size.
+    """
+
+    parameter_names: tuple[str, ...] = ()
+    positive_parameters: tuple[str, ...] = ()
+
+    def __init__(self, initial_size: ArrayLike) -> None:
+        if np.any(np.asarray(initial_size) <= 0):
             raise Exception("Initial size must be a positive number")
         self.initial_size = initial_size
 
-    def general_function(self, time_point: int | float) -> float:
+    def general_function(self, time_point: ArrayLike) -> float | np.ndarray:
         """A general function f(t), such that t is time and f(t) is the size of the population at time t"""
         raise NotImplementedError
 
-    def time_progression(self) -> float:
+    def time_progression(self) -> float | np.ndarray:
         """A progression in time t, where a_t is the size of the population at time t and a_t(a_{t-1})"""
         raise NotImplementedError
 
+    @staticmethod
+    def _outer(time: ArrayLike, *parameters: ArrayLike) -> tuple[np.ndarray, ...]:
+        """Times and parameters as arrays, with the parameters broadcast together and extended
+        with one axis per time axis."""
+        time = np.asarray(time, dtype=float)
+        parameters = np.broadcast_arrays(
+            *[np.asarray(parameter, dtype=float) for parameter in parameters]
+        )
+        time_axes = (Ellipsis,) + (np.newaxis,) * time.ndim
+        return (time,) + tuple(parameter[time_axes] for parameter in parameters)
+
+    @staticmethod
+    def _check_non_negative_time(time: np.ndarray):
+        if np.any(time < 0):
+            raise Exception("Time must be a non-negative value.")
+
+    @staticmethod
+    def _check_positive_capacity(capacity: np.ndarray):
+        if np.any(capacity <= 0):
+            raise Exception("Capacity must be a positive number")
+
+    @staticmethod
+    def _as_output(values: np.ndarray) -> float | np.ndarray:
+        return float(values) if values.ndim == 0 else values
+
 
 class SimpleLinear(Growth):
     """Describes the population growth as a linear function of the time with infinite capacity.
@@ -26,35 +62,301 @@ class SimpleLinear(Growth):
         Growth (class): Superclass for all population growth models.
     """
 
-    def __init__(self, initial_size: float) -> None:
+    parameter_names: tuple[str, ...] = ("slope",)
+
+    def __init__(self, initial_size: ArrayLike) -> None:
         super().__init__(initial_size)
 
-    def general_function(self, time_point: int | float, slope: int | float) -> float:
+    def general_function(
+        self, time_point: ArrayLike, slope: ArrayLike
+    ) -> float | np.ndarray:
         """Describes the population growth as a function of the time.
 
         Args:
-            time_point (int | float): time of development from the intial obseved state
+            time_point (ArrayLike): time of development from the intial obseved state
             (population size with regard an arbitary initial time = 0).
-            slope (int | float): the growth rate
+            slope (ArrayLike): the growth rate, broadcast with initial_size
 
         Returns:
-            float: The population size at time = time_point.
+            float | np.ndarray: The population size at time = time_point, with shape
+            parameters.shape + time_point.shape.
         """
-        if time_point < 0:
-            raise Exception("Time must be a non-negative value.")
-        return self.initial_size + (slope * time_point)
+        time, initial_size, slope = Growth._outer(time_point, self.initial_size, slope)
+        Growth._check_non_negative_time(time)
+        return Growth._as_output(initial_size + (slope * time))
 
-    def time_progression(self, t_n: int, t_x: int, size_tx: float, common_difference: int | float) -> float:
+    def time_progression(
+        self,
+        t_n: ArrayLike,
+        t_x: ArrayLike,
+        size_tx: ArrayLike,
+        common_difference: ArrayLike,
+    ) -> float | np.ndarray:
         """Represents the population size as a arithmetic progression:
             a_n = a_x + (n - x) * d
 
         Args:
-            t_n (int): _description_
-            t_x (int): _description_
-            size_tx (float): _description_
-            common_difference (int | float): the difference  a_t - a_{t-1}
+            t_n (ArrayLike): time points of the progression
+            t_x (ArrayLike): time of the known population size
+            size_tx (ArrayLike): population size at t_x
+            common_difference (ArrayLike): the difference  a_t - a_{t-1}
+
+        Returns:
+            float | np.ndarray: population size at timepoint t_n, with shape
+            parameters.shape + t_n.shape.
+        """
+        t_n, t_x, size_tx, common_difference = Growth._outer(
+            t_n, t_x, size_tx, common_difference
+        )
+        return Growth._as_output(size_tx + (t_n - t_x) * common_difference)
+
+
+class Exponential(Growth):
+    """Describes the population growth as an exponential function of the time, dN/dt = r * N.
+
+    Args:
+        Growth (class): Superclass for all population growth models.
+    """
+
+    parameter_names: tuple[str, ...] = ("rate",)
+
+    def general_function(
+        self, time_point: ArrayLike, rate: ArrayLike
+    ) -> float | np.ndarray:
+        """N(t) = N_0 * exp(r * t)
+
+        Args:
+            time_point (ArrayLike): non-negative times
+            rate (ArrayLike): intrinsic growth rate r
+
+        Returns:
+            float | np.ndarray: population sizes with shape parameters.shape + time_point.shape.
+        """
+        time, initial_size, rate = Growth._outer(time_point, self.initial_size, rate)
+        Growth._check_non_negative_time(time)
+        return Growth._as_output(initial_size * np.exp(rate * time))
+
+    def time_progression(
+        self, t_n: ArrayLike, t_x: ArrayLike, size_tx: ArrayLike, rate: ArrayLike
+    ) -> float | np.ndarray:
+        """a_n = a_x * exp(r * (n - x))"""
+        t_n, t_x, size_tx, rate = Growth._outer(t_n, t_x, size_tx, rate)
+        return Growth._as_output(size_tx * np.exp(rate * (t_n - t_x)))
+
+
+class Logistic(Growth):
+    """Describes the population growth with a carrying capacity, dN/dt = r * N * (1 - N / K).
+
+    Args:
+        Growth (class): Superclass for all population growth models.
+    """
+
+    parameter_names: tuple[str, ...] = ("rate", "capacity")
+    positive_parameters: tuple[str, ...] = ("capacity",)
+
+    def general_function(
+        self, time_point: ArrayLike, rate: ArrayLike, capacity: ArrayLike
+    ) -> float | np.ndarray:
+        """N(t) = K / (1 + (K - N_0) / N_0 * exp(-r * t))
+
+        Args:
+            time_point (ArrayLike): non-negative times
+            rate (ArrayLike): intrinsic growth rate r
+            capacity (ArrayLike): carrying capacity K
+
+        Returns:
+            float | np.ndarray: population sizes with shape parameters.shape + time_point.shape.
+        """
+        Growth._check_non_negative_time(np.asarray(time_point))
+        return self.time_progression(time_point, 0, self.initial_size, rate, capacity)
+
+    def time_progression(
+        self,
+        t_n: ArrayLike,
+        t_x: ArrayLike,
+        size_tx: ArrayLike,
+        rate: ArrayLike,
+        capacity: ArrayLike,
+    ) -> float | np.ndarray:
+        """a_n = K / (1 + (K - a_x) / a_x * exp(-r * (n - x)))"""
+        t_n, t_x, size_tx, rate, capacity = Growth._outer(
+            t_n, t_x, size_tx, rate, capacity
+        )
+        Growth._check_positive_capacity(capacity)
+        return Growth._as_output(
+            capacity
+            / (1 + (capacity - size_tx) / size_tx * np.exp(-rate * (t_n - t_x)))
+        )
+
+
+class Gompertz(Growth):
+    """Describes the population growth as dN/dt = r * N * ln(K / N).
+
+    Args:
+        Growth (class): Superclass for all population growth models.
+    """
+
+    parameter_names: tuple[str, ...] = ("rate", "capacity")
+    positive_parameters: tuple[str, ...] = ("capacity",)
+
+    def general_function(
+        self, time_point: ArrayLike, rate: ArrayLike, capacity: ArrayLike
+    ) -> float | np.ndarray:
+        """N(t) = K * exp(ln(N_0 / K) * exp(-r * t))
+
+        Args:
+            time_point (ArrayLike): non-negative times
+            rate (ArrayLike): growth rate r
+            capacity (ArrayLike): carrying capacity K
+
+        Returns:
+            float | np.ndarray: population sizes with shape parameters.shape + time_point.shape.
+        """
+        Growth._check_non_negative_time(np.asarray(time_point))
+        return self.time_progression(time_point, 0, self.initial_size, rate, capacity)
+
+    def time_progression(
+        self,
+        t_n: ArrayLike,
+        t_x: ArrayLike,
+        size_tx: ArrayLike,
+        rate: ArrayLike,
+        capacity: ArrayLike,
+    ) -> float | np.ndarray:
+        """a_n = K * exp(ln(a_x / K) * exp(-r * (n - x)))"""
+        t_n, t_x, size_tx, rate, capacity = Growth._outer(
+            t_n, t_x, size_tx, rate, capacity
+        )
+        Growth._check_positive_capacity(capacity)
+        return Growth._as_output(
+            capacity * np.exp(np.log(size_tx / capacity) * np.exp(-rate * (t_n - t_x)))
+        )
+
+
+class DiscreteGrowth(Growth):
+    """Superclass for discrete time models given by a map N_{t+1} = f(N_t).
+
+    iterate applies the map to all the parameter combinations at once, so the Python loop runs
+    over time steps only.
+    """
+
+    def step(self, size: np.ndarray, *parameters: np.ndarray) -> np.ndarray:
+        """One application of the map, N_{t+1} = f(N_t)."""
+        raise NotImplementedError
+
+    def iterate(
+        self, size_tx: ArrayLike, steps: ArrayLike, *parameters: ArrayLike
+    ) -> float | np.ndarray:
+        """Population sizes after a number of steps of the map.
+
+        Args:
+            size_tx (ArrayLike): starting population size, broadcast with the parameters
+            steps (ArrayLike): non-negative integer numbers of steps
+            parameters (ArrayLike): parameters of the map, in parameter_names order
+
+        Returns:
+            float | np.ndarray: population sizes with shape parameters.shape + steps.shape.
+        """
+        steps = np.asarray(steps)
+        if np.any(steps < 0) or np.any(steps != np.round(steps)):
+            raise Exception("Steps must be non-negative integers.")
+        steps = steps.astype(np.int64)
+        size, *parameters = np.broadcast_arrays(
+            *[np.asarray(value, dtype=float) for value in (size_tx, *parameters)]
+        )
+
+        trajectory = np.empty(size.shape + (steps.max(initial=0) + 1,))
+        trajectory[..., 0] = size
+        for t in range(1, trajectory.shape[-1]):
+            trajectory[..., t] = self.step(trajectory[..., t - 1], *parameters)
+        return Growth._as_output(trajectory[..., steps])
+
+
+class Ricker(DiscreteGrowth):
+    """Discrete logistic-like growth, N_{t+1} = N_t * exp(r * (1 - N_t / K)). It has no closed
+    form, so both functions iterate the map.
+
+    Args:
+        DiscreteGrowth (class): Superclass for discrete time models.
+    """
+
+    parameter_names: tuple[str, ...] = ("rate", "capacity")
+    positive_parameters: tuple[str, ...] = ("capacity",)
+
+    def step(
+        self, size: np.ndarray, rate: np.ndarray, capacity: np.ndarray
+    ) -> np.ndarray:
+        return size * np.exp(rate * (1 - size / capacity))
+
+    def general_function(
+        self, time_point: ArrayLike, rate: ArrayLike, capacity: ArrayLike
+    ) -> float | np.ndarray:
+        """Population size at non-negative integer times, from initial_size at time 0."""
+        Growth._check_positive_capacity(np.asarray(capacity))
+        return self.iterate(self.initial_size, time_point, rate, capacity)
+
+    def time_progression(
+        self,
+        t_n: ArrayLike,
+        t_x: int,
+        size_tx: ArrayLike,
+        rate: ArrayLike,
+        capacity: ArrayLike,
+    ) -> float | np.ndarray:
+        """Population size at the integer times t_n >= t_x, starting from size_tx at t_x."""
+        Growth._check_positive_capacity(np.asarray(capacity))
+        return self.iterate(size_tx, np.asarray(t_n) - t_x, rate, capacity)
+
+
+class BevertonHolt(DiscreteGrowth):
+    """Discrete saturating growth, N_{t+1} = R_0 * N_t / (1 + N_t * (R_0 - 1) / K), with the
+    closed form N_t = K * N_0 / (N_0 + (K - N_0) * R_0^-t).
+
+    Args:
+        DiscreteGrowth (class): Superclass for discrete time models.
+    """
+
+    parameter_names: tuple[str, ...] = ("rate", "capacity")
+    positive_parameters: tuple[str, ...] = ("rate", "capacity")
+
+    def step(
+        self, size: np.ndarray, rate: np.ndarray, capacity: np.ndarray
+    ) -> np.ndarray:
+        return rate * size / (1 + size * (rate - 1) / capacity)
+
+    def general_function(
+        self, time_point: ArrayLike, rate: ArrayLike, capacity: ArrayLike
+    ) -> float | np.ndarray:
+        """N_t = K * N_0 / (N_0 + (K - N_0) * R_0^-t)
+
+        Args:
+            time_point (ArrayLike): non-negative times
+            rate (ArrayLike): growth factor R_0, positive
+            capacity (ArrayLike): carrying capacity K
 
         Returns:
-            float: population size at timepoint t_n
+            float | np.ndarray: population sizes with shape parameters.shape + time_point.shape.
         """
-        return size_tx + (t_n - t_x) * common_difference
+        Growth._check_non_negative_time(np.asarray(time_point))
+        return self.time_progression(time_point, 0, self.initial_size, rate, capacity)
+
+    def time_progression(
+        self,
+        t_n: ArrayLike,
+        t_x: ArrayLike,
+        size_tx: ArrayLike,
+        rate: ArrayLike,
+        capacity: ArrayLike,
+    ) -> float | np.ndarray:
+        """a_n = K * a_x / (a_x + (K - a_x) * R_0^-(n - x))"""
+        t_n, t_x, size_tx, rate, capacity = Growth._outer(
+            t_n, t_x, size_tx, rate, capacity
+        )
+        Growth._check_positive_capacity(capacity)
+        if np.any(rate <= 0):
+            raise Exception("Rate must be a positive number")
+        return Growth._as_output(
+            capacity
+            * size_tx
+            / (size_tx + (capacity - size_tx) * np.power(rate, -(t_n - t_x)))
+        )
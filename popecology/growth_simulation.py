@@ -0,0 +1,209 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+import numpy as np
+from copy import copy
+from enum import Enum
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from popecology.growth_models import Growth
+from popecology.random_generators import BitGeneratorType
+from popecology.random_generators import GeneratorFactory
+
+
+class DemographicNoise(str, Enum):
+    NONE = "none"
+    POISSON = "poisson"
+    BINOMIAL = "binomial"
+
+
+class GrowthSimulator:
+    """Stochastic replicate trajectories of any Growth model.
+
+    Every time step, the expected size of all the replicates is model.time_progression(t + 1, t,
+    N_t, **parameters), computed as one array. It is multiplied by a lognormal environmental noise
+    with mean 1, and the next size is drawn with the demographic noise:
+
+    - DemographicNoise.NONE: the expected size itself.
+    - DemographicNoise.POISSON: Poisson(expected size).
+    - DemographicNoise.BINOMIAL: Binomial(N_t, survival) survivors plus Poisson recruits, with
+    survival = min(1, expected / N_t) and recruits = max(0, expected - N_t).
+
+    Replicates are split in blocks with their own generators, as in CmrReplicateRunner, so the
+    same seed gives the same trajectories regardless of the number of workers.
+
+    Raises:
+        Exception: invalid noise, time steps, replicates, block size or workers
+    """
+
+    INVALID_NOISE: str = "Choose a valid DemographicNoise.\n"
+
+    @staticmethod
+    def run(
+        model: Growth,
+        parameters: dict,
+        time_steps: int,
+        replicates: int,
+        demographic_noise: DemographicNoise = DemographicNoise.POISSON,
+        environmental_sd: float = 0.0,
+        seed: int | None = None,
+        workers: int = 1,
+        block_size: int = 100000,
+        bit_generator: BitGeneratorType = BitGeneratorType.PCG64,
+        dtype: type = np.float64,
+    ) -> np.ndarray:
+        """Simulates all the replicates, optionally over several processes.
+
+        Args:
+            model (Growth): model with the initial size, a scalar or one per replicate.
+            parameters (dict): keyword arguments of model.time_progression besides the times and
+            size, e.g. {"rate": 0.1, "capacity": 500} for Logistic. Scalars or one value per
+            replicate.
+            time_steps (int): number of steps after time 0.
+            replicates (int): number of trajectories.
+            demographic_noise (DemographicNoise): distribution of the sizes.
+            environmental_sd (float): standard deviation of the log environmental noise.
+            seed (int | None): root seed. Fresh entropy is used when None.
+            workers (int): number of processes. With 1, blocks run in the calling process.
+            block_size (int): replicates per block.
+            bit_generator (BitGeneratorType): algorithm of the block generators.
+            dtype (type): output type, e.g. np.float32 halves the memory of large ensembles.
+
+        Returns:
+            np.ndarray: sizes with shape (replicates, time_steps + 1).
+        """
+        if not isinstance(demographic_noise, DemographicNoise):
+            raise Exception(GrowthSimulator.INVALID_NOISE)
+        if replicates <= 0 or block_size <= 0 or workers <= 0 or time_steps < 0:
+            raise Exception(
+                "replicates, workers and block_size must be positive values, and time_steps"
+                " non negative."
+            )
+        if environmental_sd < 0:
+            raise Exception("environmental_sd:\nMust be a non negative value.")
+
+        block_sizes = [block_size] * (replicates // block_size)
+        if replicates % block_size:
+            block_sizes.append(replicates % block_size)
+        block_seeds = GeneratorFactory.spawn(seed, len(block_sizes))
+        block_starts = np.cumsum([0] + block_sizes[:-1])
+        block_models = [
+            GrowthSimulator.__replicate_slice(model, replicates, start, size)
+            for start, size in zip(block_starts, block_sizes)
+        ]
+        block_parameters = [
+            {
+                name: GrowthSimulator.__replicate_slice(value, replicates, start, size)
+                for name, value in parameters.items()
+            }
+            for start, size in zip(block_starts, block_sizes)
+        ]
+
+        arguments = (
+            block_models,
+            block_parameters,
+            repeat(time_steps),
+            block_sizes,
+            block_seeds,
+            repeat(demographic_noise),
+            repeat(environmental_sd),
+            repeat(bit_generator),
+            repeat(dtype),
+        )
+        trajectories = np.empty((replicates, time_steps + 1), dtype=dtype)
+        if workers == 1:
+            blocks = map(GrowthSimulator.simulate_block, *arguments)
+            GrowthSimulator.__collect(blocks, trajectories)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                blocks = executor.map(GrowthSimulator.simulate_block, *arguments)
+                GrowthSimulator.__collect(blocks, trajectories)
+        return trajectories
+
+    @staticmethod
+    def __replicate_slice(value, replicates: int, start: int, size: int):
+        """Replicates start to start + size of a per-replicate array, or of the initial_size
+        of a model. Scalars are shared by all the blocks."""
+        if isinstance(value, Growth):
+            block_model = copy(value)
+            block_model.initial_size = GrowthSimulator.__replicate_slice(
+                value.initial_size, replicates, start, size
+            )
+            return block_model
+        if np.ndim(value) == 0:
+            return value
+        return np.broadcast_to(np.asarray(value), (replicates,))[start : start + size]
+
+    @staticmethod
+    def __collect(blocks, trajectories: np.ndarray):
+        start = 0
+        for block in blocks:
+            trajectories[start : start + len(block)] = block
+            start += len(block)
+
+    @staticmethod
+    def simulate_block(
+        model: Growth,
+        parameters: dict,
+        time_steps: int,
+        replicates: int,
+        seed_sequence: np.random.SeedSequence | int | None,
+        demographic_noise: DemographicNoise = DemographicNoise.POISSON,
+        environmental_sd: float = 0.0,
+        bit_generator: BitGeneratorType = BitGeneratorType.PCG64,
+        dtype: type = np.float64,
+    ) -> np.ndarray:
+        """Simulates one block of replicates with its own generator."""
+        random_generator = GeneratorFactory.create(seed_sequence, bit_generator)
+        trajectories = np.empty((replicates, time_steps + 1), dtype=dtype)
+        size = np.broadcast_to(
+            np.asarray(model.initial_size, dtype=float), (replicates,)
+        ).copy()
+        if demographic_noise != DemographicNoise.NONE:
+            size = np.round(size)
+        trajectories[:, 0] = size
+
+        for t in range(time_steps):
+            alive = size > 0
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                expected = model.time_progression(t + 1, t, size, **parameters)
+                expected = np.where(alive, np.nan_to_num(expected, posinf=0.0), 0.0)
+            expected = np.maximum(expected, 0.0)
+            if environmental_sd > 0:
+                expected *= np.exp(
+                    random_generator.normal(
+                        -(environmental_sd**2) / 2, environmental_sd, replicates
+                    )
+                )
+
+            if demographic_noise == DemographicNoise.POISSON:
+                size = random_generator.poisson(expected).astype(float)
+            elif demographic_noise == DemographicNoise.BINOMIAL:
+                current = size.astype(np.int64)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    survival = np.where(
+                        alive, np.minimum(1.0, expected / np.maximum(size, 1)), 0.0
+                    )
+                size = random_generator.binomial(current, survival) + (
+                    random_generator.poisson(np.maximum(expected - size, 0.0))
+                )
+                size = size.astype(float)
+            else:
+                size = expected
+            trajectories[:, t + 1] = size
+        return trajectories
+
+    @staticmethod
+    def quasi_extinction_probability(
+        trajectories: np.ndarray, threshold: float = 1.0
+    ) -> np.ndarray:
+        """Fraction of the replicates that fell below threshold at or before every time.
+
+        Args:
+            trajectories (np.ndarray): sizes with shape (replicates, times).
+            threshold (float): quasi-extinction size, 1 for extinction of count trajectories.
+
+        Returns:
+            np.ndarray: non-decreasing probabilities, one per time.
+        """
+        fallen = np.minimum.accumulate(trajectories, axis=1) < threshold
+        return fallen.mean(axis=0)
@@ -0,0 +1,51 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+import numpy as np
+from enum import Enum
+
+
+class BitGeneratorType(str, Enum):
+    PCG64 = "PCG64"
+    PCG64DXSM = "PCG64DXSM"
+    PHILOX = "Philox"
+    SFC64 = "SFC64"
+
+
+class GeneratorFactory:
+    """Builds numpy Generators for the simulation models.
+
+    Raises:
+        Exception: requested invalid bit generator
+    """
+
+    INVALID_TYPE: str = "Choose a valid bit generator.\n"
+
+    @staticmethod
+    def create(
+        seed: int | np.random.SeedSequence | np.random.Generator | None = None,
+        bit_generator: BitGeneratorType = BitGeneratorType.PCG64,
+    ) -> np.random.Generator:
+        """Returns a Generator. An existing Generator is returned unchanged.
+
+        Args:
+            seed (int | np.random.SeedSequence | np.random.Generator | None): seed of the new
+            generator. Fresh entropy is used when None.
+            bit_generator (BitGeneratorType): algorithm of the new generator.
+
+        Returns:
+            np.random.Generator: the generator
+        """
+        if isinstance(seed, np.random.Generator):
+            return seed
+        if not isinstance(bit_generator, BitGeneratorType):
+            raise Exception(GeneratorFactory.INVALID_TYPE)
+        return np.random.Generator(getattr(np.random, bit_generator.value)(seed))
+
+    @staticmethod
+    def spawn(
+        seed: int | np.random.SeedSequence | None, number: int
+    ) -> list[np.random.SeedSequence]:
+        """Independent child seed sequences of a root seed, in a fixed order."""
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        return seed.spawn(number)
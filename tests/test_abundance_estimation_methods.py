@@ -2,7 +2,9 @@
 # author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
 
 from popecology import abundance_estimation_methods as aem
+from popecology.abundance_estimation_population_models import CmrPopulation
 from numpy import isnan
+import numpy as np
 import pytest
 
 # Validator
@@ -74,3 +76,203 @@ def test_LincolnPetersen_chapman():
         abs(chapman_summary[aem.LincolnPetersen.standard_error_id] - 35.8236421003)
         <= 0.0000000005
     )
+
+
+def test_validator_check_non_negative_value_arrays():
+    with pytest.raises(Exception):
+        aem.Validator.check_non_negative_value([np.array([1, 2]), np.array([3, -1])])
+    aem.Validator.check_non_negative_value([np.array([1, 2]), 0])
+
+
+def test_LincolnPetersen_simple_arrays():
+    estimator = aem.LincolnPetersen.simple_biased_statistic(
+        np.array([87, 87]), np.array([7, 7]), np.array([7, 0])
+    )
+    assert abs(estimator[0] - 174) <= 0.0000000005
+    assert isnan(estimator[1])
+
+
+def test_LincolnPetersen_summaries_arrays_match_scalars():
+    captured = np.array([87, 50, 12])
+    recaptured_unmarked = np.array([7, 20, 3])
+    recaptured_marked = np.array([7, 0, 4])
+    for summary_method in [
+        aem.LincolnPetersen.bailey_unbiased_summary,
+        aem.LincolnPetersen.chapman_unbiased_summary,
+    ]:
+        columns = summary_method(captured, recaptured_unmarked, recaptured_marked)
+        for i in range(len(captured)):
+            summary = summary_method(
+                int(captured[i]), int(recaptured_unmarked[i]), int(recaptured_marked[i])
+            )
+            for key, value in summary.items():
+                assert abs(columns[key][i] - value) <= 0.0000000005
+
+
+def test_LincolnPetersen_arrays_raises_exception():
+    with pytest.raises(Exception):
+        aem.LincolnPetersen.chapman_unbiased_summary([87, 10], [7, -2], [7, 1])
+
+
+# SchnabelAccumulator
+
+captured_sessions = [10, 15, 12, 20]
+recaptured_sessions = [0, 3, 4, 8]
+
+
+def test_SchnabelAccumulator_estimators():
+    accumulator = aem.SchnabelAccumulator()
+    for captured, recaptured in zip(captured_sessions, recaptured_sessions):
+        accumulator.add_session(captured, recaptured)
+    # marked before each session: 0, 10, 22, 30
+    schnabel = accumulator.schnabel_summary()
+    assert schnabel["abundance"] == pytest.approx(1014 / 15)
+    assert schnabel["sd_error"] == pytest.approx((1014 / 15) ** 2 * np.sqrt(15) / 1014)
+    schumacher = accumulator.schumacher_eschmeyer_summary()
+    assert schumacher["abundance"] == pytest.approx(25308 / 358)
+    variance = (0.6 + 16 / 12 + 3.2 - 358**2 / 25308) / 2
+    assert schumacher["sd_error"] == pytest.approx(
+        (25308 / 358) ** 2 * np.sqrt(variance / 25308)
+    )
+
+
+def test_SchnabelAccumulator_arrays_and_undefined_values():
+    accumulator = aem.SchnabelAccumulator()
+    accumulator.add_session([10, 10], [0, 0])
+    accumulator.add_session([15, 15], [3, 0])
+    summary = accumulator.schnabel_summary()
+    assert summary["abundance"][0] == pytest.approx(50)
+    assert isnan(summary["abundance"][1])
+    assert isnan(accumulator.schumacher_eschmeyer_summary()["sd_error"][0])
+    with pytest.raises(Exception):
+        accumulator.add_session(3, 4)
+
+
+def test_SchnabelAccumulator_from_record_matches_streaming():
+    population = CmrPopulation(500, (0.1, 0.1), (0.0, 0.0), 0, 0.0, random_generator=5)
+    accumulator = aem.SchnabelAccumulator()
+    for sample_size in [300, 300, 300, 300]:
+        sample = population.sample_and_mark(sample_size)
+        accumulator.add_session(sample["unmarked"] + sample["marked"], sample["marked"])
+    population.time_interlude()
+    sample = population.sample_but_not_mark(300)
+    accumulator.add_session(sample["unmarked"] + sample["marked"], sample["marked"], 0)
+
+    from_record = aem.SchnabelAccumulator.from_record(population)
+    assert from_record.sessions == 5
+    for summary in ["schnabel_summary", "schumacher_eschmeyer_summary"]:
+        expected = getattr(accumulator, summary)()
+        for key, value in getattr(from_record, summary)().items():
+            assert value == pytest.approx(expected[key])
+
+
+# JollySeber
+
+
+def simulate_histories(random_generator, datasets, individuals, occasions, phi, p):
+    entry = random_generator.integers(0, occasions - 1, (datasets, individuals))
+    time = np.arange(occasions)
+    survived = random_generator.random((datasets, individuals, occasions)) < phi
+    alive = (time >= entry[..., np.newaxis]) & np.logical_and.accumulate(
+        survived | (time <= entry[..., np.newaxis]), axis=-1
+    )
+    return alive & (random_generator.random(alive.shape) < p)
+
+
+def test_JollySeber_sufficient_statistics():
+    histories = np.array([[1, 1, 0, 1, 0], [0, 1, 0, 0, 1], [0, 0, 0, 0, 0]])
+    statistics = aem.JollySeber.sufficient_statistics(histories)
+    assert statistics["captured"][0].tolist() == [1, 2, 0, 1, 1]
+    assert statistics["marked"][0].tolist() == [0, 1, 0, 1, 1]
+    assert statistics["recaptured_later"][0].tolist() == [1, 2, 0, 0, 0]
+    assert statistics["missed_between"][0].tolist() == [0, 0, 2, 1, 0]
+    assert statistics["at_risk"][0].tolist() == [1, 2, 2, 1, 0]
+    assert statistics["last"][0].tolist() == [0, 0, 0, 1, 1]
+    with pytest.raises(Exception):
+        aem.JollySeber.sufficient_statistics(np.ones((4, 2)))
+
+
+def test_JollySeber_likelihood_matches_individual_histories_and_gradient():
+    random_generator = np.random.default_rng(2)
+    occasions = 5
+    histories = random_generator.random((1, 50, occasions)) < 0.4
+    phi = random_generator.uniform(0.3, 0.9, occasions - 1)
+    p = random_generator.uniform(0.3, 0.9, occasions - 1)
+    log_likelihood = 0.0
+    for row in histories[0]:
+        if not row.any():
+            continue
+        first = np.argmax(row)
+        last = occasions - 1 - np.argmax(row[::-1])
+        log_likelihood += np.log(phi[first:last]).sum()
+        log_likelihood += np.log(np.where(row[1:], p, 1 - p)[first:last]).sum()
+        chi = 1.0
+        for t in range(occasions - 2, last - 1, -1):
+            chi = 1 - phi[t] + phi[t] * (1 - p[t]) * chi
+        log_likelihood += np.log(chi)
+
+    statistics = aem.JollySeber.sufficient_statistics(histories)
+    logits = np.log(np.concatenate((phi, p)) / (1 - np.concatenate((phi, p))))[
+        np.newaxis
+    ]
+    model = aem.CaptureHistoryModel.TIME_DEPENDENT
+    value, gradient = aem.JollySeber.negative_log_likelihood(logits, statistics, model)
+    assert value[0] == pytest.approx(-log_likelihood)
+    for j in range(logits.shape[1]):
+        shifted = logits.copy()
+        shifted[0, j] += 1e-6
+        difference = (
+            aem.JollySeber.negative_log_likelihood(shifted, statistics, model)[0]
+            - value
+        ) / 1e-6
+        assert gradient[0, j] == pytest.approx(difference[0], abs=1e-4)
+
+
+def test_JollySeber_fit_recovers_parameters_of_a_batch():
+    histories = simulate_histories(np.random.default_rng(1), 50, 400, 6, 0.8, 0.5)
+    for model in aem.CaptureHistoryModel:
+        results = aem.JollySeber.fit(histories, model)
+        assert results["converged"].all()
+        assert results["survival"].shape == (50, 5)
+        assert np.nanmean(results["survival"]) == pytest.approx(0.8, abs=0.02)
+        assert np.nanmean(results["capture_probability"]) == pytest.approx(
+            0.5, abs=0.02
+        )
+        assert isnan(results["capture_probability"][:, 0]).all()
+    assert isnan(results["survival"][:, -1]).all()
+    assert np.std(results["survival"][:, 1]) == pytest.approx(
+        np.mean(results["survival_standard_error"][:, 1]), rel=0.3
+    )
+
+    single = aem.JollySeber.fit(histories[0])
+    assert single["survival"].shape == (5,)
+    assert single["abundance"][1:] == pytest.approx(
+        histories[0].sum(axis=0)[1:] / single["capture_probability"][1:]
+    )
+
+
+def test_JollySeber_moment_estimates():
+    histories = simulate_histories(np.random.default_rng(3), 20, 400, 6, 0.8, 0.5)
+    estimates = aem.JollySeber.moment_estimates(histories)
+    assert np.nanmean(estimates["survival"]) == pytest.approx(0.8, abs=0.03)
+    assert isnan(estimates["abundance"][:, [0, -1]]).all()
+    assert isnan(estimates["survival"][:, -2:]).all()
+
+
+def test_JollySeber_fit_sparse_data_and_datasets_without_captures():
+    histories = simulate_histories(np.random.default_rng(5), 100, 30, 6, 0.7, 0.3)
+    histories[0] = False
+    statistics = aem.JollySeber.sufficient_statistics(histories)
+    recaptured = statistics["marked"].sum(axis=1) > 0
+    for model in aem.CaptureHistoryModel:
+        results = aem.JollySeber.fit(histories, model)
+        assert not results["converged"][0]
+        assert isnan(results["survival"][0]).all()
+        assert isnan(results["log_likelihood"][0])
+        assert np.array_equal(results["converged"], recaptured)
+        for name in ["survival", "capture_probability"]:
+            estimates = results[name][1:]
+            errors = results[name + "_standard_error"][1:]
+            on_boundary = (estimates < 1e-8) | (estimates > 1 - 1e-8)
+            assert isnan(errors[on_boundary]).all()
+            assert np.all(errors[~isnan(errors)] > 0)
@@ -0,0 +1,55 @@
+from popecology import abundance_estimation_parallel as aep
+import numpy as np
+import pytest
+
+population_parameters = {
+    "initial_size": 500,
+    "capture_distribution": (0.082, 0.1),
+    "death_distribution": (0.1, 0.1),
+    "inmigration_rate": 5,
+    "mark_lost_probability": 0.05,
+}
+protocol = [
+    (aep.CmrAction.SAMPLE_AND_MARK, 100),
+    (aep.CmrAction.TIME_INTERLUDE, 2),
+    (aep.CmrAction.SAMPLE_BUT_NOT_MARK, 100),
+]
+
+
+def test_CmrReplicateRunner_table_shape():
+    table = aep.CmrReplicateRunner.run(
+        population_parameters, protocol, replicates=250, seed=3, block_size=100
+    )
+    assert set(table) == {
+        "sample_0_unmarked",
+        "sample_0_marked",
+        "sample_1_unmarked",
+        "sample_1_marked",
+    }
+    assert all(len(column) == 250 for column in table.values())
+    assert np.all(table["sample_0_marked"] == 0)
+
+
+def test_CmrReplicateRunner_same_seed_any_worker_number():
+    single = aep.CmrReplicateRunner.run(
+        population_parameters, protocol, replicates=250, seed=3, block_size=100
+    )
+    parallel = aep.CmrReplicateRunner.run(
+        population_parameters,
+        protocol,
+        replicates=250,
+        seed=3,
+        workers=2,
+        block_size=100,
+    )
+    for column in single:
+        assert np.array_equal(single[column], parallel[column])
+
+
+def test_CmrReplicateRunner_fails_for_invalid_protocol():
+    with pytest.raises(Exception):
+        aep.CmrReplicateRunner.run(
+            population_parameters, [("sample_and_mark", 10)], replicates=10  # type: ignore
+        )
+    with pytest.raises(Exception):
+        aep.CmrReplicateRunner.run(population_parameters, protocol, replicates=0)
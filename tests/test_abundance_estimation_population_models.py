@@ -1,4 +1,5 @@
 from popecology import abundance_estimation_population_models as aspm
+import numpy as np
 import pytest
 
 # Test SamplingPopulation superclass
@@ -168,3 +169,317 @@ def test_CmrPopulation_sample_and_mark_cannot_capture_unmarked():
     )
     myPopulation.sample_and_mark(10)
     assert myPopulation._current_unmarked == 15
+
+
+# Test CmrPopulation vectorized sampling engine
+
+
+def test_fails_to_create_CmrPopulation_invalid_sampling_engine():
+    with pytest.raises(Exception):
+        aspm.CmrPopulation(
+            initial_size=10,
+            capture_distribution=(0.5, 0.5),
+            death_distribution=(0.5, 0.5),
+            inmigration_rate=0,
+            mark_lost_probability=0,
+            sampling_engine="fast",  # type: ignore
+        )
+
+
+def test_CmrPopulation_vectorized_sample_and_mark_sample_size_equals_to_pop_size():
+    myPopulation = aspm.CmrPopulation(
+        initial_size=10,
+        capture_distribution=(1, 0.5),
+        death_distribution=(0.5, 0.5),
+        inmigration_rate=0,
+        mark_lost_probability=0,
+        sampling_engine=aspm.SamplingEngine.VECTORIZED,
+    )
+    sample = myPopulation.sample_and_mark(10)
+    assert sample == {"unmarked": 10, "marked": 0}
+    assert myPopulation._current_unmarked == 0
+
+
+def test_CmrPopulation_vectorized_sample_and_mark_cannot_capture_unmarked():
+    myPopulation = aspm.CmrPopulation(
+        initial_size=15,
+        capture_distribution=(0, 1),
+        death_distribution=(0.5, 0.5),
+        inmigration_rate=0,
+        mark_lost_probability=0,
+        sampling_engine=aspm.SamplingEngine.VECTORIZED,
+    )
+    myPopulation.sample_and_mark(10)
+    assert myPopulation._current_unmarked == 15
+
+
+def test_CmrPopulation_vectorized_sample_matches_sequential_mean():
+    def mean_recaptures(engine):
+        generator = np.random.default_rng(7)
+        recaptures = []
+        for _ in range(2000):
+            myPopulation = aspm.CmrPopulation(
+                initial_size=200,
+                capture_distribution=(0.3, 0.7),
+                death_distribution=(0, 0),
+                inmigration_rate=0,
+                mark_lost_probability=0,
+                sampling_engine=engine,
+                random_generator=generator,
+            )
+            myPopulation.sample_and_mark(60)
+            sample = myPopulation.sample_but_not_mark(80)
+            recaptures.append([sample["unmarked"], sample["marked"]])
+        return np.mean(recaptures, axis=0)
+
+    sequential = mean_recaptures(aspm.SamplingEngine.SEQUENTIAL)
+    vectorized = mean_recaptures(aspm.SamplingEngine.VECTORIZED)
+    assert np.all(np.abs(sequential - vectorized) < 0.5)
+
+
+# Test CmrEnsemble
+
+
+def test_create_CmrEnsemble_instance_with_correct_state():
+    myEnsemble = aspm.CmrEnsemble(
+        initial_size=10,
+        capture_distribution=(0.5, 0.1),
+        death_distribution=(0.5, 0.3),
+        inmigration_rate=3,
+        mark_lost_probability=0.3,
+        replicates=4,
+    )
+    assert np.array_equal(myEnsemble._current_unmarked, [10, 10, 10, 10])
+    assert np.array_equal(myEnsemble._current_marked, [0, 0, 0, 0])
+    assert myEnsemble._capture_distribution == (0.5, 0.1)
+
+
+def test_fails_to_create_CmrEnsemble_invalid_parameters():
+    parameters = {
+        "initial_size": 10,
+        "capture_distribution": (0.5, 0.5),
+        "death_distribution": (0.5, 0.5),
+        "inmigration_rate": 0,
+        "mark_lost_probability": 0,
+        "replicates": 5,
+    }
+    for name, invalid_value in [
+        ("capture_distribution", (0.5, 15)),
+        ("death_distribution", (-1, 0.5)),
+        ("inmigration_rate", -3),
+        ("mark_lost_probability", 2),
+        ("replicates", 0),
+    ]:
+        with pytest.raises(Exception):
+            aspm.CmrEnsemble(**{**parameters, name: invalid_value})
+
+
+def test_CmrEnsemble_sample_and_mark_fails_for_invalid_size():
+    myEnsemble = aspm.CmrEnsemble(5, (1, 0.5), (0.5, 0.5), 0, 0, replicates=3)
+    with pytest.raises(Exception):
+        myEnsemble.sample_and_mark(10)
+
+
+def test_CmrEnsemble_sample_and_mark_sample_size_equals_to_pop_size():
+    myEnsemble = aspm.CmrEnsemble(10, (1, 0.5), (0.5, 0.5), 0, 0, replicates=3)
+    sample = myEnsemble.sample_and_mark(10)
+    assert np.array_equal(sample["unmarked"], [10, 10, 10])
+    assert np.array_equal(myEnsemble._current_unmarked, [0, 0, 0])
+    assert np.array_equal(myEnsemble._current_marked, [10, 10, 10])
+
+
+def test_CmrEnsemble_recaptures_match_CmrPopulation_mean():
+    generator = np.random.default_rng(11)
+    for capture_distribution in [(0.3, 0.7), (0.4, 0.4)]:
+        recaptures = []
+        for _ in range(2000):
+            myPopulation = aspm.CmrPopulation(
+                200, capture_distribution, (0, 0), 0, 0, random_generator=generator
+            )
+            myPopulation.sample_and_mark(60)
+            sample = myPopulation.sample_but_not_mark(80)
+            recaptures.append([sample["unmarked"], sample["marked"]])
+
+        myEnsemble = aspm.CmrEnsemble(
+            200,
+            capture_distribution,
+            (0, 0),
+            0,
+            0,
+            replicates=20000,
+            random_generator=generator,
+        )
+        myEnsemble.sample_and_mark(60)
+        sample = myEnsemble.sample_but_not_mark(80)
+        ensemble_mean = [sample["unmarked"].mean(), sample["marked"].mean()]
+        assert np.all(np.abs(np.mean(recaptures, axis=0) - ensemble_mean) < 0.5)
+
+
+def test_CmrEnsemble_time_interlude():
+    myEnsemble = aspm.CmrEnsemble(10, (1, 1), (1, 0), 7, 0, replicates=3)
+    myEnsemble.sample_and_mark(4)
+    myEnsemble.time_interlude()
+    assert myEnsemble._current_time_step == 1
+    assert np.array_equal(myEnsemble._current_unmarked, [7, 7, 7])
+    assert np.array_equal(myEnsemble._current_marked, [4, 4, 4])
+
+
+# Test random generators
+
+
+def test_CmrPopulation_same_seed_same_samples():
+    for engine in aspm.SamplingEngine:
+        samples = []
+        for _ in range(2):
+            myPopulation = aspm.CmrPopulation(
+                initial_size=300,
+                capture_distribution=(0.3, 0.6),
+                death_distribution=(0.1, 0.1),
+                inmigration_rate=2,
+                mark_lost_probability=0.1,
+                sampling_engine=engine,
+                random_generator=42,
+                bit_generator=aspm.BitGeneratorType.PHILOX,
+            )
+            myPopulation.sample_and_mark(50)
+            myPopulation.time_interlude()
+            samples.append(myPopulation.sample_but_not_mark(50))
+        assert samples[0] == samples[1]
+
+
+def test_fails_to_create_CmrPopulation_invalid_bit_generator():
+    with pytest.raises(Exception):
+        aspm.CmrPopulation(10, (0.5, 0.5), (0.5, 0.5), 0, 0, random_generator=1, bit_generator="MT")  # type: ignore
+
+
+# Test CmrRecord
+
+
+def test_CmrRecord_grows_and_returns_view():
+    myRecord = aspm.CmrRecord(initial_capacity=2)
+    for time in range(5):
+        myRecord.append(time, aspm.CmrEvent.TIME_INTERLUDE, 10 - time, time)
+    records = myRecord.to_numpy()
+    assert len(myRecord) == 5
+    assert np.array_equal(records["time"], [0, 1, 2, 3, 4])
+    assert np.array_equal(records["unmarked"], [10, 9, 8, 7, 6])
+    assert np.shares_memory(records, myRecord._data)
+
+
+def test_CmrPopulation_records():
+    myPopulation = aspm.CmrPopulation(
+        initial_size=10,
+        capture_distribution=(1, 1),
+        death_distribution=(0, 0),
+        inmigration_rate=2,
+        mark_lost_probability=0,
+    )
+    myPopulation.sample_and_mark(4)
+    myPopulation.time_interlude()
+    myPopulation.sample_but_not_mark(12)
+
+    records = myPopulation.record.to_numpy()
+    assert np.array_equal(records["time"], [0, 0, 1, 1])
+    assert np.array_equal(records["unmarked"], [10, 6, 8, 8])
+    assert np.array_equal(records["marked"], [0, 4, 4, 4])
+    assert np.array_equal(records["sampled_unmarked"], [0, 4, 0, 8])
+    assert np.array_equal(records["sampled_marked"], [0, 0, 0, 4])
+    assert myPopulation.population_record[1] == {"unmarked": 6, "marked": 4}
+    assert myPopulation.sample_record[2] == {"no_sample_u": 0, "no_sample_m": 0}
+    assert myPopulation.sample_record[3] == {"unmarked": 8, "marked": 4}
+    assert myPopulation.time_step_record == [0, 0, 1, 1]
+
+
+# Test recording modes
+
+
+def test_CmrSummaryRecord_keeps_last_window():
+    mySummary = aspm.CmrSummaryRecord(window=3)
+    for time in range(5):
+        mySummary.append(time, aspm.CmrEvent.SAMPLE_BUT_NOT_MARK, 10 - time, time, 1, 2)
+    assert len(mySummary) == 5
+    assert np.array_equal(mySummary.to_numpy()["time"], [2, 3, 4])
+    assert mySummary.sampled_unmarked_total == 5
+    assert mySummary.sampled_marked_total == 10
+    assert mySummary.unmarked_range == (6, 10)
+    assert mySummary.marked_range == (0, 4)
+
+
+def test_CmrPopulation_recording_modes():
+    parameters = {
+        "initial_size": 10,
+        "capture_distribution": (1, 1),
+        "death_distribution": (0, 0),
+        "inmigration_rate": 0,
+        "mark_lost_probability": 0,
+    }
+    summarized = aspm.CmrPopulation(
+        **parameters, recording_mode=aspm.RecordingMode.SUMMARY, summary_window=2
+    )
+    not_recorded = aspm.CmrPopulation(
+        **parameters, recording_mode=aspm.RecordingMode.NONE
+    )
+    for myPopulation in [summarized, not_recorded]:
+        myPopulation.sample_and_mark(4)
+        myPopulation.time_interlude()
+        myPopulation.sample_but_not_mark(10)
+
+    assert summarized.time_step_record == [1, 1]
+    assert summarized.record.sampled_marked_total == 4  # type: ignore
+    assert not_recorded.record is None
+    assert not_recorded._current_marked == 4
+    with pytest.raises(Exception):
+        not_recorded.sample_record
+    with pytest.raises(Exception):
+        aspm.CmrPopulation(**parameters, recording_mode="all")  # type: ignore
+
+
+# Test multi-step time interlude
+
+
+def test_CmrPopulation_multi_step_time_interlude():
+    myPopulation = aspm.CmrPopulation(10, (1, 1), (1, 0), 7, 0, random_generator=5)
+    myPopulation.sample_and_mark(4)
+    myPopulation.time_interlude(steps=30)
+    assert myPopulation._current_time_step == 30
+    assert myPopulation._current_unmarked == 7
+    assert myPopulation._current_marked == 4
+    assert myPopulation.time_step_record == [0, 0, 30]
+    with pytest.raises(Exception):
+        myPopulation.time_interlude(steps=0)
+
+
+def test_CmrEnsemble_multi_step_time_interlude():
+    myEnsemble = aspm.CmrEnsemble(10, (1, 1), (0, 0), 5, 0, replicates=3)
+    myEnsemble.sample_and_mark(4)
+    myEnsemble.time_interlude(steps=10)
+    assert myEnsemble._current_time_step == 10
+    assert np.array_equal(myEnsemble._current_unmarked, [56, 56, 56])
+    assert np.array_equal(myEnsemble._current_marked, [4, 4, 4])
+
+
+def test_CmrEnsemble_multi_step_matches_single_steps_mean():
+    parameters = {
+        "initial_size": 400,
+        "capture_distribution": (0.5, 0.5),
+        "death_distribution": (0.05, 0.08),
+        "inmigration_rate": 3,
+        "mark_lost_probability": 0.1,
+        "replicates": 20000,
+    }
+    single_steps = aspm.CmrEnsemble(**parameters, random_generator=1)
+    multi_step = aspm.CmrEnsemble(**parameters, random_generator=2)
+    for myEnsemble in [single_steps, multi_step]:
+        myEnsemble.sample_and_mark(200)
+    for _ in range(12):
+        single_steps.time_interlude()
+    multi_step.time_interlude(steps=12)
+
+    assert (
+        abs(single_steps._current_unmarked.mean() - multi_step._current_unmarked.mean())
+        < 0.5
+    )
+    assert (
+        abs(single_steps._current_marked.mean() - multi_step._current_marked.mean())
+        < 0.2
+    )
@@ -0,0 +1,97 @@
+from popecology import abundance_estimation_sinks as aes
+from popecology import abundance_estimation_parallel as aep
+from popecology.abundance_estimation_methods import LincolnPetersen
+import numpy as np
+import pytest
+
+
+def test_NpyChunkSink_writes_fixed_size_batches(tmp_path):
+    with aes.NpyChunkSink(str(tmp_path), batch_size=4) as mySink:
+        mySink.write({"a": np.arange(3), "b": np.arange(3) * 0.5})
+        mySink.write({"a": np.arange(3, 10), "b": np.arange(3, 10) * 0.5})
+    chunks = aes.NpyChunkSink.read(str(tmp_path))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    assert isinstance(chunks[0], np.memmap)
+    assert np.array_equal(np.concatenate([chunk["a"] for chunk in chunks]), range(10))
+    assert mySink.rows_written == 10
+
+
+def test_ResultSink_slices_large_writes_by_offset(tmp_path):
+    with aes.NpyChunkSink(str(tmp_path), batch_size=3) as mySink:
+        mySink.write({"a": np.arange(2)})
+        mySink.write({"a": np.arange(2, 12)})
+        assert mySink.rows_written == 12
+        assert mySink._pending == []
+        mySink.write({"a": np.arange(12, 13)})
+        mySink.write({"a": np.arange(13, 17)})
+        assert mySink.rows_written == 15
+        assert len(mySink._pending) == 1 and mySink._pending_rows == 2
+    chunks = aes.NpyChunkSink.read(str(tmp_path))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3, 3, 3, 2]
+    assert np.array_equal(np.concatenate([chunk["a"] for chunk in chunks]), range(17))
+
+
+def test_NpyChunkSink_fails_for_non_empty_directory(tmp_path):
+    with aes.NpyChunkSink(str(tmp_path), batch_size=2) as mySink:
+        mySink.write({"a": np.arange(3)})
+    with pytest.raises(Exception):
+        aes.NpyChunkSink(str(tmp_path))
+    with aes.NpyChunkSink(str(tmp_path / "new_run")) as mySink:
+        mySink.write({"a": np.arange(3)})
+    assert len(aes.NpyChunkSink.read(str(tmp_path / "new_run"))) == 1
+
+
+def test_ResultSink_fails_for_inconsistent_columns(tmp_path):
+    mySink = aes.NpyChunkSink(str(tmp_path))
+    with pytest.raises(Exception):
+        mySink.write({"a": np.arange(3), "b": np.arange(2)})
+    mySink.write({"a": np.arange(3)})
+    with pytest.raises(Exception):
+        mySink.write({"b": np.arange(3)})
+
+
+def test_CmrReplicateRunner_streams_to_sink(tmp_path):
+    parameters = {
+        "initial_size": 500,
+        "capture_distribution": (0.082, 0.082),
+        "death_distribution": (0, 0),
+        "inmigration_rate": 0,
+        "mark_lost_probability": 0,
+    }
+    protocol = [
+        (aep.CmrAction.SAMPLE_AND_MARK, 100),
+        (aep.CmrAction.SAMPLE_BUT_NOT_MARK, 100),
+    ]
+    table = aep.CmrReplicateRunner.run(
+        parameters, protocol, replicates=250, seed=1, block_size=100
+    )
+    mySink = aes.NpyChunkSink(str(tmp_path), batch_size=64)
+    with mySink:
+        assert (
+            aep.CmrReplicateRunner.run(
+                parameters, protocol, 250, seed=1, block_size=100, sink=mySink
+            )
+            is None
+        )
+    chunks = aes.NpyChunkSink.read(str(tmp_path))
+    for column in table:
+        assert np.array_equal(
+            np.concatenate([chunk[column] for chunk in chunks]), table[column]
+        )
+
+
+@pytest.mark.parametrize("sink_class", [aes.ArrowIpcSink, aes.ParquetSink])
+def test_arrow_sinks_round_trip(tmp_path, sink_class):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "results")
+    summary = LincolnPetersen.chapman_unbiased_summary(
+        np.arange(10, 20), np.arange(10), np.arange(1, 11)
+    )
+    with sink_class(path, batch_size=3) as mySink:
+        mySink.write(summary)
+    table = sink_class.read(path)
+    assert table.num_rows == 10
+    assert np.allclose(
+        table.column(LincolnPetersen.estimator_id).to_numpy(),
+        summary[LincolnPetersen.estimator_id],
+    )
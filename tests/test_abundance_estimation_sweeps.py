@@ -0,0 +1,64 @@
+from popecology import abundance_estimation_sweeps as aes
+from popecology.abundance_estimation_parallel import CmrAction
+from popecology.random_generators import BitGeneratorType
+import numpy as np
+import os
+import pytest
+
+grid = {
+    "initial_size": [300, 500],
+    "capture_distribution": [(0.1, 0.1)],
+    "death_distribution": [(0, 0)],
+    "inmigration_rate": [0],
+    "mark_lost_probability": [0],
+    "protocol": [
+        [(CmrAction.SAMPLE_AND_MARK, 50), (CmrAction.SAMPLE_BUT_NOT_MARK, 50)],
+    ],
+}
+
+
+def test_CmrSweep_expand_grid():
+    cells = aes.CmrSweep.expand_grid({"a": [1, 2], "b": ["x", "y", "z"]})
+    assert len(cells) == 6
+    assert cells[0] == {"a": 1, "b": "x"}
+    with pytest.raises(Exception):
+        aes.CmrSweep.expand_grid({"a": []})
+
+
+def test_CmrSweep_only_runs_new_cells(tmp_path):
+    first = aes.CmrSweep.run(grid, replicates=20, seed=4, cache_dir=str(tmp_path))
+    assert len(first) == 2
+    assert len(os.listdir(tmp_path)) == 2
+
+    # Cached cells are loaded, not recomputed
+    cached_path = os.path.join(
+        str(tmp_path),
+        aes.CmrSweep.cell_key(first[0][0], 20, 4) + ".npz",
+    )
+    modified_time = os.path.getmtime(cached_path)
+    extended_grid = {**grid, "initial_size": [300, 500, 700]}
+    second = aes.CmrSweep.run(
+        extended_grid, replicates=20, seed=4, cache_dir=str(tmp_path), workers=2
+    )
+    assert len(second) == 3
+    assert len(os.listdir(tmp_path)) == 3
+    assert os.path.getmtime(cached_path) == modified_time
+    for (cell, table), (new_cell, new_table) in zip(first, second):
+        assert cell == new_cell
+        for column in table:
+            assert np.array_equal(table[column], new_table[column])
+
+
+def test_CmrSweep_cell_key_depends_on_seed():
+    cell = aes.CmrSweep.expand_grid(grid)[0]
+    assert aes.CmrSweep.cell_key(cell, 20, 1) != aes.CmrSweep.cell_key(cell, 20, 2)
+
+
+def test_CmrSweep_block_size_and_bit_generator_miss_the_cache(tmp_path):
+    aes.CmrSweep.run(grid, replicates=20, seed=4, cache_dir=str(tmp_path))
+    aes.CmrSweep.run(grid, replicates=20, seed=4, cache_dir=str(tmp_path), block_size=7)
+    assert len(os.listdir(tmp_path)) == 4
+    cell = aes.CmrSweep.expand_grid(grid)[0]
+    assert aes.CmrSweep.cell_key(
+        cell, 20, 4, bit_generator=BitGeneratorType.PHILOX
+    ) != aes.CmrSweep.cell_key(cell, 20, 4)
@@ -0,0 +1,57 @@
+from popecology.allometry_correlation import SpearmanCorrelation
+from scipy.stats import spearmanr
+import numpy as np
+import pytest
+
+rng = np.random.default_rng(0)
+height = rng.lognormal(0, 0.5, 60)
+traits = np.column_stack(
+    [height, height * rng.lognormal(0, 0.2, 60), np.round(rng.uniform(0, 10, 60))]
+)
+
+
+def test_correlation_matrix_matches_scipy_with_ties():
+    rho, _ = spearmanr(traits)
+    assert np.allclose(SpearmanCorrelation.correlation_matrix(traits), rho)
+
+
+def test_permutation_p_values_match_asymptotic_ones():
+    _, p_values = spearmanr(traits)
+    permutation = SpearmanCorrelation.permutation_p_values(
+        traits, 4000, seed=1, block_size=500
+    )
+    assert np.allclose(np.diagonal(permutation), 0)
+    assert permutation[0, 1] == pytest.approx(1 / 4001)
+    assert permutation[0, 2] == pytest.approx(p_values[0, 2], abs=0.05)
+    bonferroni = SpearmanCorrelation.permutation_p_values(
+        traits, 4000, seed=1, block_size=500, bonferroni=True
+    )
+    assert bonferroni[0, 1] == pytest.approx(3 / 4001)
+
+
+def test_bootstrap_intervals_contain_the_estimate():
+    rho = SpearmanCorrelation.correlation_matrix(traits)
+    lower, upper = SpearmanCorrelation.bootstrap_intervals(traits, 2000, seed=2)
+    assert np.all(lower <= rho + 1e-12)
+    assert np.all(rho <= upper + 1e-12)
+    assert lower[0, 1] > 0.5
+
+
+def test_iqr_outlier_mask():
+    data = np.column_stack([np.arange(10.0), np.arange(10.0)])
+    data[3, 1] = 100
+    assert (
+        SpearmanCorrelation.iqr_outlier_mask(data).tolist()
+        == [
+            True,
+            True,
+            True,
+            False,
+        ]
+        + [True] * 6
+    )
+
+
+def test_analyze_fails_with_one_column():
+    with pytest.raises(Exception):
+        SpearmanCorrelation.analyze(traits[:, :1])
@@ -3,6 +3,9 @@
 
 from landecology import deforestation_rate as dr
 import pytest
+from numpy import isnan
+import numpy as np
+from enum import Enum
 
 
 # DeforestationCalculator
@@ -98,3 +101,172 @@ def test_annual_rate_of_forest_change_fao():
         - output_4
         <= delta_error
     )
+
+
+def test_scalar_rates_of_total_forest_loss_and_numpy_inputs():
+    calculate = dr.DeforestationCalculator.calculate_deforestation_rate
+    with np.errstate(divide="ignore"):
+        assert (
+            calculate(
+                dr.DeforestationFormula.FOREST_CHANGE_PUYRAVAUD, 100, 0, 2000, 2010
+            )
+            == -np.inf
+        )
+        assert (
+            calculate(dr.DeforestationFormula.FOREST_CHANGE_FAO, 100, 0, 2000, 2010)
+            == -1
+        )
+    rate = calculate(
+        dr.DeforestationFormula.FOREST_CHANGE_FAO,
+        np.array(2410.0),
+        np.array(940.0),
+        1950,
+        1960,
+    )
+    assert abs(rate - (-0.0899)) <= 0.00009
+
+
+# Batch rates
+
+
+def test_batch_rates_match_scalar_calculator():
+    area_t1 = [39520530, 7025420, 22870, 2410]
+    area_t2 = [38616050, 6499040, 19390, 940]
+    year_t1 = [1989, 2000, 2010, 1950]
+    year_t2 = [1999, 2010, 2020, 1960]
+    rates = dr.DeforestationCalculator.calculate_deforestation_rates(
+        area_t1, area_t2, year_t1, year_t2
+    )
+    assert list(rates) == list(dr.DeforestationFormula)
+    for formula, batch_rates in rates.items():
+        for i in range(len(area_t1)):
+            scalar_rate = dr.DeforestationCalculator.calculate_deforestation_rate(
+                formula, area_t1[i], area_t2[i], year_t1[i], year_t2[i]
+            )
+            assert abs(batch_rates[i] - scalar_rate) <= 0.0000000005
+
+
+def test_batch_rates_fail_for_invalid_values():
+    with pytest.raises(Warning):
+        dr.DeforestationCalculator.calculate_deforestation_rates(
+            [10, 20], [5, 10], [2000, 2010], [2010, 2000]
+        )
+    with pytest.raises(Exception):
+        dr.DeforestationCalculator.calculate_deforestation_rates(
+            [10, 0], [5, 10], 2000, 2010
+        )
+    with pytest.raises(Exception):
+        dr.DeforestationCalculator.calculate_deforestation_rates(
+            [10, 20], [5, 10], 2000, 2010, formulas=["a"]  # type: ignore
+        )
+
+
+def test_batch_rates_of_total_forest_loss():
+    Formula = dr.DeforestationFormula
+    rates = dr.DeforestationCalculator.calculate_deforestation_rates(
+        [100, 50], [0, 25], 2000, 2010
+    )
+    assert rates[Formula.ANNUAL_DEFORESTATION_FEARNSIDE_LIU].tolist() == [-10, -2.5]
+    assert rates[Formula.ANNUAL_DEFORESTATION_WRI].tolist() == [-0.1, -0.05]
+    for formula in [Formula.FOREST_CHANGE_PUYRAVAUD, Formula.FOREST_CHANGE_FAO]:
+        assert dr.DeforestationCalculator.requires_positive_final_area(formula)
+        assert isnan(rates[formula][0]) and not isnan(rates[formula][1])
+    with pytest.raises(Exception):
+        dr.DeforestationCalculator.calculate_deforestation_rates(
+            [100, 50], [-1, 25], 2000, 2010
+        )
+
+    rate_matrix = dr.DeforestationCalculator.calculate_interval_rate_matrix(
+        [100, 0, 0], [2000, 2010, 2020]
+    )
+    wri = list(dr.DeforestationCalculator.registered_formulas()).index(
+        Formula.ANNUAL_DEFORESTATION_WRI
+    )
+    assert rate_matrix[wri, 0, 0, 1:].tolist() == [-0.1, -0.05]
+    assert isnan(rate_matrix[:, 0, 1, 2]).all()
+
+
+def test_batch_rates_from_table():
+    pd = pytest.importorskip("pandas")
+    table = pd.DataFrame(
+        {"region_a": [16149333600, 14814712800], "region_b": [2410, 940]},
+        index=[2000, 2010],
+    )
+    rates = dr.DeforestationCalculator.calculate_deforestation_rates_from_table(
+        table, 2000, 2010, formulas=[dr.DeforestationFormula.FOREST_CHANGE_PUYRAVAUD]
+    )
+    puyravaud = rates[dr.DeforestationFormula.FOREST_CHANGE_PUYRAVAUD]
+    assert puyravaud.shape == (2,)
+    assert abs(puyravaud[1] - (-0.0942)) <= 0.00009
+
+
+def test_interval_rate_matrix():
+    cover = [[2410, 1800, 940], [7025420, 6800000, 6499040]]
+    years = [1950, 1955, 1960]
+    formulas = [
+        dr.DeforestationFormula.FOREST_CHANGE_FAO,
+        dr.DeforestationFormula.ANNUAL_DEFORESTATION_WRI,
+    ]
+    rate_matrix = dr.DeforestationCalculator.calculate_interval_rate_matrix(
+        cover, years, formulas
+    )
+    assert rate_matrix.shape == (2, 2, 3, 3)
+    for f, formula in enumerate(formulas):
+        for r in range(2):
+            for i in range(3):
+                for j in range(3):
+                    if i >= j:
+                        assert isnan(rate_matrix[f, r, i, j])
+                        continue
+                    scalar_rate = (
+                        dr.DeforestationCalculator.calculate_deforestation_rate(
+                            formula, cover[r][i], cover[r][j], years[i], years[j]
+                        )
+                    )
+                    assert abs(rate_matrix[f, r, i, j] - scalar_rate) <= 0.0000000005
+
+
+def test_interval_rate_matrix_fails_for_unsorted_years():
+    with pytest.raises(Warning):
+        dr.DeforestationCalculator.calculate_interval_rate_matrix(
+            [[10, 9, 8]], [2000, 2020, 2010]
+        )
+
+
+class HalfPeriodFormula(str, Enum):
+    HALF_PERIOD_CHANGE = "half-period"
+
+
+@pytest.fixture
+def half_period_formula():
+    formula = HalfPeriodFormula.HALF_PERIOD_CHANGE
+    dr.DeforestationCalculator.register_formula(
+        formula, lambda a1, a2, y1, y2: (a2 - a1) / ((y2 - y1) / 2)
+    )
+    yield formula
+    dr.DeforestationCalculator.unregister_formula(formula)
+
+
+def test_registered_formula_in_scalar_and_batch_paths(half_period_formula):
+    assert half_period_formula in dr.DeforestationCalculator.registered_formulas()
+    rate = dr.DeforestationCalculator.calculate_deforestation_rate(
+        half_period_formula, 100, 80, 2000, 2010
+    )
+    assert rate == -4
+    rates = dr.DeforestationCalculator.calculate_deforestation_rates(
+        [100, 50], [80, 40], 2000, 2010
+    )
+    assert list(rates[half_period_formula]) == [-4, -2]
+    rate_matrix = dr.DeforestationCalculator.calculate_interval_rate_matrix(
+        [[100, 80, 60]], [2000, 2010, 2020], [half_period_formula]
+    )
+    assert rate_matrix[0, 0, 0, 2] == -4
+
+
+def test_unregistered_formula_fails():
+    with pytest.raises(Exception):
+        dr.DeforestationCalculator.calculate_deforestation_rate(
+            HalfPeriodFormula.HALF_PERIOD_CHANGE, 100, 80, 2000, 2010
+        )
+    with pytest.raises(Exception):
+        dr.DeforestationCalculator.register_formula("half-period", abs)  # type: ignore
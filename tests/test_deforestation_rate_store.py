@@ -0,0 +1,95 @@
+from landecology import deforestation_rate_store as drs
+from landecology.deforestation_rate import DeforestationCalculator
+from landecology.deforestation_rate import DeforestationFormula
+from enum import Enum
+import numpy as np
+import pytest
+
+
+class ExtraFormula(str, Enum):
+    EXTRA = "extra"
+
+
+years = [2000, 2010, 2020, 2023]
+cover = np.array(
+    [
+        [16149333600, 14814712800, 13526236800, 13400000000],
+        [2410, 1800, 940, 900],
+    ]
+)
+
+
+def test_DeforestationRateStore_matches_interval_rate_matrix(tmp_path):
+    myStore = drs.DeforestationRateStore(str(tmp_path))
+    for t, year in enumerate(years):
+        myStore.append_year(year, cover[:, t])
+    expected = DeforestationCalculator.calculate_interval_rate_matrix(cover, years)
+    assert np.allclose(myStore.to_matrix(), expected, equal_nan=True)
+    assert np.allclose(
+        myStore.get_rates(DeforestationFormula.FOREST_CHANGE_FAO, 2010, 2023),
+        expected[1, :, 1, 3],
+    )
+
+
+def test_DeforestationRateStore_persists_and_appends(tmp_path):
+    formulas = [DeforestationFormula.FOREST_CHANGE_PUYRAVAUD]
+    myStore = drs.DeforestationRateStore(str(tmp_path), formulas)
+    for t, year in enumerate(years[:3]):
+        myStore.append_year(year, cover[:, t])
+
+    reopened = drs.DeforestationRateStore(str(tmp_path), formulas)
+    assert reopened.years == years[:3]
+    assert np.array_equal(reopened.cover, cover[:, :3])
+    reopened.append_year(years[3], cover[:, 3])
+    expected = DeforestationCalculator.calculate_interval_rate_matrix(
+        cover, years, formulas
+    )
+    assert np.allclose(reopened.to_matrix(), expected, equal_nan=True)
+
+    assert drs.DeforestationRateStore(str(tmp_path)).formulas == formulas
+    with pytest.raises(Exception):
+        drs.DeforestationRateStore(
+            str(tmp_path), [DeforestationFormula.FOREST_CHANGE_FAO]
+        )
+
+
+def test_DeforestationRateStore_fails_for_invalid_year_or_cover(tmp_path):
+    myStore = drs.DeforestationRateStore(str(tmp_path))
+    myStore.append_year(2000, [10, 20])
+    with pytest.raises(Warning):
+        myStore.append_year(1990, [10, 20])
+    with pytest.raises(Exception):
+        myStore.append_year(2010, [10, 20, 30])
+    with pytest.raises(Exception):
+        myStore.append_year(2010, [10, -1])
+
+
+def test_DeforestationRateStore_total_forest_loss(tmp_path):
+    total_loss = np.array([[100, 0, 0], [100, 50, 25]])
+    myStore = drs.DeforestationRateStore(str(tmp_path))
+    for t, year in enumerate(years[:3]):
+        myStore.append_year(year, total_loss[:, t])
+    expected = DeforestationCalculator.calculate_interval_rate_matrix(
+        total_loss, years[:3]
+    )
+    assert np.allclose(myStore.to_matrix(), expected, equal_nan=True)
+    assert myStore.get_rates(
+        DeforestationFormula.ANNUAL_DEFORESTATION_WRI, 2000, 2010
+    ) == pytest.approx([-0.1, -0.05])
+    assert np.isnan(
+        myStore.get_rates(DeforestationFormula.FOREST_CHANGE_PUYRAVAUD, 2000, 2010)[0]
+    )
+
+
+def test_DeforestationRateStore_keeps_its_formulas_after_new_registrations(tmp_path):
+    myStore = drs.DeforestationRateStore(str(tmp_path))
+    myStore.append_year(2000, [10, 20])
+    DeforestationCalculator.register_formula(
+        ExtraFormula.EXTRA, lambda area_t1, area_t2, year_t1, year_t2: area_t2 - area_t1
+    )
+    try:
+        reopened = drs.DeforestationRateStore(str(tmp_path))
+        assert reopened.formulas == myStore.formulas
+        reopened.append_year(2010, [5, 20])
+    finally:
+        DeforestationCalculator.unregister_formula(ExtraFormula.EXTRA)
@@ -0,0 +1,93 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+
+import numpy as np
+import pytest
+from landecology.deforestation_rate import DeforestationFormula
+from landecology.deforestation_uncertainty import AreaErrorModel
+from landecology.deforestation_uncertainty import DeforestationUncertainty
+
+
+def test_normal_intervals_contain_the_point_estimate():
+    area_t1 = np.linspace(100, 1000, 500)
+    area_t2 = area_t1 * 0.8
+    intervals = DeforestationUncertainty.propagate(
+        AreaErrorModel.NORMAL,
+        2000,
+        2010,
+        area_t1,
+        area_t2,
+        standard_error_t1=area_t1 * 0.02,
+        standard_error_t2=area_t2 * 0.02,
+        replicates=2000,
+        random_generator=1,
+    )
+    wri = intervals[DeforestationFormula.ANNUAL_DEFORESTATION_WRI]
+    assert wri["estimate"].shape == (500,)
+    assert np.allclose(wri["estimate"], -0.02)
+    assert np.all(wri["lower"] < wri["estimate"])
+    assert np.all(wri["estimate"] < wri["upper"])
+
+
+def test_normal_without_error_gives_exact_rates():
+    intervals = DeforestationUncertainty.propagate(
+        AreaErrorModel.NORMAL, 2000, 2010, [100], [80], 0, 0, replicates=10
+    )
+    for values in intervals[DeforestationFormula.FOREST_CHANGE_FAO].values():
+        assert values.shape == (1,)
+    puyravaud = intervals[DeforestationFormula.FOREST_CHANGE_PUYRAVAUD]
+    assert puyravaud["lower"][0] == pytest.approx(np.log(0.8) / 10)
+    assert puyravaud["standard_error"][0] == 0
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_total_forest_loss_draws_keep_the_linear_formulas():
+    intervals = DeforestationUncertainty.rate_intervals(
+        np.array([[100.0, 100.0], [100.0, 100.0], [100.0, 0.0]]),
+        np.array([[0.0, 50.0], [0.0, 50.0], [0.0, 50.0]]),
+        2000,
+        2010,
+    )
+    wri = intervals[DeforestationFormula.ANNUAL_DEFORESTATION_WRI]
+    assert wri["estimate"][0] == pytest.approx(-0.1)
+    assert wri["standard_error"][0] == pytest.approx(0)
+    fearnside_liu = intervals[DeforestationFormula.ANNUAL_DEFORESTATION_FEARNSIDE_LIU]
+    assert fearnside_liu["lower"][0] == pytest.approx(-10)
+    for formula in [
+        DeforestationFormula.FOREST_CHANGE_PUYRAVAUD,
+        DeforestationFormula.FOREST_CHANGE_FAO,
+    ]:
+        assert np.isnan(intervals[formula]["estimate"][0])
+        assert not np.isnan(intervals[formula]["estimate"][1])
+    # draws without forest at year_t1 are dropped for every formula
+    assert wri["estimate"][1] == pytest.approx(-0.05)
+    assert wri["standard_error"][1] == pytest.approx(0)
+
+
+def test_adjusted_forest_area():
+    # 90% of the mapped forest and 10% of the mapped non forest are forest
+    adjusted = DeforestationUncertainty.adjusted_forest_area(
+        [100, 50], 200, [[90, 10], [5, 45]]
+    )
+    assert np.allclose(adjusted, [100, 60])
+
+
+def test_confusion_matrix_draws_shape_and_mean():
+    matrices = np.array([[[90, 10], [5, 45]], [[40, 10], [0, 50]]])
+    draws = DeforestationUncertainty.confusion_matrix_area_draws(
+        [100, 50], 200, matrices, 20000, random_generator=3
+    )
+    assert draws.shape == (20000, 2)
+    assert np.allclose(draws.mean(axis=0), [100, 40], rtol=0.01)
+    assert np.all(draws[:, 1] <= 50)
+
+
+def test_confusion_matrix_model_requires_matrices():
+    with pytest.raises(Exception):
+        DeforestationUncertainty.propagate(
+            AreaErrorModel.CONFUSION_MATRIX, 2000, 2010, [100], [80], total_area=200
+        )
+    with pytest.raises(Exception):
+        DeforestationUncertainty.confusion_matrix_area_draws(
+            [100], 200, [[0, 0], [5, 45]], 10
+        )
@@ -0,0 +1,84 @@
+from landecology import forest_change_raster as fcr
+from landecology.deforestation_rate import DeforestationFormula
+import numpy as np
+import pytest
+
+
+def make_rasters(tmp_path):
+    generator = np.random.default_rng(0)
+    cover_t1 = generator.choice([1, 2, 3], size=(50, 70), p=[0.7, 0.2, 0.1])
+    cover_t2 = np.where(generator.random((50, 70)) < 0.2, 2, cover_t1)
+    zones = generator.integers(-1, 6, size=(50, 70))
+    paths = []
+    for name, raster in [("t1", cover_t1), ("t2", cover_t2), ("zones", zones)]:
+        paths.append(str(tmp_path / (name + ".npy")))
+        np.save(paths[-1], raster)
+    return (cover_t1, cover_t2, zones), paths
+
+
+def test_ForestChangePipeline_zones(tmp_path):
+    (cover_t1, cover_t2, zones), paths = make_rasters(tmp_path)
+    myPipeline = fcr.ForestChangePipeline(
+        fcr.NpyRasterReader(paths[0]),
+        fcr.NpyRasterReader(paths[1]),
+        2000,
+        2010,
+        forest_classes=[1],
+        pixel_area=900,
+        zones=fcr.NpyRasterReader(paths[2]),
+        tile_size=16,
+    )
+    labels, area_t1, area_t2 = myPipeline.forest_area()
+    assert np.array_equal(labels, range(6))
+    for label in labels:
+        assert area_t1[label] == 900 * np.sum((zones == label) & (cover_t1 == 1))
+        assert area_t2[label] == 900 * np.sum((zones == label) & (cover_t2 == 1))
+
+    rates = myPipeline.calculate_rates([DeforestationFormula.FOREST_CHANGE_PUYRAVAUD])
+    expected = np.log(area_t2 / area_t1) / 10
+    assert np.allclose(rates[DeforestationFormula.FOREST_CHANGE_PUYRAVAUD], expected)
+
+
+def test_ForestChangePipeline_tiles(tmp_path):
+    (cover_t1, cover_t2, _), paths = make_rasters(tmp_path)
+    myPipeline = fcr.ForestChangePipeline(
+        fcr.NpyRasterReader(paths[0]),
+        fcr.NpyRasterReader(cover_t2),
+        2000,
+        2010,
+        tile_size=32,
+    )
+    labels, area_t1, _ = myPipeline.forest_area()
+    assert len(labels) == 2 * 3
+    assert area_t1[0] == np.sum(cover_t1[:32, :32] == 1)
+    assert area_t1[5] == np.sum(cover_t1[32:, 64:] == 1)
+
+
+def test_ForestChangePipeline_no_forest_gives_nan():
+    empty = fcr.NpyRasterReader(np.zeros((4, 4), dtype=np.uint8))
+    full = fcr.NpyRasterReader(np.ones((4, 4), dtype=np.uint8))
+    rates = fcr.ForestChangePipeline(full, empty, 2000, 2010).calculate_rates()
+    for formula in [
+        DeforestationFormula.FOREST_CHANGE_PUYRAVAUD,
+        DeforestationFormula.FOREST_CHANGE_FAO,
+    ]:
+        assert np.isnan(rates[formula]).all()
+    area = 16.0
+    assert rates[DeforestationFormula.ANNUAL_DEFORESTATION_FEARNSIDE_LIU] == (
+        pytest.approx([-area / 10])
+    )
+    assert rates[DeforestationFormula.ANNUAL_DEFORESTATION_WRI] == pytest.approx(
+        [-1 / 10]
+    )
+    rates = fcr.ForestChangePipeline(empty, full, 2000, 2010).calculate_rates()
+    assert all(np.isnan(values).all() for values in rates.values())
+
+
+def test_ForestChangePipeline_fails_for_different_shapes():
+    with pytest.raises(Exception):
+        fcr.ForestChangePipeline(
+            fcr.NpyRasterReader(np.zeros((4, 4))),
+            fcr.NpyRasterReader(np.zeros((4, 5))),
+            2000,
+            2010,
+        )
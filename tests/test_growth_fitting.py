@@ -0,0 +1,79 @@
+from popecology import growth_models
+from popecology.growth_fitting import GrowthFitter
+import numpy as np
+import pytest
+
+time = np.arange(12.0)
+
+
+def test_fit_linear_recovers_exact_lines_with_missing_values():
+    observations = np.array([3 + 2 * time, 10 - 0.5 * time])
+    observations[0, 4] = np.nan
+    estimates = GrowthFitter.fit(growth_models.SimpleLinear, time, observations)
+    assert estimates["initial_size"] == pytest.approx([3, 10])
+    assert estimates["slope"] == pytest.approx([2, -0.5])
+    assert estimates["slope_standard_error"] == pytest.approx([0, 0], abs=1e-6)
+
+
+def test_fit_linear_standard_errors_match_polyfit():
+    rng = np.random.default_rng(1)
+    observations = 5 + 1.5 * time + rng.normal(0, 1, time.shape)
+    estimates = GrowthFitter.fit_linear(time, observations)
+    coefficients, covariance = np.polyfit(time, observations, 1, cov="unscaled")
+    residual_variance = estimates["rss"][0] / (len(time) - 2)
+    assert estimates["slope"][0] == pytest.approx(coefficients[0])
+    assert estimates["slope_standard_error"][0] == pytest.approx(
+        np.sqrt(covariance[0, 0] * residual_variance)
+    )
+
+
+def test_fit_nonlinear_recovers_logistic_parameters():
+    rates = np.array([0.4, 0.6, 0.8])
+    capacities = np.array([100.0, 150.0, 200.0])
+    observations = growth_models.Logistic([10, 5, 20]).general_function(
+        time, rates, capacities
+    )
+    observations[1, 3] = np.nan
+    estimates = GrowthFitter.fit(growth_models.Logistic, time, observations)
+    assert np.all(estimates["converged"])
+    assert estimates["initial_size"] == pytest.approx([10, 5, 20], rel=1e-4)
+    assert estimates["rate"] == pytest.approx(rates, rel=1e-4)
+    assert estimates["capacity"] == pytest.approx(capacities, rel=1e-4)
+
+
+def test_fit_nonlinear_discrete_model_with_noise():
+    rng = np.random.default_rng(2)
+    observations = growth_models.BevertonHolt(np.full(200, 10.0)).general_function(
+        time, 1.8, 120
+    ) + rng.normal(0, 1, (200, len(time)))
+    estimates = GrowthFitter.fit(growth_models.BevertonHolt, time, observations)
+    assert np.all(estimates["rate"] > 0)
+    assert np.mean(estimates["rate"]) == pytest.approx(1.8, rel=0.01)
+    # standard errors describe the spread of the estimates
+    assert np.median(estimates["capacity_standard_error"]) == pytest.approx(
+        np.std(estimates["capacity"]), rel=0.3
+    )
+
+
+def test_fit_nonlinear_unfinished_fits_are_not_converged():
+    rng = np.random.default_rng(3)
+    observations = growth_models.Logistic(np.full(20, 10.0)).general_function(
+        time, 0.5, 120
+    ) + rng.normal(0, 1, (20, len(time)))
+    estimates = GrowthFitter.fit(
+        growth_models.Logistic,
+        time,
+        observations,
+        {"capacity": 1000.0, "rate": 0.01},
+        max_iterations=2,
+    )
+    assert not np.any(estimates["converged"])
+    estimates = GrowthFitter.fit(growth_models.Logistic, time, observations)
+    assert np.all(estimates["converged"])
+
+
+def test_fit_fails_with_too_few_observations():
+    observations = np.full((1, len(time)), np.nan)
+    observations[0, :2] = [1, 2]
+    with pytest.raises(Exception):
+        GrowthFitter.fit(growth_models.Logistic, time, observations)
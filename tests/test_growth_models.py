@@ -1,3 +1,4 @@
+import numpy as np
 from popecology import growth_models
 import pytest
 
@@ -55,3 +56,83 @@ def test_SimpleLinear_growth_progression():
     commond_difference = 4
     mySimpleLinear = growth_models.SimpleLinear(initial_size)
     assert mySimpleLinear.time_progression(5, 0, 100, commond_difference) == 120
+
+
+def test_SimpleLinear_growth_function_over_time_and_parameter_arrays():
+    mySimpleLinear = growth_models.SimpleLinear([[100], [200]])
+    trajectories = mySimpleLinear.general_function(np.arange(4), [1, 2, 3])
+    assert trajectories.shape == (2, 3, 4)
+    assert trajectories[1, 2, 3] == 209
+    assert list(trajectories[0, 0]) == [100, 101, 102, 103]
+
+
+def test_fails_SimpleLinear_growth_function_with_any_negative_time():
+    mySimpleLinear = growth_models.SimpleLinear(100)
+    with pytest.raises(Exception):
+        mySimpleLinear.general_function([0, 1, -1], 4)
+    with pytest.raises(Exception):
+        growth_models.SimpleLinear([100, 0])
+
+
+def test_SimpleLinear_growth_progression_over_arrays():
+    mySimpleLinear = growth_models.SimpleLinear(100)
+    progression = mySimpleLinear.time_progression([5, 6], 0, 100, [4, 5])
+    assert progression.tolist() == [[120, 124], [125, 130]]
+
+
+# test exponential, logistic, Gompertz and discrete models
+
+
+def test_Exponential_growth_function_and_progression():
+    myExponential = growth_models.Exponential(100)
+    assert myExponential.general_function(2, np.log(2) / 2) == pytest.approx(200)
+    assert myExponential.time_progression(5, 3, 200, np.log(2)) == pytest.approx(800)
+
+
+def test_Logistic_and_Gompertz_approach_capacity():
+    for model in (growth_models.Logistic, growth_models.Gompertz):
+        trajectories = model([10, 50]).general_function(
+            np.arange(0, 60, 10), [0.5, 1.0], 100
+        )
+        assert trajectories.shape == (2, 6)
+        assert trajectories[:, 0] == pytest.approx([10, 50])
+        assert np.all(np.diff(trajectories, axis=1) >= 0)
+        assert trajectories[:, -1] == pytest.approx([100, 100], rel=0.001)
+
+
+def test_Logistic_growth_progression_matches_general_function():
+    myLogistic = growth_models.Logistic(10)
+    size_t2 = myLogistic.general_function(2, 0.3, 100)
+    assert myLogistic.time_progression(5, 2, size_t2, 0.3, 100) == pytest.approx(
+        myLogistic.general_function(5, 0.3, 100)
+    )
+
+
+def test_fails_models_with_non_positive_capacity():
+    with pytest.raises(Exception):
+        growth_models.Logistic(10).general_function([1, 2], 0.3, [100, 0])
+
+
+def test_BevertonHolt_closed_form_matches_iterated_map():
+    myBevertonHolt = growth_models.BevertonHolt([10, 150])
+    time = np.arange(20)
+    closed_form = myBevertonHolt.general_function(time, [[1.5], [3.0]], 100)
+    iterated = myBevertonHolt.iterate([10, 150], time, [[1.5], [3.0]], 100)
+    assert closed_form.shape == (2, 2, 20)
+    assert np.allclose(closed_form, iterated)
+
+
+def test_Ricker_growth_iterates_the_map():
+    myRicker = growth_models.Ricker(10)
+    size = 10
+    for _ in range(3):
+        size = size * np.exp(0.5 * (1 - size / 100))
+    assert myRicker.general_function(3, 0.5, 100) == pytest.approx(size)
+    assert myRicker.time_progression([5, 8], 2, 10, 0.5, 100) == pytest.approx(
+        myRicker.general_function([3, 6], 0.5, 100)
+    )
+
+
+def test_fails_discrete_models_with_fractional_steps():
+    with pytest.raises(Exception):
+        growth_models.Ricker(10).general_function(1.5, 0.5, 100)
@@ -0,0 +1,83 @@
+from popecology import growth_models
+from popecology import growth_simulation as gs
+import numpy as np
+import pytest
+
+logistic_parameters = {"rate": 0.5, "capacity": 100}
+
+
+def test_GrowthSimulator_without_noise_follows_the_model():
+    model = growth_models.Logistic(10)
+    trajectories = gs.GrowthSimulator.run(
+        model, logistic_parameters, 20, 5, gs.DemographicNoise.NONE
+    )
+    assert trajectories.shape == (5, 21)
+    expected = model.general_function(np.arange(21), **logistic_parameters)
+    assert np.allclose(trajectories, expected)
+
+
+def test_GrowthSimulator_poisson_mean_and_counts():
+    model = growth_models.Exponential(50)
+    trajectories = gs.GrowthSimulator.run(
+        model, {"rate": 0.1}, 5, 20000, seed=1, block_size=5000
+    )
+    assert np.all(trajectories == np.round(trajectories))
+    assert trajectories[:, -1].mean() == pytest.approx(
+        model.general_function(5, 0.1), rel=0.02
+    )
+
+
+def test_GrowthSimulator_same_seed_any_worker_number():
+    model = growth_models.Ricker(10)
+    arguments = (model, logistic_parameters, 10, 900)
+    single = gs.GrowthSimulator.run(
+        *arguments, gs.DemographicNoise.BINOMIAL, 0.3, seed=4, block_size=200
+    )
+    parallel = gs.GrowthSimulator.run(
+        *arguments,
+        gs.DemographicNoise.BINOMIAL,
+        0.3,
+        seed=4,
+        workers=2,
+        block_size=200,
+    )
+    assert np.array_equal(single, parallel)
+
+
+def test_GrowthSimulator_per_replicate_arrays_over_blocks():
+    initial_size = np.arange(1, 301) * 1.0
+    capacity = np.arange(301, 601) * 1.0
+    trajectories = gs.GrowthSimulator.run(
+        growth_models.Logistic(initial_size),
+        {"rate": 0.5, "capacity": capacity},
+        10,
+        300,
+        gs.DemographicNoise.NONE,
+        block_size=100,
+    )
+    expected = growth_models.Logistic(initial_size).general_function(
+        np.arange(11), 0.5, capacity
+    )
+    assert np.allclose(trajectories, expected)
+
+
+def test_quasi_extinction_probability():
+    trajectories = np.array([[5, 0, 3], [5, 4, 2], [5, 6, 7]])
+    probability = gs.GrowthSimulator.quasi_extinction_probability(trajectories, 3)
+    assert probability.tolist() == [0, 1 / 3, 2 / 3]
+
+
+def test_extinct_replicates_stay_extinct():
+    trajectories = gs.GrowthSimulator.run(
+        growth_models.Ricker(2), {"rate": -1.0, "capacity": 10}, 30, 1000, seed=2
+    )
+    extinct = np.minimum.accumulate(trajectories, axis=1) == 0
+    assert np.all(trajectories[extinct] == 0)
+    assert gs.GrowthSimulator.quasi_extinction_probability(trajectories)[-1] == 1
+
+
+def test_GrowthSimulator_fails_for_invalid_noise():
+    with pytest.raises(Exception):
+        gs.GrowthSimulator.run(
+            growth_models.Exponential(5), {"rate": 0.1}, 5, 10, "poisson"  # type: ignore
+        )
@@ -0,0 +1,63 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from landecology.spatial_distribution import QuadratDispersion
+
+NOTEBOOK_DIRECTORY = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "simulation_notebooks_es",
+    "distribucion_espacial_especie",
+)
+
+
+def test_frequency_tables_fill_missing_classes():
+    tables = QuadratDispersion.frequency_tables([0, 3, 3, 1, 0], [0, 0, 1, 1, 1])
+    assert tables.tolist() == [[1, 0, 0, 1], [1, 1, 0, 1]]
+
+
+def test_frequency_tables_fail_for_negative_counts():
+    with pytest.raises(Exception):
+        QuadratDispersion.frequency_tables([1, -1], [0, 0])
+
+
+def test_random_counts_are_not_overdispersed():
+    rng = np.random.default_rng(0)
+    counts = rng.poisson(3, 100000)
+    tables = QuadratDispersion.frequency_tables(counts, np.zeros(len(counts)))
+    statistics = QuadratDispersion.analyze_frequencies(tables)
+    assert statistics["dispersion_index"][0] == pytest.approx(1, abs=0.02)
+    assert statistics["morisita"][0] == pytest.approx(1, abs=0.02)
+    assert statistics["patchiness"][0] == pytest.approx(1, abs=0.02)
+
+
+def test_analyze_matches_notebook_results():
+    table = pd.read_csv(
+        os.path.join(NOTEBOOK_DIRECTORY, "datos_espeletia_verjon.csv"), header=1
+    )
+    statistics = QuadratDispersion.analyze(
+        table, ["individuos_argentea", "individuos_corymbosa"], "parcela"
+    )
+    assert statistics["species"].tolist()[:4] == ["individuos_argentea"] * 4
+    assert statistics["group"].tolist()[:4] == [1, 2, 3, "all"]
+
+    results = pd.read_csv(
+        os.path.join(NOTEBOOK_DIRECTORY, "resultados_argentea.csv"), index_col=0
+    )
+    columns = ["parcela_1", "parcela_2", "parcela_3", "todas"]
+    for notebook_name, name in [
+        ("mean_x", "mean"),
+        ("observed_variance", "variance"),
+        ("coeficiente_dispersion", "dispersion_index"),
+        ("t_statistic", "t_statistic"),
+        ("t_critical_0dot05", "t_critical"),
+        ("chi2_statistic", "chi2_poisson_statistic"),
+        ("chi2_critical_0dot05", "chi2_poisson_critical"),
+    ]:
+        assert statistics[name][:4] == pytest.approx(
+            results.loc[notebook_name, columns].to_numpy(dtype=float)
+        )
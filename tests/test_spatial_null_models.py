@@ -0,0 +1,65 @@
+# python3
+# author: Hans D. Escobar. H - e-mail: escobar.hans@gmail.com
+
+import numpy as np
+import pandas as pd
+import pytest
+from landecology.spatial_null_models import NullModel
+from landecology.spatial_null_models import QuadratNullModel
+
+
+def test_multinomial_layouts_keep_the_individuals():
+    statistics = QuadratNullModel.simulate_block(
+        NullModel.CSR_MULTINOMIAL, 25, 2.0, 1000, seed_sequence=1
+    )
+    assert statistics["dispersion_index"].shape == (1000,)
+    # with 50 individuals the dispersion index is the mean of the random layouts
+    assert np.mean(statistics["dispersion_index"]) == pytest.approx(1, abs=0.05)
+
+
+def test_clumped_counts_reject_csr_but_not_negative_binomial():
+    rng = np.random.default_rng(3)
+    counts = rng.negative_binomial(0.5, 0.5 / (0.5 + 3), 50)
+    csr = QuadratNullModel.test(counts, NullModel.CSR_POISSON, 2000, seed=1)
+    assert csr["dispersion_index_p_value_aggregated"] == pytest.approx(1 / 2001)
+    clumped = QuadratNullModel.test(counts, NullModel.NEGATIVE_BINOMIAL, 2000, seed=1)
+    assert clumped["dispersion_index_p_value"] > 0.05
+
+
+def test_sparse_counts_ignore_replicates_without_statistics():
+    counts = [0, 0, 1, 0, 0, 0, 1, 0, 0, 0]
+    results = QuadratNullModel.test(counts, NullModel.CSR_POISSON, 2000, seed=4)
+    simulated = QuadratNullModel.simulate(NullModel.CSR_POISSON, 10, 0.2, 2000, seed=4)
+    for name in ("dispersion_index", "morisita"):
+        finite = simulated[name][np.isfinite(simulated[name])]
+        assert results[name + "_replicates"] == len(finite) < 2000
+        assert results[name + "_p_value_aggregated"] == pytest.approx(
+            (1 + np.count_nonzero(finite >= results[name])) / (len(finite) + 1)
+        )
+
+
+def test_simulate_same_seed_any_worker_number():
+    arguments = (NullModel.CSR_MULTINOMIAL, 10, 1.5, 500)
+    single = QuadratNullModel.simulate(*arguments, seed=2, block_size=100)
+    parallel = QuadratNullModel.simulate(*arguments, seed=2, workers=2, block_size=100)
+    for name in QuadratNullModel.STATISTICS:
+        assert np.array_equal(single[name], parallel[name], equal_nan=True)
+
+
+def test_test_table_rows():
+    table = pd.DataFrame(
+        {"plot": [1] * 10 + [2] * 10, "a": [0, 5] * 10, "b": [1, 2] * 10}
+    )
+    results = QuadratNullModel.test_table(
+        table, ["a", "b"], NullModel.CSR_MULTINOMIAL, "plot", replicates=200, seed=0
+    )
+    assert results["species"].tolist() == ["a"] * 3 + ["b"] * 3
+    assert results["group"].tolist() == [1, 2, "all"] * 2
+    assert np.all(results["dispersion_index_p_value_aggregated"][:3] < 0.05)
+
+
+def test_fails_for_invalid_null_model():
+    with pytest.raises(Exception):
+        QuadratNullModel.simulate("poisson", 10, 1.0)  # type: ignore
+    with pytest.raises(Exception):
+        QuadratNullModel.test([1, 1, 1, 1], NullModel.NEGATIVE_BINOMIAL, 10)